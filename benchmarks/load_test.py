@@ -0,0 +1,438 @@
+"""Multi-user load test for the web dashboard.
+
+Serves the real Flask app on a local port, backed by an in-process fake
+Reddit (``praw.Reddit`` is replaced) with configurable per-request latency
+and a per-user rate limit, and drives it with many simulated users. Each
+user has its own session and walks the dashboard flow in phases, all users
+concurrently within a phase:
+
+    login    GET /, POST /login, GET /dashboard
+    items    GET /api/items (full history walk through the fake backend)
+    query    GET /api/query pages and one GET /api/select
+    delete   POST /api/delete batches of the user's oldest comments
+
+Requests are served by a fixed number of worker slots, like a pre-forked or
+threaded deployment; requests beyond that wait for a free slot. For every
+endpoint it reports client-side p50/p95/p99 latency (queueing included),
+throughput and errors, and for every phase the worker saturation, peak
+queue wait and peak Python memory allocated (tracemalloc).
+
+Usage:
+    python benchmarks/load_test.py                          # 20 users, 8 workers
+    python benchmarks/load_test.py --users 100 --workers 16 --latency-ms 80
+    python benchmarks/load_test.py --json results.json --max-p95-ms 2000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+# The app reads LOG_DIR (logs, stats, deletion ledger) at import time
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="redditcleaner-load-"))
+os.environ.setdefault("FLASK_SECRET_KEY", "load-test")
+
+import requests  # noqa: E402  (installed with praw)
+from werkzeug.serving import make_server  # noqa: E402
+
+from redditcleaner.web import app as web_app  # noqa: E402
+
+DAY = 86400
+PHASES = ("login", "items", "query", "delete")
+
+
+# ── Fake Reddit backend ────────────────────────────────────────────────────────
+
+class FakeBackend:
+    """Per-user histories behind simulated network latency and rate limits.
+
+    Args:
+        items (int): Comments per user (plus one post per ten comments).
+        latency (float): Mean seconds per API request (uniform ±50%).
+        quota (int): Requests allowed per user and *window*; further requests
+            sleep until the window resets, as prawcore does.
+        window (float): Rate-limit window in seconds.
+        seed (int): Seed for latency jitter and generated histories.
+    """
+
+    def __init__(self, items, latency, quota, window, seed=0):
+        self.items = items
+        self.latency = latency
+        self.quota = quota
+        self.window = window
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._histories = {}          # username -> {"comment": [...], "post": [...]}
+        self._windows = {}            # username -> (window start, requests used)
+        self.requests = 0
+        self.throttled_seconds = 0.0
+
+    def reddit(self, **kwargs):
+        """Stand-in for the ``praw.Reddit`` constructor."""
+        return FakeReddit(self, kwargs["username"])
+
+    def call(self, username):
+        """Account for one API request by *username*: rate limit, then latency."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            start, used = self._windows.get(username, (now, 0))
+            wait = 0.0
+            if now - start >= self.window:
+                start, used = now, 0
+            elif used >= self.quota:
+                wait = start + self.window - now
+                start, used = start + self.window, 0
+                self.throttled_seconds += wait
+            self._windows[username] = (start, used + 1)
+            latency = self.latency * self._rng.uniform(0.5, 1.5)
+        time.sleep(wait + latency)
+
+    def history(self, username):
+        with self._lock:
+            if username not in self._histories:
+                self._histories[username] = self._generate(username)
+            return self._histories[username]
+
+    def remove(self, username, kind, item_id):
+        history = self.history(username)
+        with self._lock:
+            history[kind] = [data for data in history[kind] if data["id"] != item_id]
+
+    def _generate(self, username):
+        now = time.time()
+        subreddits = [f"sub{n}" for n in range(40)]
+        history = {"comment": [], "post": []}
+        for kind, count in (("comment", self.items), ("post", max(1, self.items // 10))):
+            prefix = "c" if kind == "comment" else "p"
+            for n in range(count):
+                item_id = f"{username}{prefix}{n}"
+                subreddit = self._rng.choice(subreddits)
+                history[kind].append({
+                    "id": item_id,
+                    "score": self._rng.randint(-5, 50),
+                    "subreddit": subreddit,
+                    "created_utc": now - n * DAY / 4,
+                    "permalink": f"/r/{subreddit}/comments/x/y/{item_id}/",
+                    "body": f"comment {n} " * 8,
+                    "title": f"post {n}",
+                    "num_comments": self._rng.randint(0, 20),
+                })
+        return history
+
+
+class FakeReddit:
+    def __init__(self, backend, username):
+        self._backend = backend
+        self._username = username
+        self.user = SimpleNamespace(me=lambda: self._call() or username)
+        self.auth = SimpleNamespace(limits={"remaining": 500.0, "used": 100, "reset_timestamp": time.time() + 300})
+
+    def _call(self):
+        self._backend.call(self._username)
+
+    def redditor(self, name):
+        return SimpleNamespace(
+            comments=SimpleNamespace(new=lambda limit=None: self._listing("comment")),
+            submissions=SimpleNamespace(new=lambda limit=None: self._listing("post")),
+        )
+
+    def comment(self, item_id):
+        return FakeItem(self, "comment", item_id)
+
+    def submission(self, item_id):
+        return FakeItem(self, "post", item_id)
+
+    def _listing(self, kind):
+        # One request per 100-item page, like a real listing
+        for n, data in enumerate(list(self._backend.history(self._username)[kind])):
+            if n % 100 == 0:
+                self._call()
+            yield FakeItem(self, kind, data["id"], data)
+
+
+class FakeItem:
+    """A comment or submission; lazy ones fetch (one request) on first attribute access."""
+
+    def __init__(self, reddit, kind, item_id, data=None):
+        self._reddit = reddit
+        self._kind = kind
+        self.id = item_id
+        self.fullname = ("t1_" if kind == "comment" else "t3_") + item_id
+        self._data = data
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._data is None:
+            self._reddit._call()
+            matches = [d for d in self._reddit._backend.history(self._reddit._username)[self._kind] if d["id"] == self.id]
+            self._data = matches[0] if matches else {"score": 0, "subreddit": "gone", "created_utc": 0,
+                                                     "permalink": "/", "body": "", "title": "", "num_comments": 0}
+        if name == "name":
+            return self.fullname
+        return self._data[name]
+
+    def edit(self, body):
+        self._reddit._call()
+
+    def delete(self):
+        self._reddit._call()
+        self._reddit._backend.remove(self._reddit._username, self._kind, self.id)
+
+
+# ── Server with a fixed number of workers ──────────────────────────────────────
+
+class WorkerPool:
+    """WSGI middleware admitting at most *workers* requests at a time.
+
+    Records busy time and queue waits so saturation can be reported per phase.
+    """
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.busy_seconds = 0.0
+            self.queue_waits = []
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+    def __call__(self, environ, start_response):
+        queued_at = time.perf_counter()
+        self._slots.acquire()
+        started = time.perf_counter()
+        with self._lock:
+            self.queue_waits.append(started - queued_at)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            # Materialize the body inside the slot so the work is counted here
+            return [b"".join(self.app(environ, start_response))]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.busy_seconds += time.perf_counter() - started
+            self._slots.release()
+
+
+# ── Simulated users ────────────────────────────────────────────────────────────
+
+class Recorder:
+    """Client-side latency samples per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)   # endpoint -> [seconds]
+        self.errors = defaultdict(int)
+
+    def request(self, session, method, url, endpoint, **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = session.request(method, url, allow_redirects=False, timeout=600, **kwargs)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            resp, ok = None, False
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.samples[endpoint].append(elapsed)
+            if not ok:
+                self.errors[endpoint] += 1
+        return resp
+
+
+class User:
+    def __init__(self, base_url, username, recorder, args):
+        self.base_url = base_url
+        self.username = username
+        self.recorder = recorder
+        self.args = args
+        self.session = requests.Session()
+        self.csrf_token = None
+        self.comment_ids = []
+
+    def _request(self, method, path, endpoint=None, **kwargs):
+        endpoint = endpoint or f"{method} {path.split('?')[0]}"
+        return self.recorder.request(self.session, method, self.base_url + path, endpoint, **kwargs)
+
+    def login(self):
+        page = self._request("GET", "/")
+        token = re.search(r'name="csrf_token" value="([^"]+)"', page.text).group(1)
+        self._request("POST", "/login", data={
+            "csrf_token": token,
+            "client_id": "id",
+            "client_secret": "secret",
+            "username": self.username,
+            "password": "pw",
+        })
+        dashboard = self._request("GET", "/dashboard")
+        self.csrf_token = re.search(r'name="csrf-token" content="([^"]+)"', dashboard.text).group(1)
+
+    def items(self):
+        resp = self._request("GET", "/api/items")
+        if resp is not None and resp.ok:
+            comments = resp.json()["comments"]
+            # Oldest first, so deletions don't shift the pages other phases read
+            self.comment_ids = comments["id"][::-1]
+
+    def query(self):
+        for page in range(self.args.pages):
+            self._request("GET", f"/api/query?kind=comment&sort=score&order=asc&offset={page * 100}&limit=100")
+        self._request("GET", "/api/select?max_score=0&min_age_days=30")
+
+    def delete(self):
+        batch = self.args.delete_batch
+        for n in range(self.args.delete_batches):
+            ids = self.comment_ids[n * batch:(n + 1) * batch]
+            if not ids:
+                break
+            self._request(
+                "POST", "/api/delete",
+                json={"comment_ids": ids, "post_ids": []},
+                headers={"X-CSRFToken": self.csrf_token},
+            )
+
+
+# ── Reporting ──────────────────────────────────────────────────────────────────
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of *samples* (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(recorder, pool, phase, wall, alloc_peak):
+    endpoints = {}
+    for endpoint, samples in recorder.samples.items():
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": recorder.errors[endpoint],
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "per_second": len(samples) / wall if wall else 0.0,
+        }
+    return {
+        "phase": phase,
+        "seconds": wall,
+        "saturation": pool.busy_seconds / (pool.workers * wall) if wall else 0.0,
+        "peak_in_flight": pool.peak_in_flight,
+        "queue_wait_p95_ms": percentile(pool.queue_waits, 95) * 1000,
+        "alloc_peak_mib": alloc_peak / 2**20,
+        "endpoints": endpoints,
+    }
+
+
+def print_phase(result):
+    print(
+        f"\n{result['phase']}: {result['seconds']:.1f} s, saturation {result['saturation']:.0%}"
+        f" (peak {result['peak_in_flight']} in flight), queue wait p95 {result['queue_wait_p95_ms']:.0f} ms,"
+        f" alloc peak {result['alloc_peak_mib']:.1f} MiB"
+    )
+    print(f"  {'endpoint':<18} {'n':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for endpoint, stats in sorted(result["endpoints"].items()):
+        print(
+            f"  {endpoint:<18} {stats['requests']:>6} {stats['errors']:>5} {stats['p50_ms']:>9.1f}"
+            f" {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['per_second']:>8.1f}"
+        )
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def run(args):
+    backend = FakeBackend(args.items, args.latency_ms / 1000, args.quota, args.window, seed=args.seed)
+    web_app.praw.Reddit = backend.reddit
+    web_app.app.config["WTF_CSRF_TIME_LIMIT"] = None
+    pool = WorkerPool(web_app.app.wsgi_app, args.workers)
+    web_app.app.wsgi_app = pool
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+    server = make_server("127.0.0.1", 0, web_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    users = [User(base_url, f"user{n:04d}", None, args) for n in range(args.users)]
+    results = []
+    if args.memory:
+        tracemalloc.start()
+    print(
+        f"{args.users} users, {args.workers} workers, {args.items} comments/user,"
+        f" {args.latency_ms:.0f} ms latency, {args.quota} requests/{args.window:.0f} s per user"
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=args.users) as executor:
+            for phase in PHASES:
+                recorder = Recorder()
+                for user in users:
+                    user.recorder = recorder
+                pool.reset()
+                if args.memory:
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                started = time.perf_counter()
+                for future in [executor.submit(getattr(user, phase)) for user in users]:
+                    future.result()
+                wall = time.perf_counter() - started
+                alloc_peak = tracemalloc.get_traced_memory()[1] - baseline if args.memory else 0
+                result = summarize(recorder, pool, phase, wall, alloc_peak)
+                results.append(result)
+                print_phase(result)
+    finally:
+        server.shutdown()
+
+    print(f"\nbackend: {backend.requests} request(s), {backend.throttled_seconds:.1f} s rate-limit sleep")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="Simulated users (default: 20)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests the server admits (default: 8)")
+    parser.add_argument("--items", type=int, default=2000, help="Comments per user (default: 2000)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mean fake Reddit latency (default: 50)")
+    parser.add_argument("--quota", type=int, default=600, help="Fake Reddit requests per window per user (default: 600)")
+    parser.add_argument("--window", type=float, default=600, help="Rate-limit window in seconds (default: 600)")
+    parser.add_argument("--pages", type=int, default=5, help="/api/query pages per user (default: 5)")
+    parser.add_argument("--delete-batch", type=int, default=10, help="Ids per /api/delete (default: 10)")
+    parser.add_argument("--delete-batches", type=int, default=2, help="/api/delete calls per user (default: 2)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip tracemalloc (it slows requests)")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit non-zero if any endpoint's p95 exceeds this")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "phases": results}, f, indent=2)
+
+    failed = [
+        f"{result['phase']} {endpoint}"
+        for result in results
+        for endpoint, stats in result["endpoints"].items()
+        if stats["errors"] or (args.max_p95_ms is not None and stats["p95_ms"] > args.max_p95_ms)
+    ]
+    if failed:
+        print(f"FAIL: errors or p95 over target in {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Peak-memory benchmark for a full comment-history scan.
+
+Runs ``delete_old_comments`` over a synthetic history (default 100,000
+comments, every one old enough to delete) in a fresh interpreter against a
+fake Reddit that builds PRAW-sized comment objects on demand, the way a
+listing does, and reports how far peak RSS grew during the scan. For
+comparison it also runs the previous approach — a loop that keeps every
+deleted comment object in a list — and exits non-zero if the pipeline grows
+by more than ``--max-growth-mb``.
+
+Each run deletes through the real ledger and deletion log, written to a
+temporary directory.
+
+Usage:
+    python benchmarks/scan_memory.py
+    python benchmarks/scan_memory.py --items 20000 --max-growth-mb 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+STRATEGIES = ("pipeline", "accumulate")
+
+NOW = 1_700_000_000
+DAY = 86400
+
+
+class FakeComment:
+    """Roughly the attributes (and size) of a fetched praw.models.Comment."""
+
+    def __init__(self, i):
+        body = f"comment {i} " + "lorem ipsum dolor sit amet " * 16
+        self.id = f"c{i:x}"
+        self.name = self.fullname = f"t1_{self.id}"
+        self.body = body
+        self.body_html = f'<div class="md"><p>{body}</p></div>'
+        self.created_utc = float(NOW - 400 * DAY - i * 60)
+        self.created = self.created_utc
+        self.score = self.ups = i % 7 - 3
+        self.downs = 0
+        self.subreddit = f"sub{i % 50}"
+        self.subreddit_id = f"t5_{i % 50:x}"
+        self.subreddit_name_prefixed = f"r/{self.subreddit}"
+        self.link_id = f"t3_l{i // 10:x}"
+        self.parent_id = self.link_id
+        self.link_title = f"Thread {i // 10}"
+        self.link_permalink = f"https://www.reddit.com/r/{self.subreddit}/comments/l{i // 10:x}/thread/"
+        self.link_url = self.link_permalink
+        self.permalink = f"/r/{self.subreddit}/comments/l{i // 10:x}/thread/{self.id}/"
+        self.author_fullname = "t2_me"
+        self.all_awardings = []
+        self.awarders = []
+        self.treatment_tags = []
+        self.gildings = {}
+        self.mod_reports = []
+        self.user_reports = []
+        self._replies = []
+        for flag in ("archived", "locked", "stickied", "saved", "edited", "is_submitter", "over_18", "quarantine"):
+            setattr(self, flag, False)
+
+    def edit(self, body):
+        self.body = body
+
+    def delete(self):
+        pass
+
+
+class FakeReddit:
+    """Just enough of praw.Reddit for delete_old_comments."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def redditor(self, name):
+        listing = (FakeComment(i) for i in range(self.items))
+        comments = type("Comments", (), {"new": lambda self, limit=None: listing})()
+        return type("Redditor", (), {"comments": comments})()
+
+    def comment(self, cid):
+        return FakeComment(int(cid[1:], 16))
+
+
+def accumulate(reddit, days_old):
+    """The pre-pipeline loop: every deleted Comment stays referenced until the end."""
+    from redditcleaner.stats import DeletionLog
+    from redditcleaner.utils import delete_once
+
+    threshold = time.time() - days_old * DAY
+    comments_deleted = []
+    with DeletionLog("deleted_comments.txt", "comment") as log:
+        for comment in reddit.redditor("me").comments.new(limit=None):
+            if comment.created_utc < threshold and delete_once(comment, "comment", log, "cli-mode-1"):
+                comments_deleted.append(comment)
+    return len(comments_deleted)
+
+
+def run_child(strategy, items):
+    """Run one scan in this process and print a JSON result line."""
+    from redditcleaner.cli.comment_cleaner import delete_old_comments
+
+    reddit = FakeReddit(items)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        if strategy == "pipeline":
+            deleted = delete_old_comments(reddit, "me", 30)
+        else:
+            deleted = accumulate(reddit, 30)
+        out.truncate(0)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "strategy": strategy,
+        "deleted": deleted,
+        "seconds": round(elapsed, 2),
+        "growth_mb": round((peak - before) / 1024, 1),  # ru_maxrss is in KiB on Linux
+        "peak_mb": round(peak / 1024, 1),
+    }))
+
+
+def measure(strategy, items):
+    with tempfile.TemporaryDirectory() as log_dir:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", strategy, "--items", str(items)],
+            cwd=log_dir,
+            env={**os.environ, "LOG_DIR": log_dir},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000, help="Comments in the synthetic history")
+    parser.add_argument("--max-growth-mb", type=float, default=25, help="Maximum peak RSS growth for the pipeline")
+    parser.add_argument("--child", choices=STRATEGIES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.items)
+        return
+
+    print(f"{'strategy':<12}{'deleted':>9}{'seconds':>9}{'growth MB':>11}{'peak MB':>9}")
+    results = {strategy: measure(strategy, args.items) for strategy in STRATEGIES}
+    for r in results.values():
+        print(f"{r['strategy']:<12}{r['deleted']:>9}{r['seconds']:>9}{r['growth_mb']:>11}{r['peak_mb']:>9}")
+
+    growth = results["pipeline"]["growth_mb"]
+    if growth > args.max_growth_mb:
+        print(f"FAIL: pipeline grew by {growth} MB (limit {args.max_growth_mb} MB)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Import-time benchmark for the ``reddit-clean`` entry point.
+
+Runs ``python -X importtime -m redditcleaner <args>`` in fresh interpreters
+for a set of argument lists that should not need the network, reports the
+median time spent importing the package and everything it pulls in
+(interpreter start-up excluded), and exits non-zero if any case exceeds the
+target or imports praw, prawcore, requests or Flask.
+
+Usage:
+    python benchmarks/startup.py                 # default target 30 ms
+    python benchmarks/startup.py --target-ms 80 --runs 9
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+CASES = [
+    ["--help"],
+    ["comments", "--help"],
+    ["posts", "--help"],
+    ["weekly", "--help"],
+    ["web", "--help"],
+    ["log", "--json"],
+]
+
+HEAVY_MODULES = ("praw", "prawcore", "requests", "flask")
+
+
+def measure(args):
+    """Return (total import microseconds, heavy modules imported) for one run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "redditcleaner", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    total = 0
+    heavy = set()
+    counting = False  # interpreter start-up (site, encodings, …) is not ours to optimize
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level import; nested ones are indented
+            counting = counting or name.strip().startswith("redditcleaner")
+            if counting:
+                total += int(cumulative_us)
+        if name.strip() in HEAVY_MODULES:
+            heavy.add(name.strip())
+    return total, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=30, help="Maximum median import time per case")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per case")
+    args = parser.parse_args()
+
+    failed = False
+    for case in CASES:
+        samples, heavy = [], set()
+        for _ in range(args.runs):
+            total, imported = measure(case)
+            samples.append(total / 1000)
+            heavy |= imported
+        median = statistics.median(samples)
+        ok = median <= args.target_ms and not heavy
+        failed |= not ok
+        note = f"  imports {', '.join(sorted(heavy))}" if heavy else ""
+        print(f"{'ok  ' if ok else 'FAIL'} reddit-clean {' '.join(case):<18} {median:7.1f} ms{note}")
+
+    print(f"target: {args.target_ms:.0f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""Allow ``python -m redditcleaner`` as an alias for ``reddit-clean``."""
+
+import sys
+
+from redditcleaner.cli.main import main
+
+sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Continuous cleanup daemon using the weekly_cleanup deletion rules.
+
+Instead of one large weekly burst, the daemon:
+    - polls new comments and posts every ``--poll`` seconds, walking each
+      listing only back to the last item it saw (the watchlist cursor);
+    - re-checks undecided items (young score-1 items) every ``--recheck``
+      seconds with batched /api/info lookups;
+    - queues items that meet the criteria and deletes them one at a time,
+      spaced so deletions use at most ``--share`` of the rate budget that
+      Reddit reports in its rate-limit headers.
+
+State is kept in the same weekly_watchlist.json the weekly job uses, so
+the two can be switched between without a full re-walk. Queued deletions
+are saved as watched items, so a restart re-checks and re-queues them.
+
+Usage:
+    python -m redditcleaner.ci.daemon
+    python -m redditcleaner.ci.daemon --poll 120 --share 0.25 --dry-run
+"""
+
+import argparse
+import signal
+import threading
+import time
+from collections import deque
+
+from redditcleaner import utils
+from redditcleaner.ci.weekly_cleanup import (
+    _connect,
+    _describe,
+    _is_undecided,
+    _should_delete,
+)
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.estimate import DEFAULT_QUOTA, RATE_WINDOW
+from redditcleaner.items import ItemSnapshot
+from redditcleaner.stats import LOG_FILES, DeletionLog
+from redditcleaner.utils import (
+    DELETE_ERRORS,
+    SKIPPED_NOTE,
+    delete_once,
+    iter_info,
+    iter_listing,
+)
+from redditcleaner.watchlist import WATCHLIST_FILE, Watchlist
+
+POLL_INTERVAL = 60
+RECHECK_INTERVAL = 3600
+RATE_SHARE = 0.5
+# Edit + delete
+DELETE_COST = 2
+MIN_SPACING = 1.0
+# Pause after the circuit breaker gives up on an outage
+OUTAGE_BACKOFF = 300
+
+
+def deletion_spacing(limits, now, *, share=RATE_SHARE, cost=DELETE_COST, min_spacing=MIN_SPACING):
+    """Seconds to leave between deletions so they use *share* of the rate budget.
+
+    The budget is what Reddit says is left in the current window, spread
+    over the time until the window resets. Without rate-limit headers the
+    default quota is assumed.
+
+    Args:
+        limits (dict): ``reddit.auth.limits``.
+        now (float): Current unix time.
+        share (float): Fraction of the budget deletions may use (0–1].
+        cost (int): Requests per deletion.
+        min_spacing (float): Lower bound on the spacing.
+    """
+    remaining, reset_timestamp = limits.get("remaining"), limits.get("reset_timestamp")
+    if remaining is None or reset_timestamp is None:
+        rate = DEFAULT_QUOTA / RATE_WINDOW
+    else:
+        until_reset = max(reset_timestamp - now, 1.0)
+        if remaining < cost:
+            return max(until_reset, min_spacing)
+        rate = remaining / until_reset
+    return max(cost / (rate * share), min_spacing)
+
+
+class CleanupDaemon:
+    """Scheduler for polling, re-checking and paced deletion.
+
+    ``step()`` does whatever work is due and returns how long to wait before
+    the next call; ``run()`` loops over it until stopped.
+
+    Args:
+        reddit (praw.Reddit): Authenticated Reddit instance.
+        username (str): Account to clean.
+        watchlist (Watchlist): Cursors and undecided items; saved after each cycle.
+        state_path (str): Where the watchlist is saved (not saved in dry-run).
+    """
+
+    def __init__(
+        self,
+        reddit,
+        username,
+        watchlist,
+        *,
+        state_path=WATCHLIST_FILE,
+        poll_interval=POLL_INTERVAL,
+        recheck_interval=RECHECK_INTERVAL,
+        share=RATE_SHARE,
+        dry_run=False,
+        clock=time.monotonic,
+    ):
+        self.reddit = reddit
+        self.username = username
+        self.watchlist = watchlist
+        self.state_path = state_path
+        self.poll_interval = poll_interval
+        self.recheck_interval = recheck_interval
+        self.share = share
+        self.dry_run = dry_run
+        self._clock = clock
+        self.queue = deque()
+        self.queued = set()
+        self.deleted = 0
+        # Re-check first, so items queued before a restart are picked up again
+        self.next_poll = self.next_recheck = self.next_delete = clock()
+
+    def step(self):
+        """Run due work and return the seconds until more work is due."""
+        if self._clock() >= self.next_recheck:
+            self.recheck()
+            self.next_recheck = self._clock() + self.recheck_interval
+            self.save()
+        if self._clock() >= self.next_poll:
+            self.poll()
+            self.next_poll = self._clock() + self.poll_interval
+            self.save()
+        if self.queue and self._clock() >= self.next_delete:
+            self.delete_next()
+            spacing = deletion_spacing(self.reddit.auth.limits, time.time(), share=self.share)
+            self.next_delete = self._clock() + spacing
+
+        due = [self.next_poll, self.next_recheck]
+        if self.queue:
+            due.append(self.next_delete)
+        return max(min(due) - self._clock(), 0)
+
+    def run(self, stop):
+        """Call step() until *stop* (a threading.Event) is set, then save state."""
+        while not stop.is_set():
+            try:
+                delay = self.step()
+            except CircuitOpenError as e:
+                print(f"{e}; pausing {OUTAGE_BACKOFF}s before trying again.")
+                utils.REDDIT_BREAKER.reset()
+                delay = OUTAGE_BACKOFF
+            except DELETE_ERRORS as e:
+                print(f"Reddit error: {e}; retrying in {self.poll_interval}s.")
+                delay = self.poll_interval
+            stop.wait(delay)
+        self.save()
+        print(f"Stopped. Deleted {self.deleted} item(s); {len(self.queue)} still queued.")
+
+    def poll(self):
+        """Walk new comments and posts back to the cursor and classify them."""
+        redditor = self.reddit.redditor(self.username)
+        listings = {"comment": redditor.comments.new, "post": redditor.submissions.new}
+        for label, listing in listings.items():
+            for item in self.watchlist.new_items(iter_listing(listing(limit=None), f"{label} page"), label):
+                self._classify(item)
+
+    def recheck(self):
+        """Look up every watched item again and re-classify it."""
+        watched = list(self.watchlist.items)
+        if not watched:
+            return
+        returned = set()
+        for item in iter_info(self.reddit, watched):
+            returned.add(item.fullname)
+            self._classify(item)
+        for fullname in watched:
+            if fullname not in returned:
+                self.watchlist.forget(fullname)  # deleted or removed in the meantime
+
+    def delete_next(self):
+        """Delete (or in dry-run, report) the oldest queued item."""
+        item = self.queue.popleft()
+        self.queued.discard(item.fullname)
+        label = "comment" if item.fullname.startswith("t1_") else "post"
+        if self.dry_run:
+            print(f"  [DRY RUN] Would delete {_describe(item, label)}")
+            self.watchlist.forget(item.fullname)
+            return
+        with DeletionLog(LOG_FILES[label], label) as log:
+            try:
+                if not delete_once(item, label, log, "daemon"):
+                    # Still watched: the re-check drops it once it is gone
+                    print(f"  Skipped {label} {item.id}: {SKIPPED_NOTE}")
+                    return
+            except DELETE_ERRORS as e:
+                print(f"  Error deleting {label} {item.id}: {e}")
+                return  # stays watched, so the next re-check queues it again
+        self.deleted += 1
+        self.watchlist.forget(item.fullname)
+        print(f"  Deleted {_describe(item, label)}")
+
+    def save(self):
+        if not self.dry_run:
+            self.watchlist.save(self.state_path)
+
+    def _classify(self, item):
+        if _should_delete(item):
+            self.watchlist.watch(item)  # persisted until actually deleted
+            if item.fullname not in self.queued:
+                # A snapshot, not the PRAW object: a long backlog stays small
+                self.queue.append(ItemSnapshot.from_praw(item, self.reddit))
+                self.queued.add(item.fullname)
+        elif _is_undecided(item):
+            self.watchlist.watch(item)
+        else:
+            self.watchlist.forget(item.fullname)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuous Reddit cleanup using the weekly rules")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between polls for new activity (default: {POLL_INTERVAL})")
+    parser.add_argument("--recheck", type=float, default=RECHECK_INTERVAL,
+                        help=f"Seconds between re-checks of undecided items (default: {RECHECK_INTERVAL})")
+    parser.add_argument("--share", type=float, default=RATE_SHARE,
+                        help=f"Fraction of the rate budget deletions may use (default: {RATE_SHARE})")
+    parser.add_argument("--state", default=WATCHLIST_FILE,
+                        help=f"Watchlist/cursor file (default: {WATCHLIST_FILE})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would be deleted without deleting or saving state")
+    args = parser.parse_args()
+    if not 0 < args.share <= 1:
+        parser.error("--share must be in (0, 1]")
+
+    reddit, username = _connect()
+    print(f"Authenticated as: {reddit.user.me()}")
+    watchlist = Watchlist.load(args.state)
+    if not watchlist.cursors:
+        print("No saved cursor — the first poll walks the whole history.")
+
+    daemon = CleanupDaemon(
+        reddit,
+        username,
+        watchlist,
+        state_path=args.state,
+        poll_interval=args.poll,
+        recheck_interval=args.recheck,
+        share=args.share,
+        dry_run=args.dry_run,
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    daemon.run(stop)
+
+
+if __name__ == "__main__":
+    main()
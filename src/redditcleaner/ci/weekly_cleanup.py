@@ -5,6 +5,13 @@ Deletion criteria (either condition triggers deletion):
     1. score < 1  (any age)
     2. score == 1 AND older than 14 days
 
+The first run walks the whole history. It saves a cursor and a watchlist
+of score-1 items that are still too young to decide (weekly_watchlist.json).
+Later runs only walk new activity back to the cursor and re-check watched
+items with batched /api/info lookups. Items that were older or scored 2+
+when last seen are never re-checked, so one whose score drops below 1 later
+is only found by a full walk: pass --full (the workflow does monthly).
+
 Credential resolution order:
     1. Environment variables (REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET,
        REDDIT_USERNAME, REDDIT_PASSWORD)
@@ -13,21 +20,52 @@ Credential resolution order:
 
 Optional environment variables:
     DRY_RUN                     set to "1" to preview deletions without making changes
+    REDDIT_EXTRA_CLIENTS        more OAuth apps of the same account, as comma-separated
+                                client_id:client_secret pairs (or, without the variable,
+                                further id/secret line pairs in Credentials.txt). When set,
+                                the run plans its deletions during the scan and then
+                                spreads them across every client (see redditcleaner.shards).
+    SCRUB_FIRST                 set to "1" to overwrite every match before deleting any
+                                (same as --scrub-first; see redditcleaner.scrub)
 
 Usage:
     python -m redditcleaner.ci.weekly_cleanup             # normal run
     python -m redditcleaner.ci.weekly_cleanup --dry-run   # preview only, nothing deleted
+    python -m redditcleaner.ci.weekly_cleanup --estimate  # request/time estimate only
+    python -m redditcleaner.ci.weekly_cleanup --full      # ignore the watchlist, walk everything
+    python -m redditcleaner.ci.weekly_cleanup --scrub-first  # overwrite every match, then delete them all
+    python -m redditcleaner.ci.weekly_cleanup --trace weekly_trace.json  # also record a request timeline
+    python -m redditcleaner.ci.weekly_cleanup --record weekly_session.jsonl  # save the session for --replay
 """
 
 import argparse
-import json
+import math
 import os
+import sys
+import time
 from datetime import datetime, timezone
 
 import praw
-import prawcore
 
-from redditcleaner.utils import build_deletion_record, edit_and_delete
+from redditcleaner.circuit import CircuitOpenError, outage_summary
+from redditcleaner.cli.parsers import WEEKLY_DESCRIPTION, add_weekly_arguments
+from redditcleaner.estimate import combine_estimates, estimate_scan, format_estimate
+from redditcleaner.progress import CountingRequestor, Progress
+from redditcleaner.replay import start_session
+from redditcleaner.scrub import format_phases, scrub_then_delete
+from redditcleaner.shards import connect_clients, delete_sharded, format_shard_report
+from redditcleaner.stats import LOG_FILES, DeletionLog
+from redditcleaner.tracing import TRACER
+from redditcleaner.utils import (
+    DELETE_ERRORS,
+    INFO_BATCH_SIZE,
+    SKIPPED_NOTE,
+    delete_once,
+    get_extra_clients,
+    iter_info,
+    iter_listing,
+)
+from redditcleaner.watchlist import WATCHLIST_FILE, Watchlist
 
 AGE_THRESHOLD_DAYS = 14
 
@@ -58,6 +96,24 @@ def _load_credentials():
     )
 
 
+def _load_extra_clients():
+    """Return the extra (client_id, client_secret) pairs for the same account.
+
+    Prefers REDDIT_EXTRA_CLIENTS; falls back to the lines after the first
+    four in Credentials.txt.
+    """
+    value = os.environ.get("REDDIT_EXTRA_CLIENTS", "").strip()
+    if value:
+        pairs = [pair.strip().partition(":") for pair in value.split(",") if pair.strip()]
+        if any(not secret for _, _, secret in pairs):
+            raise RuntimeError("REDDIT_EXTRA_CLIENTS must be comma-separated client_id:client_secret pairs")
+        return [(client_id, secret) for client_id, _, secret in pairs]
+    try:
+        return get_extra_clients(os.path.join(os.getcwd(), "Credentials.txt"))
+    except ValueError as e:
+        raise RuntimeError(f"Credentials.txt: {e}") from e
+
+
 def _should_delete(item) -> bool:
     """Return True if item meets either deletion criterion."""
     if item.score < 1:
@@ -66,7 +122,66 @@ def _should_delete(item) -> bool:
     return item.score == 1 and age_days > AGE_THRESHOLD_DAYS
 
 
-def main(dry_run: bool = False):
+def _estimate(reddit, username, dry_run):
+    """Estimate the comment and post passes of this run.
+
+    Returns:
+        tuple: (comment_estimate, post_estimate, combined_estimate)
+    """
+    redditor = reddit.redditor(username)
+    comments = estimate_scan(reddit, redditor.comments.new, _should_delete, "comment", dry_run=dry_run)
+    posts = estimate_scan(reddit, redditor.submissions.new, _should_delete, "post", dry_run=dry_run)
+    return comments, posts, combine_estimates([comments, posts], reddit.auth.limits, now=time.time())
+
+
+def _is_undecided(item) -> bool:
+    """Return True if item is kept now but could still qualify later (young score-1 items)."""
+    if item.score > 1:
+        return False
+    age_days = (datetime.now(timezone.utc) - datetime.fromtimestamp(item.created_utc, tz=timezone.utc)).days
+    return age_days <= AGE_THRESHOLD_DAYS
+
+
+def _describe(item, label):
+    if label == "comment":
+        return f"comment (score={item.score}) in r/{item.subreddit}: {item.body[:80]!r}"
+    return f"post '{item.title}' (score={item.score}) in r/{item.subreddit}"
+
+
+def _handle(item, label, log, progress, watchlist, *, dry_run, plan=None):
+    """Delete *item* if it meets the criteria, or watch it if it is still undecided.
+
+    Items whose deletion fails are watched too, so the next run retries them.
+    If *plan* is a list, matching items are appended to it instead of being
+    deleted, for a sharded deletion pass after the scan.
+
+    Returns:
+        bool: True if the item was deleted.
+    """
+    if not _should_delete(item):
+        if _is_undecided(item):
+            watchlist.watch(item)
+        return False
+    if plan is not None:
+        plan.append(item.fullname)
+        return False
+    if dry_run:
+        progress.write(f"  [DRY RUN] Would delete {_describe(item, label)}")
+        return False
+    try:
+        if not delete_once(item, label, log, "ci"):
+            progress.write(f"  Skipped {label} {item.id}: {SKIPPED_NOTE}")
+            return False
+    except DELETE_ERRORS as e:
+        progress.write(f"  Error deleting {label} {item.id}: {e}")
+        watchlist.watch(item)
+        return False
+    progress.write(f"  Deleted {_describe(item, label)}")
+    return True
+
+
+def _connect():
+    """Return (reddit, username) for the credentials found by _load_credentials()."""
     client_id, client_secret, username, password = _load_credentials()
     reddit = praw.Reddit(
         client_id=client_id,
@@ -75,62 +190,142 @@ def main(dry_run: bool = False):
         password=password,
         user_agent="commentCleaner",
         validate_on_submit=True,
+        requestor_class=CountingRequestor,
     )
+    return reddit, username
+
+
+def _delete_planned(clients, plan, watchlist, *, scrub_first=False):
+    """Delete the planned fullnames across *clients*; watch the failures.
+
+    With *scrub_first*, every planned item is overwritten before any is
+    deleted (see redditcleaner.scrub).
+
+    Returns:
+        dict: The shard report from delete_sharded() (for a scrub-first run,
+        the phase 2 report, with phase 1's failures and any outage merged in).
+    """
+    with DeletionLog(LOG_FILES["comment"], "comment") as comment_log, \
+         DeletionLog(LOG_FILES["post"], "post") as post_log:
+        logs = {"comment": comment_log, "post": post_log}
+        if scrub_first:
+            print(f"\nScrubbing {len(plan)} planned item(s), then deleting them…")
+            scrubbed, report = scrub_then_delete(clients, plan, logs, "ci", total=len(plan))
+            print(format_phases(scrubbed, report))
+            if report is None:
+                report = {**scrubbed, "deleted": {"comment": 0, "post": 0}}
+            else:
+                report["failed"] = scrubbed["failed"] + report["failed"]
+        else:
+            print(f"\nDeleting {len(plan)} planned item(s) across {len(clients)} OAuth clients…")
+            with Progress("planned item", len(plan)) as progress:
+                report = delete_sharded(clients, plan, logs, "ci", progress=progress)
+    for item, _error in report["failed"]:
+        watchlist.watch(item)
+    if len(clients) > 1:
+        print(format_shard_report(report))
+    return report
+
+
+def main(dry_run: bool = False, estimate_only: bool = False, full: bool = False, scrub_first: bool = False):
+    reddit, username = _connect()
 
     print(f"Authenticated as: {reddit.user.me()}")
     print(f"Criteria: score < 1  OR  (score == 1 AND older than {AGE_THRESHOLD_DAYS} days)")
+
+    watchlist = Watchlist() if full else Watchlist.load(WATCHLIST_FILE)
+    incremental = bool(watchlist.cursors)
+    totals = {"comment": None, "post": None}
+    if incremental:
+        print(
+            f"Incremental run: re-checking {len(watchlist)} watched item(s)"
+            f" in {math.ceil(len(watchlist) / INFO_BATCH_SIZE)} lookup request(s),"
+            " plus new activity since the last run"
+        )
+    else:
+        comment_estimate, post_estimate, estimate = _estimate(reddit, username, dry_run)
+        totals = {"comment": comment_estimate["items"], "post": post_estimate["items"]}
+        print(format_estimate(estimate))
+    if estimate_only:
+        return
     if dry_run:
         print("DRY RUN — no items will be edited or deleted\n")
     else:
         print()
 
-    # ── Comments ──────────────────────────────────────────────────────────
-    comments_deleted = 0
-    print("Scanning comments…")
-    for comment in reddit.redditor(username).comments.new(limit=None):
-        if _should_delete(comment):
-            if dry_run:
-                print(f"  [DRY RUN] Would delete comment (score={comment.score}) in r/{comment.subreddit}: {comment.body[:80]!r}")
-            else:
-                with open("deleted_comments.txt", "a", encoding="utf-8") as f:
-                    f.write(json.dumps(build_deletion_record(comment, "comment", "ci")) + "\n")
-                try:
-                    edit_and_delete(comment, "comment")
-                    comments_deleted += 1
-                    print(f"  Deleted comment (score={comment.score}) in r/{comment.subreddit}")
-                except (praw.exceptions.APIException, prawcore.exceptions.TooManyRequests) as e:
-                    print(f"  Error deleting comment {comment.id}: {e}")
-
-    # ── Posts ─────────────────────────────────────────────────────────────
-    posts_deleted = 0
-    print("\nScanning posts…")
-    for submission in reddit.redditor(username).submissions.new(limit=None):
-        if _should_delete(submission):
-            if dry_run:
-                print(f"  [DRY RUN] Would delete post '{submission.title}' (score={submission.score}) in r/{submission.subreddit}")
-            else:
-                with open("deleted_posts.txt", "a", encoding="utf-8") as f:
-                    f.write(json.dumps(build_deletion_record(submission, "post", "ci")) + "\n")
-                try:
-                    edit_and_delete(submission, "post")
-                    posts_deleted += 1
-                    print(f"  Deleted post '{submission.title}' (score={submission.score}) in r/{submission.subreddit}")
-                except (praw.exceptions.APIException, prawcore.exceptions.TooManyRequests) as e:
-                    print(f"  Error deleting post {submission.id}: {e}")
+    clients = [reddit]
+    if not dry_run:
+        _, _, _, password = _load_credentials()
+        clients += connect_clients(_load_extra_clients(), username, password)
+    # With several clients, or scrubbing first, matches are collected during
+    # the scan and deleted afterwards
+    plan = [] if not dry_run and (len(clients) > 1 or scrub_first) else None
+
+    watched = watchlist.take()
+    redditor = reddit.redditor(username)
+    listings = {"comment": redditor.comments.new, "post": redditor.submissions.new}
+    deleted = {"comment": 0, "post": 0}
+    try:
+        # ── New activity (everything on a full run) ───────────────────────
+        for label, listing in listings.items():
+            print(f"Scanning {label}s…")
+            items = watchlist.new_items(iter_listing(listing(limit=None), f"{label} page"), label,
+                                        stop_at_cursor=incremental)
+            with DeletionLog(LOG_FILES[label], label) as log, \
+                 Progress(label, totals[label]) as progress:
+                for item in items:
+                    progress.advance()
+                    deleted[label] += _handle(item, label, log, progress, watchlist, dry_run=dry_run, plan=plan)
+
+        # ── Items left undecided by the previous run ──────────────────────
+        if watched:
+            print(f"Re-checking {len(watched)} watched item(s)…")
+            with DeletionLog(LOG_FILES["comment"], "comment") as comment_log, \
+                 DeletionLog(LOG_FILES["post"], "post") as post_log, \
+                 Progress("watched item", len(watched)) as progress:
+                for item in iter_info(reddit, watched):
+                    progress.advance()
+                    label = "comment" if item.fullname.startswith("t1_") else "post"
+                    log = comment_log if label == "comment" else post_log
+                    deleted[label] += _handle(item, label, log, progress, watchlist, dry_run=dry_run, plan=plan)
+
+        # ── Planned deletions, spread across the clients ──────────────────
+        if plan:
+            report = _delete_planned(clients, plan, watchlist, scrub_first=scrub_first)
+            for label, count in report["deleted"].items():
+                deleted[label] += count
+            if report["outage"] is not None:
+                raise report["outage"]
+    except CircuitOpenError as e:
+        print(outage_summary(e, sum(deleted.values()), "item"))
+        sys.exit(1)
 
     if dry_run:
         print("\nDry run complete — nothing was deleted.")
-    else:
-        print(f"\nDone. Deleted {comments_deleted} comment(s) and {posts_deleted} post(s).")
+        return
+    watchlist.save(WATCHLIST_FILE)
+    print(f"\nDone. Deleted {deleted['comment']} comment(s) and {deleted['post']} post(s).")
+    print(f"Watching {len(watchlist)} undecided item(s) for the next run.")
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Weekly Reddit comment/post cleanup")
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        default=os.environ.get("DRY_RUN", "0") == "1",
-        help="Preview which items would be deleted without making any changes",
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description=WEEKLY_DESCRIPTION)
+    add_weekly_arguments(parser)
+    run(parser, parser.parse_args(argv))
+
+
+def run(parser, args):
+    """Run with parsed *args* (also used by ``reddit-clean weekly``)."""
+    if args.trace:
+        TRACER.start(args.trace)
+    start_session(parser, args)
+    main(
+        dry_run=args.dry_run,
+        estimate_only=args.estimate,
+        full=args.full,
+        scrub_first=args.scrub_first,
     )
-    args = parser.parse_args()
-    main(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,262 @@
+"""Circuit breaker for Reddit outages.
+
+When a large share of recent API calls fail with 5xx responses or network
+errors, the breaker *opens*: further calls are paused instead of being sent,
+so a degraded Reddit isn't hammered item after item. After a cooldown a
+single *half-open* probe is let through while every other caller (sharded
+workers, web request threads) waits for its result — success closes the
+breaker again, failure re-opens it with a longer cooldown. If the outage outlasts
+``max_outage`` seconds, ``CircuitOpenError`` is raised so the run can stop
+early with a summary instead of burning its time budget.
+"""
+
+import threading
+import time
+from collections import deque
+
+import prawcore
+
+from redditcleaner.tracing import TRACER
+
+# Failures that indicate Reddit itself is degraded (as opposed to a bad request)
+TRANSIENT_ERRORS = (
+    prawcore.exceptions.ServerError,
+    prawcore.exceptions.RequestException,
+)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+# What _admit() tells a caller: go ahead, be the half-open probe, or wait for it
+_GO, _PROBE, _WAIT = "go", "probe", "wait"
+
+# Seconds between checks of a probe's result in the async web app
+PROBE_POLL = 0.5
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when Reddit has been failing for longer than the breaker tolerates."""
+
+
+def outage_summary(error, deleted, noun):
+    """Describe a run stopped by CircuitOpenError and how to resume it."""
+    return (
+        f"Stopped early: {error}. {deleted} {noun}(s) were deleted before the outage.\n"
+        "Re-run the same command once Reddit recovers to resume — items that were"
+        " already deleted will not be revisited."
+    )
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker shared by every API call in the process.
+
+    Args:
+        window (int): Number of recent calls the failure rate is computed over.
+        failure_ratio (float): Failure rate at which the breaker opens.
+        min_calls (int): Calls needed in the window before it may open.
+        cooldown (float): Seconds to pause before the first half-open probe.
+        max_cooldown (float): Cap for the cooldown, which doubles per failed probe.
+        max_outage (float): Seconds of continuous outage before giving up.
+    """
+
+    def __init__(
+        self,
+        window=20,
+        failure_ratio=0.5,
+        min_calls=5,
+        cooldown=15,
+        max_cooldown=120,
+        max_outage=600,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_outage = max_outage
+        self._clock = clock
+        self._sleep = sleep
+        self._results = deque(maxlen=window)
+        self._lock = threading.Lock()
+        # Notified whenever a probe's result changes the state
+        self._changed = threading.Condition(self._lock)
+        # Set while a thread is inside call(), so requests it makes aren't counted twice
+        self._local = threading.local()
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.opened_at = None
+        self.outage_started = None
+        self.trips = 0
+
+    def call(self, fn, failed=None):
+        """Run fn() through the breaker, recording transient failures.
+
+        A call made inside another call() on the same thread (a request made
+        by an edit or a lookup that is already guarded) just runs fn(): the
+        outer call waits for the breaker and records the result once.
+
+        Args:
+            fn: Zero-argument callable.
+            failed: Optional predicate on fn()'s result; a result it accepts
+                is returned but recorded as a failure (e.g. a 5xx response
+                that prawcore will retry).
+        """
+        if getattr(self._local, "active", False):
+            return fn()
+        probe = self.before_call()
+        self._local.active = True
+        try:
+            result = fn()
+        except TRANSIENT_ERRORS:
+            self.record_failure(probe)
+            raise
+        except BaseException:
+            if probe:
+                self._abandon_probe()
+            raise
+        finally:
+            self._local.active = False
+        if failed is not None and failed(result):
+            self.record_failure(probe)
+        else:
+            self.record_success(probe)
+        return result
+
+    async def acall(self, fn, transient=TRANSIENT_ERRORS):
+        """Await fn() through the breaker, pausing without blocking the event loop.
+
+        Args:
+            fn: Zero-argument callable returning an awaitable.
+            transient (tuple): Exception types counted as failures; async
+                clients raise their own (asyncprawcore) equivalents.
+        """
+        probe = await self.abefore_call()
+        try:
+            result = await fn()
+        except transient:
+            self.record_failure(probe)
+            raise
+        except BaseException:
+            if probe:
+                self._abandon_probe()
+            raise
+        self.record_success(probe)
+        return result
+
+    def before_call(self):
+        """Wait until a call may be made, or raise CircuitOpenError if the outage is too long.
+
+        While the breaker is open, the first caller becomes the half-open
+        probe: it sleeps out the cooldown and is then let through. Every
+        other caller blocks until the probe's result closes the breaker
+        (they all go ahead) or re-opens it (the next one probes).
+
+        Returns:
+            bool: True if the caller is the probe; its result must be recorded.
+        """
+        while True:
+            with self._changed:
+                action, wait = self._admit()
+                if action == _WAIT:
+                    self._changed.wait(wait)
+                    continue
+            if action == _PROBE:
+                self._pause(wait)
+            return action == _PROBE
+
+    async def abefore_call(self):
+        """before_call() for coroutines: pauses and waits are ``asyncio.sleep``."""
+        import asyncio  # only the async web app needs it; keeps CLI start-up lean
+
+        while True:
+            with self._lock:
+                action, wait = self._admit()
+            if action == _WAIT:
+                await asyncio.sleep(min(wait, PROBE_POLL))
+                continue
+            if action == _PROBE and wait > 0:
+                print(f"  Reddit looks degraded — pausing {wait:.0f}s before probing again…")
+                with TRACER.span("circuit pause", "sleep", seconds=wait):
+                    await asyncio.sleep(wait)
+            return action == _PROBE
+
+    def _pause(self, wait):
+        if wait > 0:
+            print(f"  Reddit looks degraded — pausing {wait:.0f}s before probing again…")
+            with TRACER.span("circuit pause", "sleep", seconds=wait):
+                self._sleep(wait)
+
+    def _admit(self):
+        """Decide what the next caller does; call with the lock held.
+
+        Returns:
+            tuple: (action, seconds) — (_GO, 0) when closed, (_PROBE, pause)
+            for the caller that becomes the half-open probe, and
+            (_WAIT, at most) while another caller's probe is in flight.
+
+        Raises:
+            CircuitOpenError: If the outage has lasted ``max_outage`` seconds.
+        """
+        if self.state == CLOSED:
+            return _GO, 0
+        now = self._clock()
+        outage = now - self.outage_started
+        if outage >= self.max_outage:
+            raise CircuitOpenError(
+                f"Reddit API has been failing for {outage:.0f}s"
+                f" ({self.trips} trip(s) of the circuit breaker)"
+            )
+        if self.state == HALF_OPEN:
+            return _WAIT, self.max_outage - outage
+        self.state = HALF_OPEN
+        return _PROBE, min(self.opened_at + self.cooldown - now, self.max_outage - outage)
+
+    def _abandon_probe(self):
+        """The probe ended without an answer from Reddit; let the next caller probe at once."""
+        with self._changed:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+                self.opened_at = self._clock() - self.cooldown
+                self._changed.notify_all()
+
+    def reset(self):
+        """Close the breaker and forget past results (e.g. before a long-running process retries)."""
+        with self._changed:
+            self._results.clear()
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self.opened_at = self.outage_started = None
+            self._changed.notify_all()
+
+    def record_success(self, probe=True):
+        """Record a call Reddit answered; *probe* says whether it was the half-open probe.
+
+        Only the probe's result moves a half-open breaker, so calls that were
+        already in flight when it opened can't start a second probe.
+        """
+        with self._changed:
+            if self.state == HALF_OPEN and probe:
+                print("  Reddit is responding again — resuming.")
+                self._results.clear()
+                self.state = CLOSED
+                self.cooldown = self.base_cooldown
+                self.outage_started = None
+                self._changed.notify_all()
+            self._results.append(True)
+
+    def record_failure(self, probe=True):
+        """Record a transient failure; see record_success() for *probe*."""
+        with self._changed:
+            self._results.append(False)
+            now = self._clock()
+            if self.state == HALF_OPEN and probe:
+                self.state = OPEN
+                self.opened_at = now
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._changed.notify_all()
+            elif self.state == CLOSED and len(self._results) >= self.min_calls:
+                failures = self._results.count(False)
+                if failures / len(self._results) >= self.failure_ratio:
+                    self.state = OPEN
+                    self.opened_at = self.outage_started = now
+                    self.trips += 1
@@ -1,22 +1,87 @@
 import argparse
-import json
+import sys
 import time
 from datetime import datetime, timedelta, timezone
 
-import praw
-import prawcore
-
+from redditcleaner.circuit import CircuitOpenError, outage_summary
+from redditcleaner.cli.id_list import delete_by_ids
+from redditcleaner.cli.parsers import COMMENTS_DESCRIPTION, add_comments_arguments
+from redditcleaner.estimate import estimate_scan, format_estimate
+from redditcleaner.items import act, scan, select
+from redditcleaner.patterns import PatternMatcher
+from redditcleaner.progress import Progress
+from redditcleaner.replay import start_session
+from redditcleaner.scrub import delete_phase
+from redditcleaner.shards import connect_clients
+from redditcleaner.stats import DeletionLog
+from redditcleaner.tracing import TRACER
 from redditcleaner.utils import (
-    build_deletion_record,
+    DELETE_ERRORS,
+    SKIPPED_NOTE,
     confirm_and_run,
-    edit_and_delete,
+    delete_once,
     get_days_old,
+    get_extra_clients,
     get_reddit_credentials,
     initialize_reddit,
+    iter_listing,
+    scrub_once,
 )
 
 
-def delete_old_comments(reddit, username, days_old, comments_deleted, *, dry_run=False):
+def _describe(comment):
+    return f"(score={comment.score}) in r/{comment.subreddit}: {comment.body[:60]!r}"
+
+
+def _delete_matching(reddit, username, predicate, source, *, dry_run, total, matcher, scrub_first=False):
+    """Scan the comment history and delete what *predicate* (and *matcher*) select.
+
+    Comments stream through scan → select → act one at a time as compact
+    snapshots, so memory does not grow with the history. With *scrub_first*
+    the scan only overwrites them, and a second pass deletes them.
+
+    Returns:
+        int: Comments deleted (or matched in dry-run).
+    """
+    deleted = 0
+    scrubbed = []
+    action = scrub_once if scrub_first else delete_once
+    with DeletionLog("deleted_comments.txt", "comment") as log:
+        with Progress("comment", total) as progress:
+
+            def delete(comment, matched):
+                try:
+                    if action(comment, "comment", log, source, matched):
+                        return True
+                    progress.write(f"  Skipped comment {comment.id}: {SKIPPED_NOTE}")
+                except DELETE_ERRORS as e:
+                    progress.write(f"  Error deleting comment {comment.id}: {e}")
+                return False
+
+            if scrub_first and not dry_run:
+                progress.write("Phase 1/2: overwriting matching comments while scanning…")
+            comments = iter_listing(reddit.redditor(username).comments.new(limit=None), "comment page")
+            snapshots = scan(comments, reddit, progress)
+            try:
+                for comment in act(select(snapshots, predicate, matcher, "comment"), delete, _describe, progress,
+                                   dry_run=dry_run):
+                    deleted += 1
+                    if scrub_first:
+                        scrubbed.append(comment.fullname)
+            except CircuitOpenError as e:
+                progress.write(outage_summary(e, 0 if scrub_first else deleted, "comment"))
+                sys.exit(1)
+
+        if scrub_first and not dry_run:
+            report = delete_phase([reddit], scrubbed, {"comment": log}, source)
+            deleted = sum(report["deleted"].values())
+            if report["outage"] is not None:
+                print(outage_summary(report["outage"], deleted, "comment"))
+                sys.exit(1)
+    return deleted
+
+
+def delete_old_comments(reddit, username, days_old, *, dry_run=False, total=None, matcher=None, scrub_first=False):
     """
     Delete comments older than a specified number of days.
 
@@ -24,8 +89,15 @@ def delete_old_comments(reddit, username, days_old, comments_deleted, *, dry_run
         reddit (praw.Reddit): Authenticated Reddit instance.
         username (str): Reddit username.
         days_old (int): Age limit for comments (in days).
-        comments_deleted (list): A list to store deleted comments.
         dry_run (bool): If True, log matches but do not delete.
+        total (int): Expected number of comments scanned, for the progress ETA.
+        matcher (PatternMatcher): If given, only comments whose body matches
+            one of its rules are deleted.
+        scrub_first (bool): Overwrite every match during the scan and delete
+            them all afterwards.
+
+    Returns:
+        int: Comments deleted (or matched in dry-run).
 
     Notes:
         Since comments.new() is sorted newest-first, once a comment that meets
@@ -36,142 +108,161 @@ def delete_old_comments(reddit, username, days_old, comments_deleted, *, dry_run
     now = time.time()
     past_cutoff = False
 
-    with open("deleted_comments.txt", "a", encoding="utf-8") as log_file:
-        for n, comment in enumerate(
-            reddit.redditor(username).comments.new(limit=None), 1
-        ):
-            print(f"\r  Scanning… {n} comment(s) fetched", end="", flush=True)
-
-            if not past_cutoff:
-                if now - comment.created_utc <= threshold_secs:
-                    continue  # too new; older comments follow later in the stream
-                past_cutoff = True  # all subsequent comments are also old enough
-
-            if dry_run:
-                print(
-                    f"\n  [DRY RUN] Would delete (score={comment.score})"
-                    f" in r/{comment.subreddit}: {comment.body[:60]!r}"
-                )
-                comments_deleted.append(comment)
-                continue
-
-            log_file.write(json.dumps(build_deletion_record(comment, "comment", "cli-mode-1")) + "\n")
-            try:
-                edit_and_delete(comment, "comment")
-                comments_deleted.append(comment)
-            except (praw.exceptions.APIException, prawcore.exceptions.TooManyRequests) as e:
-                print(f"\n  Error deleting comment: {e}")
-
-    print()  # newline after the progress counter
+    def old_enough(comment):
+        nonlocal past_cutoff
+        if not past_cutoff:
+            if now - comment.created_utc <= threshold_secs:
+                return False  # too new; older comments follow later in the stream
+            past_cutoff = True  # all subsequent comments are also old enough
+        return True
+
+    return _delete_matching(
+        reddit, username, old_enough, "cli-mode-1",
+        dry_run=dry_run, total=total, matcher=matcher, scrub_first=scrub_first,
+    )
 
 
-def remove_comments_with_negative_karma(reddit, username, comments_deleted, *, dry_run=False):
+def remove_comments_with_negative_karma(reddit, username, *, dry_run=False, total=None, matcher=None,
+                                        scrub_first=False):
     """
     Remove comments with negative karma.
 
     Args:
         reddit (praw.Reddit): Authenticated Reddit instance.
         username (str): Reddit username.
-        comments_deleted (list): A list to store deleted comments.
         dry_run (bool): If True, log matches but do not delete.
+        total (int): Expected number of comments scanned, for the progress ETA.
+        matcher (PatternMatcher): If given, only comments whose body matches
+            one of its rules are deleted.
+        scrub_first (bool): Overwrite every match during the scan and delete
+            them all afterwards.
+
+    Returns:
+        int: Comments deleted (or matched in dry-run).
 
     Notes:
         This function will remove comments with a negative karma score.
     """
-    with open("deleted_comments.txt", "a", encoding="utf-8") as log_file:
-        for n, comment in enumerate(
-            reddit.redditor(username).comments.new(limit=None), 1
-        ):
-            print(f"\r  Scanning… {n} comment(s) fetched", end="", flush=True)
-
-            if comment.score > 0:
-                continue
-
-            if dry_run:
-                print(
-                    f"\n  [DRY RUN] Would delete (score={comment.score})"
-                    f" in r/{comment.subreddit}: {comment.body[:60]!r}"
-                )
-                comments_deleted.append(comment)
-                continue
-
-            log_file.write(json.dumps(build_deletion_record(comment, "comment", "cli-mode-2")) + "\n")
-            try:
-                edit_and_delete(comment, "comment")
-                comments_deleted.append(comment)
-            except (praw.exceptions.APIException, prawcore.exceptions.TooManyRequests) as e:
-                print(f"\n  Error removing comment: {e}")
-
-    print()
+    return _delete_matching(
+        reddit, username, lambda comment: comment.score <= 0, "cli-mode-2",
+        dry_run=dry_run, total=total, matcher=matcher, scrub_first=scrub_first,
+    )
 
 
-def remove_comments_with_one_karma_and_no_replies(
-    reddit, username, comments_deleted, *, dry_run=False
-):
+def remove_comments_with_one_karma_and_no_replies(reddit, username, *, dry_run=False, total=None, matcher=None,
+                                                  scrub_first=False):
     """
     Remove comments with one karma, no replies, and are at least a week old.
 
     Args:
         reddit (praw.Reddit): Authenticated Reddit instance.
         username (str): Reddit username.
-        comments_deleted (list): A list to store deleted comments.
         dry_run (bool): If True, log matches but do not delete.
+        total (int): Expected number of comments scanned, for the progress ETA.
+        matcher (PatternMatcher): If given, only comments whose body matches
+            one of its rules are deleted.
+        scrub_first (bool): Overwrite every match during the scan and delete
+            them all afterwards.
+
+    Returns:
+        int: Comments deleted (or matched in dry-run).
 
     Notes:
-        comment.refresh() is called so that comment.replies is populated;
-        PRAW does not fill it for listing results without an explicit refresh.
+        Listing results don't include replies, so the reply count is fetched
+        (one request) only for comments that already pass the score and age
+        checks; the reply forest is dropped right after counting.
     """
-    one_week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-
-    with open("deleted_comments.txt", "a", encoding="utf-8") as log_file:
-        for n, comment in enumerate(
-            reddit.redditor(username).comments.new(limit=None), 1
-        ):
-            print(f"\r  Scanning… {n} comment(s) fetched", end="", flush=True)
-
-            # comment.replies is not populated by default; refresh() fetches the full thread
-            comment.refresh()
-            created = datetime.fromtimestamp(comment.created_utc, tz=timezone.utc)
-            if not (comment.score <= 1 and len(comment.replies) == 0 and created < one_week_ago):
-                continue
-
-            if dry_run:
-                print(
-                    f"\n  [DRY RUN] Would delete (score={comment.score})"
-                    f" in r/{comment.subreddit}: {comment.body[:60]!r}"
-                )
-                comments_deleted.append(comment)
-                continue
-
-            log_file.write(json.dumps(build_deletion_record(comment, "comment", "cli-mode-3")) + "\n")
-            try:
-                edit_and_delete(comment, "comment")
-                comments_deleted.append(comment)
-            except (praw.exceptions.APIException, prawcore.exceptions.TooManyRequests) as e:
-                print(f"\n  Error removing comment: {e}")
+    one_week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).timestamp()
 
-    print()
+    def unanswered(comment):
+        return comment.score <= 1 and comment.created_utc < one_week_ago and comment.reply_count() == 0
 
+    return _delete_matching(
+        reddit, username, unanswered, "cli-mode-3",
+        dry_run=dry_run, total=total, matcher=matcher, scrub_first=scrub_first,
+    )
+
+
+def estimate_mode(reddit, username, action, days_old=None, *, dry_run=False, matcher=None):
+    """Estimate requests and wall time for deletion mode *action* ("1"-"3").
+
+    Mode 3's reply check needs a refresh() per comment, so the sample can
+    only apply its score and age conditions; the match count is an upper bound.
+    The run only refreshes comments that pass those conditions, so that is
+    also the refresh count.
+    """
+    now = time.time()
 
-def main():
-    parser = argparse.ArgumentParser(description="Interactive Reddit comment cleaner")
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Preview which comments would be deleted without making any changes",
+    def mode_predicate(comment):
+        if action == "1":
+            return now - comment.created_utc > days_old * 86400
+        if action == "2":
+            return comment.score <= 0
+        return comment.score <= 1 and now - comment.created_utc > 7 * 86400
+
+    def predicate(comment):
+        if matcher and matcher.match_item(comment, "comment") is None:
+            return False
+        return mode_predicate(comment)
+
+    return estimate_scan(
+        reddit,
+        reddit.redditor(username).comments.new,
+        predicate,
+        "comment",
+        refresh_matched=action == "3",
+        dry_run=dry_run,
     )
-    args = parser.parse_args()
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=COMMENTS_DESCRIPTION)
+    add_comments_arguments(parser)
+    run(parser, parser.parse_args(argv))
+
+
+def run(parser, args):
+    """Run the cleaner with parsed *args* (also used by ``reddit-clean comments``)."""
+    if args.ids is sys.stdin and not args.yes:
+        parser.error("--ids - reads stdin, so pass --yes to skip the confirmation prompt")
+    matcher = None
+    if args.patterns:
+        try:
+            matcher = PatternMatcher.from_file(args.patterns)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    if args.trace:
+        TRACER.start(args.trace)
+    start_session(parser, args)
     client_id, client_secret, username, password = get_reddit_credentials()
+    try:
+        client_pairs = get_extra_clients() if args.ids and not args.dry_run else []
+    except ValueError as e:
+        parser.error(f"Credentials.txt: {e}")
 
-    if not confirm_and_run():
+    if not args.yes and not confirm_and_run():
         print("Script aborted.")
         return
 
     reddit = initialize_reddit(client_id, client_secret, username, password)
 
-    comments_deleted = []
+    if args.ids:
+        extra_clients = connect_clients(client_pairs, username, password)
+        with args.ids:
+            delete_by_ids(
+                reddit, args.ids, "t1",
+                dry_run=args.dry_run, extra_clients=extra_clients, scrub_first=args.scrub_first,
+            )
+        return
+
+    if matcher:
+        print(f"Only comments matching one of {len(matcher)} text rule(s) will be deleted.")
 
+    modes = {
+        "2": ("Removing comments with negative karma", remove_comments_with_negative_karma),
+        "3": ("Removing comments with 1 karma and no replies", remove_comments_with_one_karma_and_no_replies),
+    }
     while True:
         action = input(
             "Choose an action"
@@ -181,34 +272,36 @@ def main():
             " 4 - Quit): "
         )
 
+        if action == "4":
+            break
+        if action not in ("1", "2", "3"):
+            print("Invalid choice. Please select a valid option.")
+            continue
+
+        days_old = None
         if action == "1":
             days_old = get_days_old("Enter how old (in days) the comments should be: ")
+
+        estimate = estimate_mode(reddit, username, action, days_old, dry_run=args.dry_run, matcher=matcher)
+        print(format_estimate(estimate))
+        if not args.yes and not confirm_and_run():
+            print("Skipped.")
+            continue
+
+        options = dict(dry_run=args.dry_run, total=estimate["items"], matcher=matcher, scrub_first=args.scrub_first)
+        if action == "1":
             print(f"Working (Deleting comments older than {days_old} day(s))…")
-            delete_old_comments(
-                reddit, username, days_old, comments_deleted, dry_run=args.dry_run
-            )
-        elif action == "2":
-            print("Working (Removing comments with negative karma)…")
-            remove_comments_with_negative_karma(
-                reddit, username, comments_deleted, dry_run=args.dry_run
-            )
-        elif action == "3":
-            print("Working (Removing comments with 1 karma and no replies)…")
-            remove_comments_with_one_karma_and_no_replies(
-                reddit, username, comments_deleted, dry_run=args.dry_run
-            )
-        elif action == "4":
-            break
+            deleted = delete_old_comments(reddit, username, days_old, **options)
         else:
-            print("Invalid choice. Please select a valid option.")
-            continue
+            description, remove = modes[action]
+            print(f"Working ({description})…")
+            deleted = remove(reddit, username, **options)
 
         time.sleep(1)
 
-        if comments_deleted:
+        if deleted:
             label = "would delete" if args.dry_run else "deleted"
-            print(f"The script {label} {len(comments_deleted)} comment(s).")
-            comments_deleted = []
+            print(f"The script {label} {deleted} comment(s).")
         else:
             print("There were no comments to delete.")
 
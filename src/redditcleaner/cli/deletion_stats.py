@@ -0,0 +1,61 @@
+import argparse
+import json
+
+from redditcleaner.cli.parsers import LOG_DESCRIPTION, add_log_arguments
+from redditcleaner.stats import SCORE_BUCKETS, load_stats, rewrite_stats
+
+TOP_N = 10
+
+
+def print_summary(stats):
+    """Print a human-readable report of the aggregates in *stats*."""
+    print(f"Total deleted: {stats['total']}")
+    if not stats["total"]:
+        return
+
+    by_type = stats["by_type"]
+    print(f"  comments: {by_type.get('comment', 0)}   posts: {by_type.get('post', 0)}")
+
+    print("\nBy source:")
+    for source, n in sorted(stats["by_source"].items(), key=lambda kv: -kv[1]):
+        print(f"  {source:<12} {n:>8}")
+
+    print(f"\nTop {TOP_N} subreddits:")
+    top = sorted(stats["by_subreddit"].items(), key=lambda kv: -kv[1])[:TOP_N]
+    for subreddit, n in top:
+        print(f"  r/{subreddit:<24} {n:>8}")
+
+    print("\nBy month (deleted_at):")
+    for month, n in sorted(stats["by_month"].items()):
+        print(f"  {month}  {n:>8}")
+
+    dist = stats["score"]
+    scored = sum(dist["histogram"].values())
+    print("\nScore distribution:")
+    for bucket in SCORE_BUCKETS:
+        print(f"  {bucket:>6}  {dist['histogram'].get(bucket, 0):>8}")
+    if scored:
+        print(f"  min {dist['min']}  max {dist['max']}  mean {dist['sum'] / scored:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=LOG_DESCRIPTION)
+    add_log_arguments(parser)
+    run(parser, parser.parse_args(argv))
+
+
+def run(parser, args):
+    """Print (or rebuild) the stats with parsed *args* (also used by ``reddit-clean log``)."""
+    if args.rebuild:
+        stats = rewrite_stats(args.log_dir)
+    else:
+        stats = load_stats(args.log_dir)
+
+    if args.json:
+        print(json.dumps(stats, indent=2, sort_keys=True))
+    else:
+        print_summary(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+
+from redditcleaner.archive import default_filename, export_history
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.cli.parsers import EXPORT_DESCRIPTION, add_export_arguments
+from redditcleaner.progress import Progress
+from redditcleaner.utils import get_reddit_credentials, initialize_reddit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=EXPORT_DESCRIPTION)
+    add_export_arguments(parser)
+    run(parser, parser.parse_args(argv))
+
+
+def run(parser, args):
+    """Export the history with parsed *args* (also used by ``reddit-clean export``)."""
+    if args.row_group_size < 1:
+        parser.error("--row-group-size must be at least 1")
+    kinds = ("comment", "post") if args.kind == "all" else (args.kind,)
+
+    client_id, client_secret, username, password = get_reddit_credentials()
+    reddit = initialize_reddit(client_id, client_secret, username, password)
+    output = args.output or default_filename(username, args.format)
+
+    try:
+        with Progress("item") as progress:
+            counts = export_history(
+                reddit, username, output,
+                fmt=args.format, kinds=kinds, progress=progress, row_group_size=args.row_group_size,
+            )
+    except CircuitOpenError as e:
+        print(f"Export stopped: {e}. {output} is incomplete; re-run once Reddit recovers.")
+        sys.exit(1)
+
+    size_mb = os.path.getsize(output) / 1e6
+    print(f"Exported {counts['comment']} comment(s) and {counts['post']} post(s) to {output} ({size_mb:.1f} MB).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Bulk deletion from an externally computed list of ids.
+
+Used by the ``--ids`` option of ``reddit-clean-comments`` and
+``reddit-clean-posts``. Ids are read one per line (blank lines and ``#``
+comments are ignored), hydrated 100 at a time via /api/info, and pushed
+through ``delete_once`` without scanning the account history. Listed items
+posted by another account are skipped with a note. With extra
+OAuth clients configured, the list is split across them (see
+redditcleaner.shards); with ``--scrub-first`` every item is overwritten
+before any is deleted (see redditcleaner.scrub).
+"""
+
+import sys
+
+from redditcleaner.circuit import CircuitOpenError, outage_summary
+from redditcleaner.progress import Progress
+from redditcleaner.scrub import format_phases, scrub_then_delete
+from redditcleaner.shards import delete_sharded, format_shard_report
+from redditcleaner.stats import DeletionLog
+from redditcleaner.utils import (
+    DELETE_ERRORS,
+    FOREIGN_NOTE,
+    SKIPPED_NOTE,
+    delete_once,
+    iter_info,
+)
+
+
+def iter_fullnames(lines, kind):
+    """Yield fullnames from *lines*, prefixing bare ids with *kind*.
+
+    Args:
+        lines: Iterable of text lines (an open file or sys.stdin).
+        kind (str): Default type prefix for bare ids — "t1" (comment) or "t3" (post).
+
+    Yields:
+        str: Fullnames such as "t1_abc123".
+    """
+    for line in lines:
+        token = line.strip()
+        if not token or token.startswith("#"):
+            continue
+        if not token.startswith(("t1_", "t3_")):
+            token = f"{kind}_{token}"
+        yield token
+
+
+def delete_by_ids(reddit, lines, kind, *, dry_run=False, extra_clients=(), scrub_first=False):
+    """Delete every still-existing item listed in *lines*.
+
+    Args:
+        reddit (praw.Reddit): Authenticated Reddit instance.
+        lines: Iterable of id lines; read lazily, so stdin can be streamed.
+        kind (str): Prefix for bare ids — "t1" or "t3". Prefixed ids of
+            either type are accepted regardless.
+        dry_run (bool): If True, log matches but do not delete.
+        extra_clients (list): More praw.Reddit instances for the same account,
+            each with its own rate budget; deletions are spread across them
+            and *reddit*. Ignored in dry-run.
+        scrub_first (bool): Overwrite every listed item before deleting any.
+            Ignored in dry-run.
+
+    Returns:
+        tuple: (requested, deleted) — ids read and items deleted (or matched in dry-run).
+    """
+    requested = 0
+    # The list comes from outside the account's history, so it may name anyone's items
+    owner = str(reddit.user.me())
+
+    def counted(fullnames):
+        nonlocal requested
+        for fullname in fullnames:
+            requested += 1
+            yield fullname
+
+    if scrub_first and not dry_run:
+        return _scrub_then_delete([reddit, *extra_clients], iter_fullnames(lines, kind), owner)
+    if extra_clients and not dry_run:
+        return _delete_sharded(reddit, iter_fullnames(lines, kind), extra_clients, owner)
+
+    deleted = foreign = 0
+    with DeletionLog("deleted_comments.txt", "comment") as comment_log, \
+         DeletionLog("deleted_posts.txt", "post") as post_log, \
+         Progress("listed item") as progress:
+        for item in iter_info(reddit, counted(iter_fullnames(lines, kind))):
+            progress.advance()
+            is_comment = item.fullname.startswith("t1_")
+            label = "comment" if is_comment else "post"
+            log = comment_log if is_comment else post_log
+
+            if str(item.author) != owner:
+                foreign += 1
+                progress.write(f"  Skipped {label} {item.fullname}: {FOREIGN_NOTE}")
+                continue
+            if dry_run:
+                progress.write(f"  [DRY RUN] Would delete {label} {item.fullname} (score={item.score}) in r/{item.subreddit}")
+                deleted += 1
+                continue
+
+            try:
+                if not delete_once(item, label, log, "cli-ids"):
+                    progress.write(f"  Skipped {label} {item.fullname}: {SKIPPED_NOTE}")
+                    continue
+                deleted += 1
+                progress.write(f"  Deleted {label} {item.fullname} in r/{item.subreddit}")
+            except DELETE_ERRORS as e:
+                progress.write(f"  Error deleting {label} {item.fullname}: {e}")
+            except CircuitOpenError as e:
+                progress.write(outage_summary(e, deleted, "listed item"))
+                sys.exit(1)
+
+    skipped = requested - deleted
+    label = "would delete" if dry_run else "Deleted"
+    print(f"{label} {deleted} of {requested} listed item(s); {skipped} already gone, skipped or failed.")
+    _print_foreign(foreign)
+    return requested, deleted
+
+
+def _print_foreign(count):
+    if count:
+        print(f"Left {count} listed item(s) posted by another account alone.")
+
+
+def _delete_sharded(reddit, fullnames, extra_clients, owner):
+    clients = [reddit, *extra_clients]
+    print(f"Spreading deletions across {len(clients)} OAuth clients.")
+    with DeletionLog("deleted_comments.txt", "comment") as comment_log, \
+         DeletionLog("deleted_posts.txt", "post") as post_log, \
+         Progress("listed item") as progress:
+        report = delete_sharded(
+            clients, fullnames, {"comment": comment_log, "post": post_log}, "cli-ids", progress=progress,
+            owner=owner,
+        )
+    deleted = sum(report["deleted"].values())
+    if report["outage"] is not None:
+        print(outage_summary(report["outage"], deleted, "listed item"))
+        sys.exit(1)
+
+    requested = report["requested"]
+    print(format_shard_report(report))
+    print(f"Deleted {deleted} of {requested} listed item(s); {requested - deleted} already gone, skipped or failed.")
+    _print_foreign(report["foreign"])
+    return requested, deleted
+
+
+def _scrub_then_delete(clients, fullnames, owner):
+    with DeletionLog("deleted_comments.txt", "comment") as comment_log, \
+         DeletionLog("deleted_posts.txt", "post") as post_log:
+        scrubbed, deleted = scrub_then_delete(clients, fullnames, {"comment": comment_log, "post": post_log}, "cli-ids",
+                                              owner=owner)
+    print(format_phases(scrubbed, deleted))
+    _print_foreign(scrubbed["foreign"])
+    report = deleted if deleted is not None else scrubbed
+    count = sum(deleted["deleted"].values()) if deleted is not None else 0
+    if report["outage"] is not None:
+        print(outage_summary(report["outage"], count, "listed item"))
+        sys.exit(1)
+    return scrubbed["requested"], count
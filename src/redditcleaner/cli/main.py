@@ -0,0 +1,101 @@
+"""``reddit-clean`` — one entry point for all cleanup commands.
+
+Usage:
+    reddit-clean comments [--dry-run] [--ids FILE] [--patterns FILE] [--scrub-first] [-y] [--trace FILE]
+    reddit-clean posts    [--dry-run] [--ids FILE] [--patterns FILE] [--scrub-first] [-y] [--trace FILE]
+    reddit-clean weekly   [--dry-run] [--estimate] [--full] [--scrub-first] [--trace FILE]
+    reddit-clean web      [--host HOST] [--port PORT] [--debug] [--async] [--trace FILE]
+
+    comments, posts, weekly and web also take
+    [--record FILE | --replay FILE [--replay-speed X]]
+    reddit-clean log      [--log-dir DIR] [--rebuild] [--json]
+    reddit-clean export   [--format parquet|arrow] [-o FILE] [--kind KIND]
+
+Arguments are parsed with the stdlib-only definitions in ``parsers``; the
+module implementing the chosen command (and with it praw, prawcore or
+Flask) is imported only after parsing succeeds, so ``--help``, argument
+errors and the offline ``log`` command start quickly.
+"""
+
+import argparse
+import importlib
+import sys
+
+from redditcleaner import __version__
+from redditcleaner.cli import parsers
+
+# name: (help, description, add_arguments, "module:function" taking (parser, args))
+COMMANDS = {
+    "comments": (
+        "Delete comments interactively",
+        parsers.COMMENTS_DESCRIPTION,
+        parsers.add_comments_arguments,
+        "redditcleaner.cli.comment_cleaner:run",
+    ),
+    "posts": (
+        "Delete posts older than N days",
+        parsers.POSTS_DESCRIPTION,
+        parsers.add_posts_arguments,
+        "redditcleaner.cli.post_cleaner:run",
+    ),
+    "weekly": (
+        "Run the weekly cleanup rules once",
+        parsers.WEEKLY_DESCRIPTION,
+        parsers.add_weekly_arguments,
+        "redditcleaner.ci.weekly_cleanup:run",
+    ),
+    "web": (
+        "Serve the web dashboard",
+        parsers.WEB_DESCRIPTION,
+        parsers.add_web_arguments,
+        "redditcleaner.web.app:serve",
+    ),
+    "log": (
+        "Summarize the deletion logs",
+        parsers.LOG_DESCRIPTION,
+        parsers.add_log_arguments,
+        "redditcleaner.cli.deletion_stats:run",
+    ),
+    "export": (
+        "Export your history to Parquet/Arrow",
+        parsers.EXPORT_DESCRIPTION,
+        parsers.add_export_arguments,
+        "redditcleaner.cli.export:run",
+    ),
+}
+
+# Commands whose implementation needs an optional extra
+EXTRAS = {"web": ("flask", "flask_wtf"), "export": ("pyarrow",)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="reddit-clean", description="Bulk-delete Reddit comments and posts")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+    for name, (help_text, description, add_arguments, _target) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text, description=description)
+        add_arguments(subparser)
+        subparser.set_defaults(command_parser=subparser)
+    return parser
+
+
+def load_command(name):
+    """Import and return the function implementing command *name*."""
+    module_name, function_name = COMMANDS[name][3].split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        command = load_command(args.command)
+    except ModuleNotFoundError as e:
+        if e.name not in EXTRAS.get(args.command, ()):
+            raise
+        parser.error(f"'{args.command}' needs the {args.command} extra: pip install 'redditcleaner[{args.command}]'")
+    return command(args.command_parser, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
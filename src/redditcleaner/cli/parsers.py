@@ -0,0 +1,179 @@
+"""Argument definitions for every command, kept free of heavy imports.
+
+Both the individual console scripts and the unified ``reddit-clean``
+command build their parsers from these functions, so ``--help`` and
+argument errors are handled before praw, prawcore or Flask are imported.
+Only the standard library may be imported here.
+"""
+
+import argparse
+import os
+
+COMMENTS_DESCRIPTION = "Interactive Reddit comment cleaner"
+POSTS_DESCRIPTION = "Interactive Reddit post cleaner"
+WEEKLY_DESCRIPTION = "Weekly Reddit comment/post cleanup"
+WEB_DESCRIPTION = "Run the web dashboard"
+LOG_DESCRIPTION = "Summarize deletions from deletion_stats.json"
+EXPORT_DESCRIPTION = "Export your full comment/post history to a Parquet or Arrow file"
+
+# Mirrors redditcleaner.archive.FORMATS, which needs pyarrow to import
+EXPORT_FORMATS = ("parquet", "arrow")
+
+
+def _add_trace_argument(parser):
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write a timeline of every API request and rate-limit sleep to FILE"
+        " (Chrome trace-event JSON; open in ui.perfetto.dev)",
+    )
+
+
+def _add_session_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Save every API request with its anonymized response, size and latency to FILE,"
+        " for an offline --replay",
+    )
+    group.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Answer API requests from a session saved with --record, with its recorded latencies,"
+        " instead of calling Reddit",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        metavar="X",
+        help="Replay X times faster than recorded; 0 skips the waits (default: 1)",
+    )
+
+
+def _add_scrub_argument(parser, noun, default=False):
+    parser.add_argument(
+        "--scrub-first",
+        action="store_true",
+        default=default,
+        help=f"Overwrite all matching {noun} first, then delete them in a second pass,"
+        " so no original text stays up while the deletions wait for the rate limit",
+    )
+
+
+def _add_cleaner_arguments(parser, noun, field):
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help=f"Preview which {noun} would be deleted without making any changes",
+    )
+    parser.add_argument(
+        "--ids",
+        type=argparse.FileType("r", encoding="utf-8"),
+        metavar="FILE",
+        help="Delete the ids/fullnames listed in FILE (one per line, '-' for stdin) instead of scanning",
+    )
+    parser.add_argument(
+        "--patterns",
+        metavar="FILE",
+        help=f"Only delete {noun} whose {field} matches a keyword or re: rule in FILE (one per line)",
+    )
+    _add_scrub_argument(parser, noun)
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="Skip the confirmation prompt",
+    )
+    _add_trace_argument(parser)
+    _add_session_arguments(parser)
+
+
+def add_comments_arguments(parser):
+    _add_cleaner_arguments(parser, "comments", "body")
+
+
+def add_posts_arguments(parser):
+    _add_cleaner_arguments(parser, "posts", "title")
+
+
+def add_weekly_arguments(parser):
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=os.environ.get("DRY_RUN", "0") == "1",
+        help="Preview which items would be deleted without making any changes",
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Only print the request count and wall-time estimate, then exit",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Walk the whole history instead of only new activity and watched items",
+    )
+    _add_scrub_argument(parser, "items", default=os.environ.get("SCRUB_FIRST", "0") == "1")
+    _add_trace_argument(parser)
+    _add_session_arguments(parser)
+
+
+def add_web_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=5000, help="Port to listen on (default: 5000)")
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=os.environ.get("FLASK_DEBUG") == "1",
+        help="Run Flask in debug mode (default: FLASK_DEBUG=1)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Serve the ASGI app (Quart + Async PRAW) so one process handles many sessions;"
+        " needs the async extra",
+    )
+    _add_trace_argument(parser)
+    _add_session_arguments(parser)
+
+
+def add_log_arguments(parser):
+    parser.add_argument(
+        "--log-dir",
+        default=os.environ.get("LOG_DIR", os.getcwd()),
+        help="Directory containing the deletion logs (default: LOG_DIR or the current directory)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute the stats file by re-parsing the deletion logs",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the raw aggregates as JSON")
+
+
+def add_export_arguments(parser):
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="parquet",
+        help="Parquet (smallest on disk) or Arrow IPC (fastest to load) (default: parquet)",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="File to write (default: <username>_history.parquet / .arrow in the current directory)",
+    )
+    parser.add_argument(
+        "--kind",
+        choices=("all", "comment", "post"),
+        default="all",
+        help="Export only comments or only posts (default: all)",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=50_000,
+        metavar="N",
+        help="Items buffered per row group; bounds memory use (default: 50000)",
+    )
@@ -1,21 +1,38 @@
 import argparse
-import json
+import sys
 import time
 
-import praw
-import prawcore
-
+from redditcleaner.circuit import CircuitOpenError, outage_summary
+from redditcleaner.cli.id_list import delete_by_ids
+from redditcleaner.cli.parsers import POSTS_DESCRIPTION, add_posts_arguments
+from redditcleaner.estimate import estimate_scan, format_estimate
+from redditcleaner.items import act, scan, select
+from redditcleaner.patterns import PatternMatcher
+from redditcleaner.progress import Progress
+from redditcleaner.replay import start_session
+from redditcleaner.scrub import delete_phase
+from redditcleaner.shards import connect_clients
+from redditcleaner.stats import DeletionLog
+from redditcleaner.tracing import TRACER
 from redditcleaner.utils import (
-    build_deletion_record,
+    DELETE_ERRORS,
+    SKIPPED_NOTE,
     confirm_and_run,
-    edit_and_delete,
+    delete_once,
     get_days_old,
+    get_extra_clients,
     get_reddit_credentials,
     initialize_reddit,
+    iter_listing,
+    scrub_once,
 )
 
 
-def delete_old_posts(reddit, username, days_old, *, dry_run=False):
+def _describe(submission):
+    return f"'{submission.title}' (score={submission.score}) in r/{submission.subreddit}"
+
+
+def delete_old_posts(reddit, username, days_old, *, dry_run=False, total=None, matcher=None, scrub_first=False):
     """
     Delete posts older than a specified number of days.
 
@@ -24,62 +41,124 @@ def delete_old_posts(reddit, username, days_old, *, dry_run=False):
         username (str): Reddit username.
         days_old (int): The age limit for posts.
         dry_run (bool): If True, log matches but do not delete.
+        total (int): Expected number of posts scanned, for the progress ETA.
+        matcher (PatternMatcher): If given, only posts whose title matches
+            one of its rules are deleted.
+        scrub_first (bool): Overwrite every match during the scan and delete
+            them all afterwards.
 
     Returns:
         int: The number of posts successfully deleted (or matched in dry-run).
     """
     threshold = time.time() - days_old * 86400
     posts_deleted = 0
-
-    with open("deleted_posts.txt", "a", encoding="utf-8") as log_file:
-        for n, submission in enumerate(
-            reddit.redditor(username).submissions.new(limit=None), 1
-        ):
-            print(f"\r  Scanning… {n} post(s) fetched", end="", flush=True)
-
-            if submission.created_utc >= threshold:
-                continue  # too new
-
-            if dry_run:
-                print(
-                    f"\n  [DRY RUN] Would delete '{submission.title}'"
-                    f" (score={submission.score}) in r/{submission.subreddit}"
-                )
-                posts_deleted += 1
-                continue
-
-            log_file.write(json.dumps(build_deletion_record(submission, "post", "cli")) + "\n")
+    scrubbed = []
+    action, verb = (scrub_once, "Scrubbed") if scrub_first else (delete_once, "Deleted")
+
+    with DeletionLog("deleted_posts.txt", "post") as log:
+        with Progress("post", total) as progress:
+
+            def delete(submission, matched):
+                try:
+                    if action(submission, "post", log, "cli", matched):
+                        progress.write(f"  {verb} post: {submission.title}")
+                        return True
+                    progress.write(f"  Skipped post {submission.id}: {SKIPPED_NOTE}")
+                except DELETE_ERRORS as e:
+                    progress.write(f"  Error removing post: {e}")
+                return False
+
+            if scrub_first and not dry_run:
+                progress.write("Phase 1/2: overwriting matching posts while scanning…")
+            posts = iter_listing(reddit.redditor(username).submissions.new(limit=None), "post page")
+            snapshots = scan(posts, reddit, progress)
+            selected = select(snapshots, lambda s: s.created_utc < threshold, matcher, "post")
             try:
-                edit_and_delete(submission, "post")
-                posts_deleted += 1
-                print(f"\n  Deleted post: {submission.title}")
-            except (praw.exceptions.APIException, prawcore.exceptions.TooManyRequests) as e:
-                print(f"\n  Error removing post: {e}")
+                for submission in act(selected, delete, _describe, progress, dry_run=dry_run):
+                    posts_deleted += 1
+                    if scrub_first:
+                        scrubbed.append(submission.fullname)
+            except CircuitOpenError as e:
+                progress.write(outage_summary(e, 0 if scrub_first else posts_deleted, "post"))
+                sys.exit(1)
+
+        if scrub_first and not dry_run:
+            report = delete_phase([reddit], scrubbed, {"post": log}, "cli")
+            posts_deleted = sum(report["deleted"].values())
+            if report["outage"] is not None:
+                print(outage_summary(report["outage"], posts_deleted, "post"))
+                sys.exit(1)
 
-    print()  # newline after the progress counter
     label = "would delete" if dry_run else "Deleted"
     print(f"{label} {posts_deleted} post(s).")
     return posts_deleted
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Interactive Reddit post cleaner")
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Preview which posts would be deleted without making any changes",
-    )
-    args = parser.parse_args()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=POSTS_DESCRIPTION)
+    add_posts_arguments(parser)
+    run(parser, parser.parse_args(argv))
+
+
+def run(parser, args):
+    """Run the cleaner with parsed *args* (also used by ``reddit-clean posts``)."""
+    if args.ids is sys.stdin and not args.yes:
+        parser.error("--ids - reads stdin, so pass --yes to skip the confirmation prompt")
+    matcher = None
+    if args.patterns:
+        try:
+            matcher = PatternMatcher.from_file(args.patterns)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
 
+    if args.trace:
+        TRACER.start(args.trace)
+    start_session(parser, args)
     client_id, client_secret, username, password = get_reddit_credentials()
+    try:
+        client_pairs = get_extra_clients() if args.ids and not args.dry_run else []
+    except ValueError as e:
+        parser.error(f"Credentials.txt: {e}")
 
-    if not confirm_and_run():
+    if not args.yes and not confirm_and_run():
         print("Script aborted.")
         return
 
     reddit = initialize_reddit(client_id, client_secret, username, password)
+
+    if args.ids:
+        extra_clients = connect_clients(client_pairs, username, password)
+        with args.ids:
+            delete_by_ids(
+                reddit, args.ids, "t3",
+                dry_run=args.dry_run, extra_clients=extra_clients, scrub_first=args.scrub_first,
+            )
+        return
     days_old = get_days_old("Enter how old (in days) the posts should be: ")
-    delete_old_posts(reddit, username, days_old, dry_run=args.dry_run)
+
+    threshold = time.time() - days_old * 86400
+
+    def predicate(submission):
+        if matcher and matcher.match_item(submission, "post") is None:
+            return False
+        return submission.created_utc < threshold
+
+    estimate = estimate_scan(
+        reddit,
+        reddit.redditor(username).submissions.new,
+        predicate,
+        "post",
+        dry_run=args.dry_run,
+    )
+    print(format_estimate(estimate))
+    if not args.yes and not confirm_and_run():
+        print("Script aborted.")
+        return
+
+    delete_old_posts(
+        reddit, username, days_old,
+        dry_run=args.dry_run, total=estimate["items"], matcher=matcher, scrub_first=args.scrub_first,
+    )
 
 
 if __name__ == "__main__":
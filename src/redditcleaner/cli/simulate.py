@@ -0,0 +1,111 @@
+import argparse
+import os
+import time
+
+from redditcleaner.simulator import SNAPSHOT_FILE, HistorySnapshot, parse_rule
+from redditcleaner.utils import get_reddit_credentials, initialize_reddit
+
+# The built-in cleanup modes expressed as simulator rules
+PRESETS = {
+    "cli-mode-2": [{"kind": "comment", "max_score": 0}],
+    "cli-mode-3": [{"kind": "comment", "max_score": 1, "max_replies": 0, "min_age_days": 7}],
+    "weekly": [{"max_score": 0}, {"max_score": 1, "min_age_days": 15}],
+}
+
+
+def check_reply_rules(snapshot, rules):
+    """Reject *rules* that filter comments on reply counts *snapshot* doesn't have.
+
+    Raises:
+        ValueError: If a rule that can match comments uses max_replies, but
+            the snapshot was captured without --with-replies.
+    """
+    if snapshot.has_reply_counts:
+        return
+    if any(rule.get("max_replies") is not None and rule.get("kind") != "post" for rule in rules):
+        raise ValueError(
+            "max_replies needs comment reply counts, which this snapshot lacks;"
+            " capture one with --refresh --with-replies"
+        )
+
+
+def print_counts(snapshot, rules):
+    """Evaluate *rules* against *snapshot* and print the matching counts."""
+    started = time.perf_counter()
+    counts = snapshot.count(rules)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"  Would delete {counts['comments']} comment(s) and {counts['posts']} post(s)"
+        f" of {len(snapshot)} item(s)  [{elapsed_ms:.1f} ms]"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Preview how many items a rule combination would delete, using a cached history snapshot"
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=SNAPSHOT_FILE,
+        help=f"Snapshot file to use (default: {SNAPSHOT_FILE})",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Capture a fresh snapshot from Reddit even if the file exists",
+    )
+    parser.add_argument(
+        "--with-replies",
+        action="store_true",
+        help="Record comment reply counts while capturing (one extra request per comment)",
+    )
+    parser.add_argument(
+        "--rule",
+        action="append",
+        default=[],
+        metavar="TERMS",
+        help="Rule such as 'max_score=1,min_age_days=14'; repeat to OR several rules",
+    )
+    parser.add_argument(
+        "--preset",
+        choices=sorted(PRESETS),
+        help="Evaluate one of the built-in cleanup modes",
+    )
+    args = parser.parse_args()
+
+    if args.refresh or not os.path.exists(args.snapshot):
+        client_id, client_secret, username, password = get_reddit_credentials()
+        reddit = initialize_reddit(client_id, client_secret, username, password)
+        snapshot = HistorySnapshot.capture(reddit, username, with_replies=args.with_replies)
+        snapshot.save(args.snapshot)
+        print(f"Saved snapshot of {len(snapshot)} item(s) to {args.snapshot}")
+    else:
+        snapshot = HistorySnapshot.load(args.snapshot)
+        taken = time.strftime("%Y-%m-%d %H:%M", time.gmtime(snapshot.taken_at))
+        print(f"Loaded snapshot of {len(snapshot)} item(s) taken {taken} UTC")
+
+    if args.preset or args.rule:
+        try:
+            rules = PRESETS.get(args.preset, []) + [parse_rule(r) for r in args.rule]
+            check_reply_rules(snapshot, rules)
+        except ValueError as e:
+            parser.error(str(e))
+        print_counts(snapshot, rules)
+        return
+
+    print("Enter rules such as 'max_score=1,min_age_days=14' (separate OR-ed rules with ';').")
+    while True:
+        text = input("Rule (blank to quit): ").strip()
+        if not text:
+            break
+        try:
+            rules = [parse_rule(part) for part in text.split(";")]
+            check_reply_rules(snapshot, rules)
+        except ValueError as e:
+            print(f"Error: {e}")
+            continue
+        print_counts(snapshot, rules)
+
+
+if __name__ == "__main__":
+    main()
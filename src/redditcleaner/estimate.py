@@ -0,0 +1,228 @@
+"""Pre-run request count and wall-time estimates for the cleanup modes.
+
+The estimate is built from a cheap sample — the first listing page of the
+account's history — plus the rate-limit state PRAW has seen so far
+(``reddit.auth.limits``). That page holds the newest items only, so age
+rules are projected rather than scaled: the rest of the history is assumed
+to go back at the sample's posting rate, and the sampled items are
+re-dated across that span to see which of them the rules would select
+there. Every cleanup costs one listing request per 100
+items scanned, optionally a refresh() per scanned or per matched item (comment
+mode 3 refreshes the comments its score and age conditions select), an
+optional fetch per matched item (the web app loads each selected item
+before logging it), and an edit plus a delete per matched item.
+"""
+
+import math
+import os
+import time
+
+from redditcleaner.simulator import KINDS, SNAPSHOT_FILE, HistorySnapshot
+
+LISTING_PAGE_SIZE = 100
+# Reddit listings stop after roughly this many items
+LISTING_CAP = 1000
+
+# Typical round trip for one API call when the quota is not the bottleneck
+REQUEST_LATENCY = 0.6
+# Reddit's rate-limit window and the quota assumed before any headers are seen
+RATE_WINDOW = 600
+DEFAULT_QUOTA = 1000
+
+# Points across the unsampled part of the history at which the sample is re-dated
+PROJECTION_STEPS = 10
+
+
+class _Redated:
+    """*item* as if it had been posted at *created_utc*, for projecting age rules."""
+
+    __slots__ = ("_item", "created_utc")
+
+    def __init__(self, item, created_utc):
+        self._item = item
+        self.created_utc = created_utc
+
+    def __getattr__(self, name):
+        return getattr(self._item, name)
+
+
+def sample_listing(listing):
+    """Fetch the first (newest) page of *listing*.
+
+    Args:
+        listing: A PRAW listing generator method such as
+            ``reddit.redditor(name).comments.new``.
+
+    Returns:
+        list: Up to LISTING_PAGE_SIZE items, newest first.
+    """
+    return list(listing(limit=LISTING_PAGE_SIZE))
+
+
+def extrapolate(sample, predicate, known_total=None, *, now=None):
+    """Project the matches in a first-page *sample* onto the whole history.
+
+    A short first page means the whole history was sampled. Otherwise the
+    history size is *known_total* if given (e.g. from a simulator snapshot)
+    or Reddit's listing cap. The unsampled items are older than the oldest
+    sampled one; assuming they go back at the sample's posting rate, the
+    sample is re-dated to PROJECTION_STEPS points across that span and
+    *predicate* decides at each, so rules such as "older than 30 days"
+    count the old items the newest page can't contain.
+
+    Args:
+        sample (list): Items from sample_listing().
+        predicate: Callable returning True for items that would be deleted.
+        known_total (int): Number of items in the history, if known.
+        now (float): Current unix time (defaults to time.time()).
+
+    Returns:
+        tuple: (total_items, matching_items)
+    """
+    matched = sum(1 for item in sample if predicate(item))
+    if len(sample) < LISTING_PAGE_SIZE:
+        return len(sample), matched
+    total = max(known_total or LISTING_CAP, len(sample))
+    unsampled = total - len(sample)
+    if not unsampled:
+        return total, matched
+
+    now = time.time() if now is None else now
+    oldest = min(item.created_utc for item in sample)
+    span = max(now - oldest, 1.0) / len(sample) * unsampled
+    projected = 0
+    for step in range(PROJECTION_STEPS):
+        posted = max(oldest - span * (step + 0.5) / PROJECTION_STEPS, 0.0)
+        projected += sum(1 for item in sample if predicate(_Redated(item, posted)))
+    return total, matched + round(projected / (PROJECTION_STEPS * len(sample)) * unsampled)
+
+
+def snapshot_total(kind, path=SNAPSHOT_FILE):
+    """Number of *kind* items ("comment"/"post") in a saved simulator snapshot, or None."""
+    if not os.path.exists(path):
+        return None
+    snapshot = HistorySnapshot.load(path)
+    return snapshot.kind.count(KINDS[kind])
+
+
+def estimate_cost(total_items, matches, *, refresh_each=False, refresh_matched=False,
+                  fetch_each=False, dry_run=False, limits=None, now=None, latency=REQUEST_LATENCY):
+    """Predict the requests and wall time a cleanup will need.
+
+    Args:
+        total_items (int): Items the run will scan (0 if it won't scan).
+        matches (int): Items the run will edit and delete.
+        refresh_each (bool): The run calls refresh() on every scanned item.
+        refresh_matched (bool): The run calls refresh() on every matched
+            item, dry run or not.
+        fetch_each (bool): The run fetches every matched item individually.
+        dry_run (bool): Nothing will be fetched, edited or deleted.
+        limits (dict): ``reddit.auth.limits``; defaults are assumed if empty.
+        now (float): Current unix time, needed to use ``reset_timestamp``.
+        latency (float): Seconds per request when not throttled.
+
+    Returns:
+        dict: {"items", "matches", "requests": {...}, "total_requests", "seconds"}
+    """
+    mutated = 0 if dry_run else matches
+    requests = {
+        "listing": math.ceil(total_items / LISTING_PAGE_SIZE),
+        "refresh": total_items if refresh_each else matches if refresh_matched else 0,
+        "fetch": mutated if fetch_each else 0,
+        "edit": mutated,
+        "delete": mutated,
+    }
+    total = sum(requests.values())
+    return {
+        "items": total_items,
+        "matches": matches,
+        "requests": requests,
+        "total_requests": total,
+        "seconds": wall_time(total, limits, now=now, latency=latency),
+    }
+
+
+def wall_time(n_requests, limits=None, *, now=None, latency=REQUEST_LATENCY):
+    """Seconds needed for *n_requests* under the current rate-limit state.
+
+    Requests within the remaining quota go at *latency* each; the rest have
+    to wait for the window to reset and then proceed at the quota's pace.
+    """
+    limits = limits or {}
+    remaining, used = limits.get("remaining"), limits.get("used")
+    quota = remaining + used if remaining is not None and used is not None else DEFAULT_QUOTA
+    if remaining is None:
+        remaining = quota
+
+    unthrottled = n_requests * latency
+    if n_requests <= remaining:
+        return unthrottled
+
+    reset_timestamp = limits.get("reset_timestamp")
+    if reset_timestamp is not None and now is not None:
+        until_reset = max(reset_timestamp - now, 0)
+    else:
+        until_reset = RATE_WINDOW
+    pace = max(latency, RATE_WINDOW / max(quota, 1))
+    return max(unthrottled, until_reset + (n_requests - remaining) * pace)
+
+
+def combine_estimates(estimates, limits=None, now=None, latency=REQUEST_LATENCY):
+    """Merge estimates for runs that share one rate-limit budget (e.g. comments then posts)."""
+    requests = {}
+    for estimate in estimates:
+        for kind, n in estimate["requests"].items():
+            requests[kind] = requests.get(kind, 0) + n
+    total = sum(requests.values())
+    return {
+        "items": sum(e["items"] for e in estimates),
+        "matches": sum(e["matches"] for e in estimates),
+        "requests": requests,
+        "total_requests": total,
+        "seconds": wall_time(total, limits, now=now, latency=latency),
+    }
+
+
+def format_duration(seconds):
+    if seconds < 90:
+        return f"{seconds:.0f} s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def estimate_scan(reddit, listing, predicate, kind, *, refresh_each=False, refresh_matched=False, dry_run=False):
+    """Sample the first page of *listing* and estimate a full scan-and-delete run.
+
+    See extrapolate() for how the page is projected onto the whole history.
+
+    Args:
+        reddit (praw.Reddit): Authenticated Reddit instance (for rate-limit state).
+        listing: PRAW listing method, e.g. ``reddit.redditor(name).comments.new``.
+        predicate: Callable returning True for items that would be deleted.
+        kind (str): "comment" or "post" — used to look up a snapshot total.
+        refresh_each (bool): The run refresh()es every scanned item.
+        refresh_matched (bool): The run refresh()es every item *predicate* selects.
+        dry_run (bool): Nothing will be edited or deleted.
+    """
+    now = time.time()
+    total, matches = extrapolate(sample_listing(listing), predicate, snapshot_total(kind), now=now)
+    return estimate_cost(
+        total, matches,
+        refresh_each=refresh_each,
+        refresh_matched=refresh_matched,
+        dry_run=dry_run,
+        limits=reddit.auth.limits,
+        now=now,
+    )
+
+
+def format_estimate(estimate):
+    """Render an estimate as a short multi-line summary for the CLI."""
+    r = estimate["requests"]
+    return (
+        f"Estimate: ~{estimate['matches']} of ~{estimate['items']} item(s) match.\n"
+        f"  {estimate['total_requests']} request(s): {r['listing']} listing, {r['refresh']} refresh,"
+        f" {r['fetch']} fetch, {r['edit']} edit, {r['delete']} delete\n"
+        f"  Expected wall time under the current rate limit: about {format_duration(estimate['seconds'])}"
+    )
@@ -0,0 +1,161 @@
+"""Compact item snapshots and the generator stages of a cleanup scan.
+
+A PRAW Comment or Submission carries every field of the API response, a
+reference to its Reddit instance and, after ``refresh()``, its whole reply
+forest. Scans only need a handful of fields, so each listing item is reduced
+to an ``ItemSnapshot`` as soon as it arrives and the PRAW object is dropped.
+Snapshots have everything the deletion rules, the text patterns and
+``build_deletion_record`` read, and can edit and delete the item themselves.
+
+A scan is three chained generators — ``scan`` → ``select`` → ``act`` — so
+one item is in flight at a time and memory stays flat however long the
+history is.
+"""
+
+from redditcleaner.patterns import describe_match
+from redditcleaner.utils import fetch
+
+COMMENT_PREFIX = "t1_"
+
+
+class ItemSnapshot:
+    """The fields of one comment or post that the cleanup code uses.
+
+    Args:
+        reddit (praw.Reddit): Instance used by edit() and delete().
+        fullname (str): "t1_…" for comments, "t3_…" for posts.
+        created_utc (float): Creation time.
+        score (int): Score when the snapshot was taken.
+        subreddit (str): Subreddit name.
+        permalink (str): Path of the item, without the host.
+        text (str): Comment body or post title.
+        num_comments (int): Reply count for posts; None for comments.
+        link_id (str): Fullname of a comment's post; None for posts.
+        selftext (str): A post's body ("" for link posts); None for comments.
+        url (str): A post's link (its own permalink URL for self-posts); None for comments.
+    """
+
+    __slots__ = (
+        "_reddit", "fullname", "created_utc", "score", "subreddit", "permalink", "text", "num_comments", "link_id",
+        "selftext", "url",
+    )
+
+    def __init__(self, reddit, fullname, created_utc, score, subreddit, permalink, text, num_comments=None,
+                 link_id=None, selftext=None, url=None):
+        self._reddit = reddit
+        self.fullname = fullname
+        self.created_utc = created_utc
+        self.score = score
+        self.subreddit = subreddit
+        self.permalink = permalink
+        self.text = text
+        self.num_comments = num_comments
+        self.link_id = link_id
+        self.selftext = selftext
+        self.url = url
+
+    @classmethod
+    def from_praw(cls, item, reddit):
+        """Snapshot an already fetched PRAW Comment or Submission (no requests)."""
+        if item.fullname.startswith(COMMENT_PREFIX):
+            return cls(
+                reddit, item.fullname, item.created_utc, item.score, str(item.subreddit), item.permalink,
+                item.body, link_id=item.link_id,
+            )
+        return cls(
+            reddit, item.fullname, item.created_utc, item.score, str(item.subreddit), item.permalink,
+            item.title, item.num_comments, selftext=item.selftext, url=item.url,
+        )
+
+    def __repr__(self):
+        return f"ItemSnapshot({self.fullname!r}, score={self.score})"
+
+    @property
+    def is_comment(self):
+        return self.fullname.startswith(COMMENT_PREFIX)
+
+    @property
+    def id(self):
+        return self.fullname[3:]
+
+    @property
+    def name(self):
+        return self.fullname
+
+    @property
+    def body(self):
+        if not self.is_comment:
+            raise AttributeError("posts have no body")
+        return self.text
+
+    @property
+    def title(self):
+        if self.is_comment:
+            raise AttributeError("comments have no title")
+        return self.text
+
+    def live(self):
+        """A lazy PRAW object for this item; reading its fields costs a request."""
+        if self.is_comment:
+            return self._reddit.comment(self.id)
+        return self._reddit.submission(self.id)
+
+    def edit(self, body):
+        self.live().edit(body)
+
+    def delete(self):
+        self.live().delete()
+
+    def reply_count(self):
+        """Fetch the comment's direct replies and return how many there are (one request)."""
+        comment = self.live()
+        # refresh() needs the post's id; without it PRAW looks the comment up first
+        comment.submission = self._reddit.submission(self.link_id[3:])
+        fetch(comment.refresh, f"reply count of {self.id}")
+        return len(comment.replies)
+
+
+# ── Pipeline stages ───────────────────────────────────────────────────────────
+
+def scan(listing, reddit, progress=None):
+    """Yield a snapshot of each item in *listing*, advancing *progress*."""
+    for item in listing:
+        if progress is not None:
+            progress.advance()
+        yield ItemSnapshot.from_praw(item, reddit)
+
+
+def select(snapshots, predicate, matcher=None, kind="comment"):
+    """Yield ``(snapshot, matched rule)`` for the snapshots to delete.
+
+    The text *matcher* (if any) is checked first, since it is free and the
+    *predicate* may make requests (e.g. reply_count()).
+    """
+    for snapshot in snapshots:
+        matched = matcher.match_item(snapshot, kind) if matcher else None
+        if matcher and matched is None:
+            continue
+        if predicate(snapshot):
+            yield snapshot, matched
+
+
+def act(selected, delete, describe, progress, *, dry_run=False):
+    """Delete (or in dry-run, report) each selected snapshot.
+
+    Args:
+        selected: ``(snapshot, matched)`` pairs from select().
+        delete: Callable taking ``(snapshot, matched)`` and returning True
+            if the item was deleted (False if it was skipped or failed).
+        describe: Callable returning the dry-run text for a snapshot.
+        progress (Progress): Where dry-run lines are written.
+
+    Yields:
+        ItemSnapshot: Each item deleted (or that would be deleted in
+        dry-run), so the caller's count is current if an error escapes.
+    """
+    for snapshot, matched in selected:
+        if dry_run:
+            progress.write(f"  [DRY RUN] Would delete {describe(snapshot)}{describe_match(matched)}")
+            yield snapshot
+        elif delete(snapshot, matched):
+            yield snapshot
@@ -0,0 +1,154 @@
+"""Durable record of which items have been deleted, or are being deleted.
+
+Every deletion — from the CLI cleaners, the weekly job, the daemon or the web
+dashboard — first *claims* the item's fullname here. A claim fails without
+any API call if the item was already deleted, or if another run (a second
+tab, an overlapping cron job) is deleting it right now, so the same edit and
+delete requests are never paid for twice. Items whose deletion failed can be
+claimed again. Scrub-first runs (see redditcleaner.scrub) also record items
+that were overwritten but not yet deleted, so an interrupted run resumes
+with the deletions instead of editing again.
+
+The ledger is a small SQLite database, ``deletion_ledger.db`` in ``LOG_DIR``
+(or the current directory), so processes sharing that directory coordinate
+through its locking. A claim that is never settled (the process was killed
+mid-deletion) expires after ``LEASE_SECONDS``.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+LEDGER_FILE = "deletion_ledger.db"
+
+IN_FLIGHT, DONE, FAILED, SCRUBBED = "in_flight", "done", "failed", "scrubbed"
+
+# An in-flight claim older than this is assumed abandoned; long enough to
+# cover the retry waits and circuit-breaker pauses of one edit + delete
+LEASE_SECONDS = 15 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deletions (
+    fullname   TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    owner      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    attempts   INTEGER NOT NULL,
+    error      TEXT
+)
+"""
+
+
+def default_path():
+    """``deletion_ledger.db`` in LOG_DIR, or in the current directory."""
+    return os.path.join(os.environ.get("LOG_DIR", os.getcwd()), LEDGER_FILE)
+
+
+class DeletionLedger:
+    """Claim, complete and fail deletions by fullname.
+
+    The database is opened on first use, so constructing a ledger never
+    touches the filesystem.
+
+    Args:
+        path (str): SQLite database file.
+        lease (float): Seconds after which an unsettled claim may be taken over.
+        clock: Returns the current time in seconds.
+    """
+
+    def __init__(self, path, *, lease=LEASE_SECONDS, clock=time.time):
+        self.path = path
+        self.lease = lease
+        self._clock = clock
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()  # sqlite3 connections are per-thread
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def claim(self, fullname):
+        """Mark *fullname* in flight for this process.
+
+        Returns:
+            bool: False if it is already deleted or another claim on it is
+            still live (the caller should skip it), True otherwise.
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT state, updated_at, attempts FROM deletions WHERE fullname = ?", (fullname,)
+            ).fetchone()
+            attempts = 0
+            if row is not None:
+                state, updated_at, attempts = row
+                if state == DONE:
+                    return False
+                if state == IN_FLIGHT and now - updated_at < self.lease:
+                    return False
+            conn.execute(
+                "INSERT OR REPLACE INTO deletions VALUES (?, ?, ?, ?, ?, NULL)",
+                (fullname, IN_FLIGHT, self.owner, now, attempts + 1),
+            )
+        return True
+
+    def complete(self, fullname):
+        """Record that *fullname* was deleted; later claims on it fail."""
+        self._settle(fullname, DONE, None)
+
+    def fail(self, fullname, error):
+        """Record that deleting *fullname* failed; it may be claimed again."""
+        self._settle(fullname, FAILED, str(error))
+
+    def scrub(self, fullname, error=None):
+        """Record that *fullname* was overwritten and still has to be deleted; it may be claimed again."""
+        self._settle(fullname, SCRUBBED, None if error is None else str(error))
+
+    def scrubbed(self):
+        """Return the fullnames that were overwritten but not yet deleted, oldest first."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT fullname FROM deletions WHERE state = ? ORDER BY updated_at", (SCRUBBED,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def state(self, fullname):
+        """Return IN_FLIGHT, DONE, FAILED, SCRUBBED, or None if *fullname* was never claimed."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT state FROM deletions WHERE fullname = ?", (fullname,)).fetchone()
+        return row[0] if row else None
+
+    def _settle(self, fullname, state, error):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE deletions SET state = ?, updated_at = ?, error = ? WHERE fullname = ?",
+                (state, self._clock(), error, fullname),
+            )
+
+    def _transaction(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Per connection. With WAL a crashed process loses nothing; a power
+            # cut can lose the last few settles, which only means a repeat attempt
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(_SCHEMA)
+                    self._initialized = True
+        return _Transaction(conn)
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` … ``COMMIT``, so a read-then-write claim is atomic across processes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
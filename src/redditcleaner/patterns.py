@@ -0,0 +1,138 @@
+"""Keyword and regex rules over comment bodies and post titles.
+
+Rules are read one per line; blank lines and ``#`` comments are ignored::
+
+    # anything mentioning my old employer
+    Acme Corp
+    acme.example
+    re:\\bproject[- ]?falcon\\b
+
+Plain lines are literal keywords or phrases, matched case-insensitively as
+whole words; runs of whitespace in a phrase match any whitespace. Lines
+starting with ``re:`` are regular expressions (also case-insensitive).
+
+The keywords are compiled into one regular expression, merged into a
+prefix trie first, so the engine does a single left-to-right pass per text
+instead of trying each keyword separately, and hundreds of keywords cost
+little more than one. Each ``re:`` rule is compiled on its own, so its
+flags, groups and backreferences mean what they would in isolation.
+"""
+
+import re
+
+REGEX_PREFIX = "re:"
+
+
+def parse_patterns(lines):
+    """Return the rule strings in *lines*, skipping blanks and ``#`` comments."""
+    rules = []
+    for line in lines:
+        rule = line.strip()
+        if rule and not rule.startswith("#"):
+            rules.append(rule)
+    return rules
+
+
+def describe_match(matched):
+    """Suffix for dry-run/log lines naming the rule that matched (empty if none)."""
+    return f" [matched {matched!r}]" if matched else ""
+
+
+def _normalize(keyword):
+    return " ".join(keyword.lower().split())
+
+
+def _trie_regex(keywords):
+    """Build a regex matching any of *keywords* with shared prefixes factored out.
+
+    Each keyword ends in its own empty group ``k<n>``, *n* being its index
+    in *keywords*, so ``match.lastgroup`` names the keyword that matched.
+    """
+    trie = {}
+    for n, keyword in enumerate(keywords):
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = n  # end of keyword n
+
+    def build(node):
+        alternatives = [
+            (r"\s+" if ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted(item for item in node.items() if item[0])
+        ]
+        if "" in node:
+            # Tried last, so the longest keyword wins
+            alternatives.append(f"(?P<k{node['']}>)")
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+
+    return build(trie)
+
+
+class PatternMatcher:
+    """Matcher for a list of keyword and ``re:`` rules.
+
+    Args:
+        rules (list): Rule strings as returned by parse_patterns().
+
+    Raises:
+        ValueError: If a ``re:`` rule is not a valid regular expression.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        keywords = {}  # normalized keyword -> rule as written
+        self._regexes = []  # (compiled, rule)
+        for rule in self.rules:
+            if rule.startswith(REGEX_PREFIX):
+                try:
+                    regex = re.compile(rule[len(REGEX_PREFIX):], re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"Invalid pattern {rule!r}: {e}") from None
+                self._regexes.append((regex, rule))
+            else:
+                keywords.setdefault(_normalize(rule), rule)
+
+        # Case is left to IGNORECASE: str.lower() can change a keyword's length
+        self._keywords = list(keywords.values())
+        self._keyword_regex = None
+        if self._keywords:
+            trie = _trie_regex([" ".join(rule.split()) for rule in self._keywords])
+            self._keyword_regex = re.compile(rf"(?<!\w)(?:{trie})(?!\w)", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(parse_patterns(f))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def search(self, text):
+        """Return the rule whose match starts first in *text*, or None.
+
+        On a tie, keywords win over ``re:`` rules, and earlier ``re:`` rules
+        over later ones.
+        """
+        if not text:
+            return None
+        first, found = None, None
+        if self._keyword_regex is not None:
+            match = self._keyword_regex.search(text)
+            if match is not None:
+                first, found = match.start(), self._keywords[int(match.lastgroup[1:])]
+        for regex, rule in self._regexes:
+            match = regex.search(text)
+            if match is not None and (first is None or match.start() < first):
+                first, found = match.start(), rule
+        return found
+
+    def match_item(self, item, item_type):
+        """Match a comment's body or a post's title.
+
+        Args:
+            item: A PRAW Comment (item_type="comment") or Submission (item_type="post").
+            item_type (str): "comment" or "post".
+        """
+        return self.search(item.body if item_type == "comment" else item.title)
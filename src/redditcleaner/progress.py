@@ -0,0 +1,227 @@
+"""Throttled live progress output shared by the cleanup loops.
+
+On a terminal the status line is redrawn in place at most every
+``TTY_INTERVAL`` seconds; when stdout is not a TTY (CI logs, redirects) a
+plain summary line is printed every ``PLAIN_INTERVAL`` seconds instead.
+Each status shows items/s, API requests/s, time spent sleeping for Reddit's
+rate limit and, when the total is known, an ETA.
+
+API requests are counted by ``CountingRequestor``, which ``initialize_reddit``
+installs as PRAW's requestor class. Rate-limit sleeps are collected from
+prawcore's own pacing (reported through its logger) and from the 429 waits
+in ``utils._with_retry``. Both also feed the ``--trace`` timeline (see
+redditcleaner.tracing) when it is enabled. ``CountingRequestor`` is also
+where ``--record`` captures requests and ``--replay`` answers them (see
+redditcleaner.replay).
+"""
+
+import logging
+import re
+import sys
+import threading
+import time
+
+import prawcore
+
+from redditcleaner.estimate import format_duration
+from redditcleaner.replay import RECORDER, REPLAYER
+from redditcleaner.tracing import TRACER
+
+TTY_INTERVAL = 0.2
+PLAIN_INTERVAL = 30
+
+# prawcore's pacing sleep; "… prior to retry" is its 5xx back-off, not a rate limit
+_SLEEP_MESSAGE = re.compile(r"Sleeping: ([\d.]+) seconds prior to call")
+
+
+class RequestMeter:
+    """Process-wide totals of API requests made and seconds slept for rate limits.
+
+    Shard workers add to the totals from their own threads, so updates are
+    made under a lock.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.sleep_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def add_sleep(self, seconds):
+        with self._lock:
+            self.sleep_seconds += seconds
+
+
+METER = RequestMeter()
+
+
+class _SleepFilter(logging.Filter):
+    """Collect prawcore's "Sleeping: N seconds prior to call" pacing messages into METER.
+
+    The prawcore logger has to be lowered to DEBUG for those messages to be
+    created at all. Every record is then held to the level the logger would
+    have without that: the level it was set to before, or else its parents'
+    level at the time of the record, so logging configured later still
+    decides what reaches the user's handlers.
+    """
+
+    def __init__(self, logger, level, source="prawcore"):
+        super().__init__()
+        self.logger = logger
+        self.level = level
+        self.source = source
+
+    def threshold(self):
+        if self.level != logging.NOTSET:
+            return self.level
+        return self.logger.parent.getEffectiveLevel()
+
+    def filter(self, record):
+        match = _SLEEP_MESSAGE.match(record.getMessage())
+        if match:
+            METER.add_sleep(float(match.group(1)))
+            TRACER.sleep(float(match.group(1)), self.source)
+        return record.levelno >= self.threshold()
+
+
+def watch_rate_limit_sleeps(logger_name="prawcore"):
+    """Start counting prawcore's (or asyncprawcore's) rate-limit sleeps (idempotent)."""
+    logger = logging.getLogger(logger_name)
+    if any(isinstance(f, _SleepFilter) for f in logger.filters):
+        return
+    logger.addFilter(_SleepFilter(logger, logger.level, logger_name))
+    logger.setLevel(logging.DEBUG)
+
+
+def _server_error(response):
+    """True for a 5xx response; prawcore retries it, but the breaker counts it as a failure."""
+    return response.status_code >= 500
+
+
+class CountingRequestor(prawcore.Requestor):
+    """prawcore Requestor that counts every HTTP request in METER.
+
+    Every request goes through the shared circuit breaker, so listing pages
+    and refreshes pause during an outage just like edits and deletions.
+
+    It also traces, records or replays each request when ``--trace``,
+    ``--record`` or ``--replay`` is in effect.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        watch_rate_limit_sleeps()
+
+    def request(self, *args, **kwargs):
+        # utils imports this module, so the shared breaker is looked up per request
+        from redditcleaner import utils
+
+        METER.add_request()
+        return utils.REDDIT_BREAKER.call(lambda: self._send(*args, **kwargs), failed=_server_error)
+
+    def _send(self, *args, **kwargs):
+        if not (TRACER.enabled or RECORDER.enabled or REPLAYER.enabled):
+            return super().request(*args, **kwargs)
+        method, url = args[:2]
+        params, data = kwargs.get("params"), kwargs.get("data")
+        with TRACER.request(method, url, params, data) as span:
+            if REPLAYER.enabled:
+                response = REPLAYER.serve(method, url, params, data)
+            else:
+                with RECORDER.exchange(method, url, params, data) as exchange:
+                    response = exchange["response"] = super().request(*args, **kwargs)
+            span["status"] = response.status_code
+            span["bytes"] = len(response.content)
+            return response
+
+
+class Progress:
+    """Live status for a scan over *noun* items.
+
+    Use as a context manager and call ``advance()`` once per item; print any
+    other per-item output through ``write()`` so it doesn't garble the
+    in-place status line::
+
+        with Progress("comment", total=estimate["items"]) as progress:
+            for comment in listing:
+                progress.advance()
+
+    Args:
+        noun (str): Item name used in the status ("comment", "post", …).
+        total (int): Expected number of items, if known; enables the ETA.
+        stream: Output stream (default: sys.stdout).
+        interval (float): Seconds between redraws; defaults to TTY_INTERVAL
+            on a terminal and PLAIN_INTERVAL otherwise.
+    """
+
+    def __init__(self, noun, total=None, *, stream=None, interval=None, clock=time.monotonic):
+        self.noun = noun
+        self.total = total
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.interval = interval if interval is not None else (TTY_INTERVAL if self.tty else PLAIN_INTERVAL)
+        self.count = 0
+        self._clock = clock
+        self._started = clock()
+        self._last_render = self._started
+        self._start_requests = METER.requests
+        self._start_sleep = METER.sleep_seconds
+        self._width = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def advance(self, n=1):
+        """Count *n* more items and redraw if the interval has passed."""
+        self.count += n
+        now = self._clock()
+        if now - self._last_render >= self.interval:
+            self._last_render = now
+            self._render(now)
+
+    def write(self, message):
+        """Print *message* on its own line without mangling the status line."""
+        if self.tty and self._width:
+            self.stream.write("\r" + " " * self._width + "\r")
+            self._width = 0
+        print(message, file=self.stream)
+
+    def close(self):
+        """Print the final status (and end the in-place line on a terminal)."""
+        self._render(self._clock())
+        if self.tty:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._width = 0
+
+    def status(self, now=None):
+        """Return the status text for the current counters."""
+        elapsed = max((now if now is not None else self._clock()) - self._started, 1e-9)
+        item_rate = self.count / elapsed
+        request_rate = (METER.requests - self._start_requests) / elapsed
+        slept = METER.sleep_seconds - self._start_sleep
+
+        text = (
+            f"{self.count} {self.noun}(s) scanned · {item_rate:.1f} items/s"
+            f" · {request_rate:.1f} req/s · {format_duration(slept)} rate-limit sleep"
+        )
+        if self.total and item_rate > 0:
+            remaining = max(self.total - self.count, 0)
+            text += f" · ETA {format_duration(remaining / item_rate)}"
+        return text
+
+    def _render(self, now):
+        text = self.status(now)
+        if self.tty:
+            padding = " " * max(self._width - len(text) - 2, 0)
+            self.stream.write(f"\r  {text}{padding}")
+            self.stream.flush()
+            self._width = len(text) + 2
+        else:
+            print(f"  [progress] {text}", file=self.stream)
@@ -0,0 +1,368 @@
+"""Record real API sessions and replay them offline.
+
+``--record FILE`` (cleaners, weekly job, Flask web app) writes one line per
+request made through ``CountingRequestor``: method, path, the id/paging
+parameters, status, rate-limit headers, size, latency and the response
+body. ``--replay FILE`` serves those responses back to the unchanged
+commands, each after its recorded latency, so a slow production run can be
+re-run and profiled (``--trace``) offline, before and after a fix.
+
+Bodies are anonymized before they are written. Every string is replaced by
+a pseudonym of the same length, except comment and post fullnames and ids,
+paging cursors and the "[deleted]" / "[removed]" markers. Account and
+subreddit fullnames (t2_, t5_) keep their prefix but get a pseudonymous id,
+as does the account id in /api/v1/me. The same string always gets the same
+pseudonym within one recording, but the pseudonyms can't be reversed, and
+request bodies such as passwords and edit text are never recorded.
+Numbers (scores, timestamps) are kept, so the cleanup rules take the same
+decisions on replay. Text rules (``--patterns``) can't match anonymized
+text.
+
+Requests are matched by method, path and those parameters; the username in
+``/user/<name>/`` paths is ignored. Repeated requests get the recorded
+responses in order, then the last one again. A changed /api/info batching
+is answered from the items seen in the recording. Anything else that was
+never recorded raises ReplayMiss.
+"""
+
+import atexit
+import hashlib
+import itertools
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import prawcore
+import requests
+
+from redditcleaner.ledger import default_path
+
+FORMAT = "redditcleaner-session"
+VERSION = 1
+
+# Parameters that decide which response a request gets; all others are dropped
+_KEY_PARAMS = ("id", "thing_id", "after", "before", "limit", "count", "sort", "t")
+# Response headers prawcore reads (rate limiting, retries, redirects)
+_KEPT_HEADERS = (
+    "x-ratelimit-remaining",
+    "x-ratelimit-used",
+    "x-ratelimit-reset",
+    "retry-after",
+    "location",
+    "content-length",
+    "content-type",
+)
+# Response fields whose string values are kept as they are
+_KEPT_FIELDS = frozenset({"kind", "after", "before", "scope", "token_type", "removed_by_category"})
+_KEPT_VALUES = frozenset({"", ".", "[deleted]", "[removed]"})
+_FULLNAME = re.compile(r"t[1-6]_[0-9a-z]+")
+# Comments and posts; other fullnames (accounts, subreddits, messages) identify people
+_KEPT_FULLNAME = re.compile(r"t[13]_[0-9a-z]+")
+_USER_PATH = re.compile(r"^/(user|u)/[^/]+")
+
+
+class ReplayMiss(LookupError):
+    """A replayed command made a request the recording has no response for."""
+
+
+def normalize_path(url):
+    """Path of *url* without its trailing slash, and with the username in /user/<name>/ replaced by "*"."""
+    return _USER_PATH.sub(r"/\1/*", urlsplit(url).path.rstrip("/"))
+
+
+def key_params(params=None, data=None):
+    """The parameters of a request that select its response, as a sorted dict of strings."""
+    selected = {}
+    for values in (params, data):
+        if not values:
+            continue
+        pairs = values.items() if isinstance(values, dict) else values
+        selected.update((key, str(value)) for key, value in pairs if key in _KEY_PARAMS)
+    return dict(sorted(selected.items()))
+
+
+def anonymize(value, pseudonym, field=None):
+    """Copy of the JSON *value* with its free-text strings passed through *pseudonym*.
+
+    The ``id`` of a comment or post is kept (its ``name`` is its fullname);
+    any other ``id``, such as the account's in /api/v1/me, is not.
+    """
+    if isinstance(value, dict):
+        keep_id = isinstance(value.get("name"), str) and _KEPT_FULLNAME.fullmatch(value["name"])
+        return {
+            key: item if key == "id" and keep_id else anonymize(item, pseudonym, key)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [anonymize(item, pseudonym, field) for item in value]
+    if not isinstance(value, str) or field in _KEPT_FIELDS or value in _KEPT_VALUES \
+            or _KEPT_FULLNAME.fullmatch(value):
+        return value
+    if _FULLNAME.fullmatch(value):
+        return value[:3] + pseudonym(value[3:])
+    return pseudonym(value)
+
+
+def _request_key(method, path, params):
+    return method.upper(), path, tuple(params.items())
+
+
+class Recorder:
+    """Appends anonymized exchanges to a session file; ``RECORDER`` is the shared instance.
+
+    Args:
+        clock: Monotonic clock in seconds (injectable for tests).
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.path = None
+        self._file = None
+        self._clock = clock
+        self._origin = clock()
+        self._lock = threading.Lock()
+        self._salt = b""
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    def start(self, path):
+        """Start writing exchanges to *path*; the file is closed at interpreter exit."""
+        if self._file is not None:
+            return
+        self.path = path
+        # Line-buffered, so a killed run still leaves every finished exchange
+        self._file = open(path, "w", encoding="utf-8", buffering=1)
+        # Never written out, so the pseudonyms can't be recomputed from guesses
+        self._salt = secrets.token_bytes(16)
+        self._origin = self._clock()
+        self._write({
+            "format": FORMAT,
+            "version": VERSION,
+            "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "argv": sys.argv[1:],
+        })
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Close the file (idempotent)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @contextmanager
+    def exchange(self, method, url, params=None, data=None):
+        """Record the request made in the enclosed block.
+
+        Set ``["response"]`` on the yielded dict to the requests.Response;
+        a prawcore RequestException (no response at all) is recorded too.
+        """
+        if self._file is None:
+            yield {}
+            return
+        entry = {
+            "method": method.upper(),
+            "path": normalize_path(url),
+            "params": key_params(params, data),
+        }
+        result = {}
+        start = self._clock()
+        try:
+            yield result
+        except prawcore.exceptions.RequestException as e:
+            entry["error"] = type(e.original_exception).__name__
+            self._finish(entry, start, self._clock())
+            raise
+        end = self._clock()
+        response = result["response"]
+        entry["status"] = response.status_code
+        entry["headers"] = {
+            name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers
+        }
+        entry["bytes"] = len(response.content)
+        try:
+            entry["body"] = anonymize(json.loads(response.content), self._pseudonym)
+        except ValueError:
+            entry["body"] = None
+        self._finish(entry, start, end)
+
+    def _finish(self, entry, start, end):
+        entry["at"] = round(start - self._origin, 6)
+        entry["latency"] = round(end - start, 6)
+        self._write(entry)
+
+    def _pseudonym(self, text):
+        digest = hashlib.blake2b(text.encode("utf-8"), key=self._salt, digest_size=16).hexdigest()
+        return (digest * (len(text) // len(digest) + 1))[:len(text)]
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+
+class Replayer:
+    """Serves recorded responses instead of calling Reddit; ``REPLAYER`` is the shared instance.
+
+    Args:
+        sleep: Called with each recorded latency (injectable for tests).
+    """
+
+    def __init__(self, sleep=time.sleep):
+        self.path = None
+        self.speed = 1.0
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._last = {}
+        self._things = {}
+        self._lookup = None
+        self._recorded = 0
+        self._served = 0
+        self._rebuilt = 0
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def load(self, path, speed=1.0):
+        """Serve the exchanges recorded in *path* from now on.
+
+        Args:
+            path (str): Session file written by ``--record``.
+            speed (float): Latency divisor; 2 replays twice as fast, 0 without waiting.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If it is not a session file.
+        """
+        with open(path, encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if not isinstance(header, dict) or header.get("format") != FORMAT:
+                raise ValueError(f"{path} is not a recorded session")
+            if header.get("version") != VERSION:
+                raise ValueError(f"{path}: unsupported session version {header.get('version')}")
+            self._things, self._lookup, self._last = {}, None, {}
+            self._served = self._rebuilt = 0
+            queues = defaultdict(deque)
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                queues[_request_key(entry["method"], entry["path"], entry["params"])].append(entry)
+                self._index(entry)
+        self._queues = dict(queues)
+        self._recorded = sum(len(queue) for queue in self._queues.values())
+        self.path = path
+        self.speed = speed
+
+    def serve(self, method, url, params=None, data=None):
+        """Return the recorded response to this request, after its recorded latency.
+
+        Raises:
+            prawcore.exceptions.RequestException: If the recorded request failed
+                without a response.
+            ReplayMiss: If nothing like this request was recorded.
+        """
+        path = normalize_path(url)
+        selected = key_params(params, data)
+        key = _request_key(method, path, selected)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                entry = self._last[key] = queue.popleft()
+                self._served += 1
+            elif key in self._last:
+                entry = self._last[key]
+            elif path == "/api/info" and "id" in selected and self._lookup is not None:
+                entry = self._rebuild_lookup(selected["id"].split(","))
+            else:
+                raise ReplayMiss(f"no recorded response for {method.upper()} {path} {selected or ''}".rstrip())
+        if self.speed:
+            self._sleep(entry["latency"] / self.speed)
+        if "error" in entry:
+            error = getattr(requests.exceptions, entry["error"], None)
+            if not (isinstance(error, type) and issubclass(error, Exception)):
+                error = requests.exceptions.ConnectionError
+            raise prawcore.exceptions.RequestException(error(f"replayed {entry['error']}"), (method, url), {})
+        return _response(entry, url)
+
+    def summary(self):
+        """One line comparing the recording with what was replayed from it."""
+        with self._lock:
+            text = f"Replayed {self._served} of {self._recorded} recorded response(s)"
+            if self._served < self._recorded:
+                text += f"; {self._recorded - self._served} were not requested"
+            if self._rebuilt:
+                text += f"; {self._rebuilt} lookup(s) rebuilt from recorded items"
+        return text + "."
+
+    def _index(self, entry):
+        """Remember the items in *entry*'s body, for lookups the recording batched differently."""
+        if entry["path"] == "/api/info" and entry.get("status") == 200 and self._lookup is None:
+            self._lookup = entry
+        for thing in _things(entry.get("body")):
+            self._things[thing["data"]["name"]] = thing
+
+    def _rebuild_lookup(self, fullnames):
+        children = [self._things[name] for name in fullnames if name in self._things]
+        self._rebuilt += 1
+        return {
+            **self._lookup,
+            "body": {"kind": "Listing", "data": {"after": None, "before": None, "dist": len(children),
+                                                  "children": children}},
+        }
+
+
+def _things(body):
+    """Comments and posts anywhere in a response body."""
+    if isinstance(body, dict):
+        if body.get("kind") in ("t1", "t3") and isinstance(body.get("data"), dict) and "name" in body["data"]:
+            yield body
+        for value in body.values():
+            yield from _things(value)
+    elif isinstance(body, list):
+        yield from itertools.chain.from_iterable(_things(value) for value in body)
+
+
+def _response(entry, url):
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers.update(entry["headers"])
+    response._content = b"" if entry["body"] is None else json.dumps(entry["body"]).encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+RECORDER = Recorder()
+REPLAYER = Replayer()
+
+
+def start_session(parser, args):
+    """Start ``--record`` or ``--replay`` from parsed *args* (errors exit through *parser*)."""
+    if args.record:
+        RECORDER.start(args.record)
+    elif args.replay:
+        try:
+            REPLAYER.load(args.replay, speed=args.replay_speed)
+        except (OSError, ValueError) as e:
+            parser.error(f"--replay: {e}")
+        print(f"Replaying {args.replay}: no requests are sent to Reddit.", file=sys.stderr)
+        atexit.register(lambda: print(REPLAYER.summary(), file=sys.stderr))
+        if os.path.exists(default_path()):
+            print("Note: items the deletion ledger here lists as deleted are skipped;"
+                  " replay from a copy of the recorded run's starting directory.", file=sys.stderr)
@@ -0,0 +1,114 @@
+"""Scrub-first, two-phase deletion.
+
+``edit_and_delete`` overwrites and deletes each item before moving to the
+next, so under a tight rate budget the last items of a large purge keep
+their original text for hours. With ``--scrub-first`` the planned items are
+all overwritten first (phase 1, one edit request each), and only then
+deleted (phase 2, one delete request each). Every item's text is gone after
+half the requests, and the deletions that follow only remove a ".".
+
+The deletion ledger is the checkpoint: phase 1 records each overwritten
+item as scrubbed, and phase 2 marks it done. Phase 2 also picks up items
+left scrubbed by an interrupted earlier run of the same account, even if
+they no longer match (their text is now "."), and re-running an
+interrupted run skips the edits already made. The record of each item is
+logged once, in phase 1, while it still has its text.
+"""
+
+from redditcleaner import utils
+from redditcleaner.progress import Progress
+from redditcleaner.shards import delete_sharded
+from redditcleaner.utils import delete_scrubbed, iter_info, scrub_once
+
+KIND_PREFIXES = {"comment": "t1_", "post": "t3_"}
+
+
+def scrub_phase(clients, fullnames, logs, source, *, total=None, owner=None):
+    """Phase 1: log and overwrite every still-existing item in *fullnames*.
+
+    Args:
+        clients (list): Authenticated praw.Reddit instances for the account
+            (more than one spreads the work; see redditcleaner.shards).
+        fullnames: Iterable of fullnames; read lazily.
+        logs (dict): {"comment": DeletionLog, "post": DeletionLog}.
+        source (str): Tag identifying which script/mode performed the deletion.
+        total (int): Number of fullnames, if known, for the progress ETA.
+        owner (str): Skip items not posted by this username (see delete_sharded).
+
+    Returns:
+        dict: The delete_sharded() report; ``done`` lists the scrubbed fullnames.
+    """
+    print("Phase 1/2: overwriting every planned item…")
+    with Progress("planned item", total) as progress:
+        return delete_sharded(clients, fullnames, logs, source, progress=progress, action=scrub_once,
+                              verb="Scrubbed", owner=owner)
+
+
+def delete_phase(clients, fullnames, logs, source):
+    """Phase 2: delete the items in *fullnames* that phase 1 scrubbed.
+
+    Items the ledger still lists as scrubbed from earlier runs are deleted
+    too, if they are of a kind in *logs* and belong to this account.
+
+    Returns:
+        dict: The delete_sharded() report.
+    """
+    fullnames = list(dict.fromkeys([*fullnames, *_own_leftovers(clients[0], fullnames, logs)]))
+    print(f"Phase 2/2: deleting {len(fullnames)} scrubbed item(s)…")
+    with Progress("scrubbed item", len(fullnames)) as progress:
+        return delete_sharded(clients, fullnames, logs, source, progress=progress, action=delete_scrubbed)
+
+
+def _own_leftovers(reddit, fullnames, logs):
+    """Fullnames left scrubbed by earlier runs that this run may delete.
+
+    The ledger is shared by every account run from the same directory, and
+    another account's item can't be deleted from this one, so each leftover
+    is looked up (one request per 100) and kept only if it is ours. Those
+    Reddit no longer returns are marked done in the ledger.
+    """
+    prefixes = tuple(KIND_PREFIXES[kind] for kind in logs)
+    current = set(fullnames)
+    leftovers = [
+        fullname for fullname in utils.DELETION_LEDGER.scrubbed()
+        if fullname.startswith(prefixes) and fullname not in current
+    ]
+    if not leftovers:
+        return []
+    me = str(reddit.user.me())
+    own, returned = [], set()
+    for item in iter_info(reddit, leftovers):
+        returned.add(item.fullname)
+        if str(item.author) == me:
+            own.append(item.fullname)
+    for fullname in leftovers:
+        if fullname not in returned:
+            utils.DELETION_LEDGER.complete(fullname)  # deleted or removed since; nothing left to do
+    if len(returned) > len(own):
+        print(f"Leaving {len(returned) - len(own)} scrubbed item(s) of another account to that account's runs.")
+    return own
+
+
+def scrub_then_delete(clients, fullnames, logs, source, *, total=None, owner=None):
+    """Run both phases over *fullnames*.
+
+    Returns:
+        tuple: (phase 1 report, phase 2 report). The phase 2 report is None
+        if phase 1 was stopped by an outage (its ``outage`` is set).
+    """
+    scrubbed = scrub_phase(clients, fullnames, logs, source, total=total, owner=owner)
+    if scrubbed["outage"] is not None:
+        return scrubbed, None
+    return scrubbed, delete_phase(clients, scrubbed["done"], logs, source)
+
+
+def format_phases(scrubbed, deleted):
+    """Summary line for a finished two-phase run."""
+    count = sum(scrubbed["deleted"].values())
+    text = f"Scrubbed {count} item(s)"
+    if deleted is not None:
+        text += f", then deleted {sum(deleted['deleted'].values())}"
+    failed = len(scrubbed["failed"]) + (len(deleted["failed"]) if deleted is not None else 0)
+    if failed:
+        text += f"; {failed} failed and will be retried by the next run"
+    return text + "."
@@ -0,0 +1,223 @@
+"""Deletion work spread over several OAuth clients of the same account.
+
+Reddit rate-limits each OAuth client separately, and PRAW paces each
+``praw.Reddit`` instance from its own client's X-Ratelimit headers. A large
+purge through one script app is therefore capped at one client's budget;
+with several apps registered to the same account (each listing the account
+as a developer), every extra client id/secret pair adds another budget.
+
+``delete_sharded`` takes a plan of fullnames, cuts it into /api/info-sized
+chunks and puts them on a shared queue. One worker thread per client takes
+the next chunk, hydrates it with its own client and deletes the items
+through ``delete_once``, so the deletion ledger, the circuit breaker and the
+usual deletion logs are shared exactly as in a single-client run. A client
+that is being throttled simply takes fewer chunks.
+"""
+
+import queue
+import threading
+
+import praw
+import prawcore
+
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.progress import CountingRequestor
+from redditcleaner.utils import (
+    DELETE_ERRORS,
+    FOREIGN_NOTE,
+    INFO_BATCH_SIZE,
+    SKIPPED_NOTE,
+    delete_once,
+    iter_info,
+)
+
+# Chunks queued ahead of the workers, per client; bounds memory for streamed plans
+QUEUE_DEPTH = 2
+
+
+def connect_clients(client_pairs, username, password):
+    """Return one authenticated ``praw.Reddit`` per working (client_id, client_secret) pair.
+
+    Pairs that fail to authenticate are reported and left out, so a stale
+    extra app never stops a run.
+
+    Args:
+        client_pairs: Iterable of (client_id, client_secret) tuples.
+        username (str): Reddit username shared by every client.
+        password (str): Reddit password.
+
+    Returns:
+        list: praw.Reddit instances, in the order of *client_pairs*.
+    """
+    clients = []
+    for number, (client_id, client_secret) in enumerate(client_pairs, start=1):
+        reddit = praw.Reddit(
+            client_id=client_id,
+            client_secret=client_secret,
+            username=username,
+            password=password,
+            user_agent="commentCleaner",
+            validate_on_submit=True,
+            requestor_class=CountingRequestor,
+        )
+        try:
+            reddit.user.me()
+        except (
+            praw.exceptions.APIException,
+            prawcore.exceptions.OAuthException,
+            prawcore.exceptions.ResponseException,
+        ) as e:
+            print(f"Warning: extra client #{number} ({client_id}) could not authenticate and is skipped: {e}")
+            continue
+        clients.append(reddit)
+    return clients
+
+
+class _ShardRun:
+    """State shared by the worker threads of one ``delete_sharded`` call."""
+
+    def __init__(self, clients, logs, source, progress, action, verb, owner):
+        self.logs = logs
+        self.source = source
+        self.progress = progress
+        self.action = action
+        self.verb = verb
+        self.owner = owner
+        self.queue = queue.Queue(maxsize=QUEUE_DEPTH * len(clients))
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.report = {
+            "requested": 0,
+            "deleted": {"comment": 0, "post": 0},
+            "done": [],
+            "skipped": 0,
+            "foreign": 0,
+            "failed": [],
+            "per_client": [0] * len(clients),
+            "outage": None,
+        }
+        self._crash = None
+        self.threads = [
+            threading.Thread(target=self.work, args=(index, reddit), name=f"shard-{index}", daemon=True)
+            for index, reddit in enumerate(clients)
+        ]
+
+    def work(self, index, reddit):
+        """Take chunks until the end-of-plan marker; after a stop, just drain the queue."""
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                return
+            if self.stop.is_set():
+                continue
+            try:
+                for item in iter_info(reddit, chunk):
+                    self.delete(index, item)
+                    if self.stop.is_set():
+                        break
+            except CircuitOpenError as e:
+                with self.lock:
+                    self.report["outage"] = self.report["outage"] or e
+                self.stop.set()
+            except BaseException as e:
+                with self.lock:
+                    self._crash = self._crash or e
+                self.stop.set()
+
+    def delete(self, index, item):
+        label = "comment" if item.fullname.startswith("t1_") else "post"
+        if self.owner is not None and str(item.author) != self.owner:
+            with self.lock:
+                self.report["foreign"] += 1
+                self.note(f"  Skipped {label} {item.fullname}: {FOREIGN_NOTE}")
+            return
+        try:
+            deleted = self.action(item, label, self.logs.get(label), self.source)
+        except DELETE_ERRORS as e:
+            with self.lock:
+                self.report["failed"].append((item, e))
+                self.note(f"  Error deleting {label} {item.fullname}: {e}")
+            return
+        with self.lock:
+            if deleted:
+                self.report["deleted"][label] += 1
+                self.report["done"].append(item.fullname)
+                self.report["per_client"][index] += 1
+                self.note(f"  {self.verb} {label} {item.fullname} in r/{item.subreddit} (client #{index + 1})")
+            else:
+                self.report["skipped"] += 1
+                self.note(f"  Skipped {label} {item.fullname}: {SKIPPED_NOTE}")
+
+    def note(self, message):
+        """Advance and write to the progress display; call with the lock held."""
+        if self.progress is not None:
+            self.progress.advance()
+            self.progress.write(message)
+
+    def run(self, fullnames, batch_size):
+        for thread in self.threads:
+            thread.start()
+        try:
+            chunk = []
+            for fullname in fullnames:
+                if self.stop.is_set():
+                    break
+                self.report["requested"] += 1
+                chunk.append(fullname)
+                if len(chunk) == batch_size:
+                    self.queue.put(chunk)
+                    chunk = []
+            if chunk and not self.stop.is_set():
+                self.queue.put(chunk)
+        except BaseException:
+            # Ctrl-C or a failing plan: don't delete the chunks already queued
+            self.stop.set()
+            raise
+        finally:
+            for _ in self.threads:
+                self.queue.put(None)
+            for thread in self.threads:
+                thread.join()
+        if self._crash is not None:
+            raise self._crash
+        return self.report
+
+
+def delete_sharded(clients, fullnames, logs, source, *, progress=None, batch_size=INFO_BATCH_SIZE,
+                   action=delete_once, verb="Deleted", owner=None):
+    """Delete every still-existing item in *fullnames*, spread across *clients*.
+
+    Args:
+        clients (list): Authenticated praw.Reddit instances, one per OAuth
+            client of the same account.
+        fullnames: Iterable of fullnames such as "t1_abc123"; read lazily,
+            at most a few chunks ahead of the workers.
+        logs (dict): {"comment": DeletionLog, "post": DeletionLog}.
+        source (str): Tag identifying which script/mode performed the deletion.
+        progress (Progress): Advanced and written to once per item, if given.
+        batch_size (int): Fullnames per chunk (one /api/info request).
+        action: Called as ``action(item, label, log, source)`` per item and
+            returns False for skipped items — delete_once() by default, or
+            one of the scrub-first phases (see redditcleaner.scrub).
+        verb (str): Past tense of *action* for the progress lines.
+        owner (str): Username of the account; items by anyone else are
+            skipped. Pass it for plans from outside the account's history.
+
+    Returns:
+        dict: ``requested`` (fullnames read), ``deleted`` ({"comment": n, "post": n}
+        handled by *action*), ``done`` (their fullnames), ``skipped`` (claimed
+        by another run), ``foreign`` (skipped for *owner*), ``failed`` ([(item, error), …]),
+        ``per_client`` (deletions per client, in the order of *clients*) and
+        ``outage`` (the CircuitOpenError that stopped the run, or None).
+    """
+    if not clients:
+        raise ValueError("delete_sharded needs at least one client")
+    return _ShardRun(clients, logs, source, progress, action, verb, owner).run(fullnames, batch_size)
+
+
+def format_shard_report(report):
+    """One line per client: how the deletions were split."""
+    return "\n".join(
+        f"  client #{number}: {count} deletion(s)"
+        for number, count in enumerate(report["per_client"], start=1)
+    )
@@ -0,0 +1,229 @@
+"""What-if rule simulator over a cached snapshot of an account's history.
+
+A snapshot keeps only the fields the deletion rules look at — item type,
+score, creation time, reply count and subreddit — in compact typed column
+arrays, so any combination of thresholds can be evaluated across the whole
+history in milliseconds without touching the Reddit API.
+
+Rules are dicts of optional thresholds that must all hold for an item to
+match; several rules are OR-ed together (the weekly job's criteria are two
+rules). Supported keys:
+
+    max_score       score <= N
+    min_age_days    at least N days old
+    max_replies     at most N direct replies (comments whose reply count was
+                    not captured never match)
+    subreddits      list of subreddit names (case-insensitive)
+    kind            "comment" or "post"
+"""
+
+import json
+import math
+import operator
+import time
+from array import array
+from itertools import repeat
+
+SNAPSHOT_FILE = "history_snapshot.json"
+
+COMMENT, POST = 0, 1
+KINDS = {"comment": COMMENT, "post": POST}
+# Reply count for comments captured without refresh()
+UNKNOWN_REPLIES = -1
+
+RULE_KEYS = ("max_score", "min_age_days", "max_replies", "subreddits", "kind")
+
+
+class HistorySnapshot:
+    """Column-oriented snapshot of an account's comments and posts."""
+
+    def __init__(self, taken_at=None):
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.kind = array("b")
+        self.score = array("l")
+        self.created_utc = array("q")
+        self.replies = array("l")
+        self.subreddit = array("l")  # index into self.subreddits
+        self.subreddits = []
+        self._subreddit_index = {}
+
+    def __len__(self):
+        return len(self.kind)
+
+    def add(self, kind, score, created_utc, replies, subreddit):
+        """Append one item; *kind* is COMMENT or POST."""
+        index = self._subreddit_index.get(subreddit)
+        if index is None:
+            index = self._subreddit_index[subreddit] = len(self.subreddits)
+            self.subreddits.append(subreddit)
+        self.kind.append(kind)
+        self.score.append(score)
+        self.created_utc.append(int(created_utc))
+        self.replies.append(replies)
+        self.subreddit.append(index)
+
+    def add_comment(self, comment, replies=UNKNOWN_REPLIES):
+        self.add(COMMENT, comment.score, comment.created_utc, replies, str(comment.subreddit))
+
+    def add_post(self, submission):
+        self.add(POST, submission.score, submission.created_utc, submission.num_comments, str(submission.subreddit))
+
+    @classmethod
+    def capture(cls, reddit, username, *, with_replies=False):
+        """Walk the account's history once and build a snapshot.
+
+        Args:
+            reddit (praw.Reddit): Authenticated Reddit instance.
+            username (str): Reddit username.
+            with_replies (bool): refresh() every comment to record its reply
+                count. This costs one extra request per comment.
+        """
+        # Imported here: rule evaluation alone doesn't need praw
+        from redditcleaner.progress import Progress
+        from redditcleaner.utils import fetch, iter_listing
+
+        snapshot = cls()
+        comments = iter_listing(reddit.redditor(username).comments.new(limit=None), "comment page")
+        with Progress("comment") as progress:
+            for comment in comments:
+                progress.advance()
+                replies = UNKNOWN_REPLIES
+                if with_replies:
+                    fetch(comment.refresh, f"reply count of {comment.id}")
+                    replies = len(comment.replies)
+                snapshot.add_comment(comment, replies)
+        posts = iter_listing(reddit.redditor(username).submissions.new(limit=None), "post page")
+        with Progress("post") as progress:
+            for submission in posts:
+                progress.advance()
+                snapshot.add_post(submission)
+        return snapshot
+
+    # ── Persistence ───────────────────────────────────────────────────────
+
+    def to_dict(self):
+        return {
+            "taken_at": self.taken_at,
+            "subreddits": self.subreddits,
+            "kind": self.kind.tolist(),
+            "score": self.score.tolist(),
+            "created_utc": self.created_utc.tolist(),
+            "replies": self.replies.tolist(),
+            "subreddit": self.subreddit.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        snapshot = cls(taken_at=data["taken_at"])
+        snapshot.subreddits = list(data["subreddits"])
+        snapshot._subreddit_index = {name: i for i, name in enumerate(snapshot.subreddits)}
+        snapshot.kind = array("b", data["kind"])
+        snapshot.score = array("l", data["score"])
+        snapshot.created_utc = array("q", data["created_utc"])
+        snapshot.replies = array("l", data["replies"])
+        snapshot.subreddit = array("l", data["subreddit"])
+        return snapshot
+
+    def save(self, path=SNAPSHOT_FILE):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_FILE):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    # ── Evaluation ────────────────────────────────────────────────────────
+
+    @property
+    def has_reply_counts(self):
+        """False if any comment was captured without its reply count (see capture())."""
+        return UNKNOWN_REPLIES not in self.replies
+
+    def count(self, rules, now=None):
+        """Count the items matched by any of *rules*.
+
+        Rules are evaluated a column at a time: each threshold is mapped over
+        its whole array with a C-level comparison into a bitmask (one byte
+        per item), and the masks of a rule's thresholds, and of the rules,
+        are combined with integer ``&``/``|``. No Python code runs per item.
+
+        Args:
+            rules (list[dict]): Rules as described in the module docstring.
+            now (float): Reference time for ages (default: current time).
+
+        Returns:
+            dict: {"comments": int, "posts": int}
+        """
+        now = time.time() if now is None else now
+        matched = 0
+        for rule in rules:
+            matched |= self._mask(rule, now)
+        posts = _popcount(matched & self._kind_mask(POST))
+        return {"comments": _popcount(matched) - posts, "posts": posts}
+
+    def _mask(self, rule, now):
+        """Bitmask of the items matching *rule*, built column by column."""
+        unknown = set(rule) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown rule key(s): {', '.join(sorted(unknown))}")
+
+        mask = _to_mask(bytes([1]) * len(self))
+        if rule.get("kind") is not None:
+            mask &= self._kind_mask(KINDS[rule["kind"]])
+        if rule.get("max_score") is not None:
+            mask &= _column_mask(operator.le, self.score, rule["max_score"])
+        if rule.get("min_age_days") is not None:
+            # Timestamps are whole seconds; an int bound compares faster than a float
+            created_before = math.floor(now - rule["min_age_days"] * 86400)
+            mask &= _column_mask(operator.le, self.created_utc, created_before)
+        if rule.get("max_replies") is not None:
+            mask &= _column_mask(operator.le, self.replies, rule["max_replies"])
+            mask &= _column_mask(operator.ne, self.replies, UNKNOWN_REPLIES)
+        if rule.get("subreddits"):
+            wanted = {name.lower() for name in rule["subreddits"]}
+            indices = {i for i, name in enumerate(self.subreddits) if name.lower() in wanted}
+            mask &= _column_mask(indices.__contains__, self.subreddit)
+        return mask
+
+    def _kind_mask(self, kind):
+        # self.kind holds one byte per item, 0 (COMMENT) or 1 (POST): it already is the post mask
+        posts = _to_mask(self.kind.tobytes())
+        return posts if kind == POST else posts ^ _to_mask(bytes([1]) * len(self))
+
+
+def _to_mask(flags):
+    return int.from_bytes(flags, "big")
+
+
+def _column_mask(test, column, *operands):
+    """Mask of the items for which test(value, *operands) holds, for each value in *column*."""
+    return _to_mask(bytes(map(test, column, *(repeat(operand, len(column)) for operand in operands))))
+
+
+def _popcount(mask):
+    if hasattr(mask, "bit_count"):  # Python 3.10+
+        return mask.bit_count()
+    return bin(mask).count("1")
+
+
+def parse_rule(text):
+    """Parse "max_score=1,min_age_days=14,subreddits=a+b" into a rule dict."""
+    rule = {}
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        key, value = key.strip(), value.strip()
+        if not sep or key not in RULE_KEYS:
+            raise ValueError(f"Invalid rule term {part!r}; expected one of {', '.join(RULE_KEYS)}=<value>")
+        if key == "subreddits":
+            rule[key] = [name for name in value.split("+") if name]
+        elif key == "kind":
+            if value not in KINDS:
+                raise ValueError("kind must be 'comment' or 'post'")
+            rule[key] = value
+        else:
+            rule[key] = int(value)
+    return rule
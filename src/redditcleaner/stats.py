@@ -0,0 +1,242 @@
+"""Incrementally maintained deletion statistics.
+
+Every deletion logged through ``DeletionLog`` is also folded into
+``deletion_stats.json`` next to the log file, so per-type, per-source,
+per-subreddit, per-month and score-distribution totals can be read in O(1)
+instead of re-parsing ``deleted_comments.txt`` / ``deleted_posts.txt``.
+A record is logged before its item is edited, so its text survives a
+failed run, but it is only counted once the deletion has succeeded.
+
+Several processes (cron jobs, web workers) may share one log directory, so
+the stats file is only read and replaced under an exclusive lock on
+``deletion_stats.json.lock``.
+
+If the stats file is missing while logs already exist (e.g. logs written by
+an older version), it is rebuilt from the logs once before new records are
+added. A rebuild counts each logged item once, including items whose
+deletion never succeeded.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+STATS_FILE = "deletion_stats.json"
+LOG_FILES = {"comment": "deleted_comments.txt", "post": "deleted_posts.txt"}
+
+# Stats are merged into the file every this many appended records (and on close)
+FLUSH_EVERY = 50
+
+SCORE_BUCKETS = ("<0", "0", "1", "2-9", "10-99", "100+")
+
+_lock = threading.Lock()
+
+
+@contextmanager
+def _stats_lock(log_dir):
+    """Hold the stats lock for *log_dir*, against other threads and other processes."""
+    with _lock, open(os.path.join(log_dir, STATS_FILE + ".lock"), "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def empty_stats():
+    return {
+        "total": 0,
+        "by_type": {},
+        "by_source": {},
+        "by_subreddit": {},
+        "by_month": {},
+        "score": {
+            "histogram": dict.fromkeys(SCORE_BUCKETS, 0),
+            "sum": 0,
+            "min": None,
+            "max": None,
+        },
+    }
+
+
+def score_bucket(score):
+    if score < 0:
+        return "<0"
+    if score <= 1:
+        return str(score)
+    if score < 10:
+        return "2-9"
+    if score < 100:
+        return "10-99"
+    return "100+"
+
+
+def _bump(counts, key, n=1):
+    counts[key] = counts.get(key, 0) + n
+
+
+def add_record(stats, record, item_type):
+    """Fold one deletion record (from build_deletion_record) into *stats*."""
+    stats["total"] += 1
+    _bump(stats["by_type"], item_type)
+    _bump(stats["by_source"], record.get("source", "unknown"))
+    _bump(stats["by_subreddit"], record.get("subreddit", "unknown"))
+    _bump(stats["by_month"], record.get("deleted_at", "unknown")[:7])
+
+    score = record.get("score")
+    if isinstance(score, int):
+        dist = stats["score"]
+        dist["histogram"][score_bucket(score)] += 1
+        dist["sum"] += score
+        dist["min"] = score if dist["min"] is None else min(dist["min"], score)
+        dist["max"] = score if dist["max"] is None else max(dist["max"], score)
+
+
+def merge(stats, delta):
+    """Add the totals in *delta* into *stats* in place."""
+    stats["total"] += delta["total"]
+    for key in ("by_type", "by_source", "by_subreddit", "by_month"):
+        for name, n in delta[key].items():
+            _bump(stats[key], name, n)
+
+    dist, extra = stats["score"], delta["score"]
+    for bucket, n in extra["histogram"].items():
+        _bump(dist["histogram"], bucket, n)
+    dist["sum"] += extra["sum"]
+    for key, pick in (("min", min), ("max", max)):
+        if extra[key] is not None:
+            dist[key] = extra[key] if dist[key] is None else pick(dist[key], extra[key])
+
+
+def rebuild_stats(log_dir):
+    """Recompute the aggregates from scratch by parsing the log files.
+
+    An item logged again by a retry is counted once, with its last record.
+    """
+    stats = empty_stats()
+    for item_type, name in LOG_FILES.items():
+        path = os.path.join(log_dir, name)
+        if not os.path.exists(path):
+            continue
+        records = {}
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # pre-JSON or truncated line
+                records[record.get("id", n)] = record
+        for record in records.values():
+            add_record(stats, record, item_type)
+    return stats
+
+
+def rewrite_stats(log_dir):
+    """Rebuild the stats file in *log_dir* from the logs and return the new stats.
+
+    Runs under the stats lock, so a cleanup flushing at the same time is
+    neither overwritten nor lost.
+    """
+    with _stats_lock(log_dir):
+        stats = rebuild_stats(log_dir)
+        save_stats(log_dir, stats)
+    return stats
+
+
+def load_stats(log_dir):
+    """Return the aggregates for *log_dir*, or empty stats if none exist yet."""
+    path = os.path.join(log_dir, STATS_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return empty_stats()
+
+
+def save_stats(log_dir, stats):
+    """Atomically replace the stats file in *log_dir*."""
+    path = os.path.join(log_dir, STATS_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class DeletionLog:
+    """Append-only JSON-lines deletion log that keeps the stats file current.
+
+    Use as a context manager; log each record before the item is edited,
+    and count it once the deletion has succeeded::
+
+        with DeletionLog("deleted_comments.txt", "comment") as log:
+            record = build_deletion_record(comment, "comment", "ci")
+            log.append(record)
+            edit_and_delete(comment, "comment")
+            log.count(record)
+
+    ``append`` and ``count`` may be called from several threads at once.
+    """
+
+    def __init__(self, path, item_type):
+        self.path = path
+        self.item_type = item_type
+        self.log_dir = os.path.dirname(os.path.abspath(path))
+        self._file = None
+        self._delta = empty_stats()
+        self._append_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the log file and merge the remaining records into the stats file."""
+        if self._file is not None:
+            self._file.close()
+        self.flush_stats()
+
+    def append(self, record):
+        """Write *record* as one JSON line (it is not counted until count())."""
+        with self._append_lock:
+            if self._file is None:
+                # Opened on first use so dry runs leave no files behind
+                with _stats_lock(self.log_dir):
+                    if not os.path.exists(os.path.join(self.log_dir, STATS_FILE)):
+                        save_stats(self.log_dir, rebuild_stats(self.log_dir))
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+
+    def count(self, record):
+        """Count the logged *record* in the aggregates, now that its item is deleted."""
+        with self._append_lock:
+            add_record(self._delta, record, self.item_type)
+            if self._delta["total"] >= FLUSH_EVERY:
+                if self._file is not None:
+                    self._file.flush()
+                self.flush_stats()
+
+    def flush_stats(self):
+        """Merge the records counted since the last flush into the stats file."""
+        if not self._delta["total"]:
+            return
+        with _stats_lock(self.log_dir):
+            stats = load_stats(self.log_dir)
+            merge(stats, self._delta)
+            save_stats(self.log_dir, stats)
+        self._delta = empty_stats()
@@ -0,0 +1,170 @@
+"""Opt-in request timeline in Chrome/Perfetto trace-event format.
+
+``--trace FILE`` (cleaners, weekly job, web app) records every API request —
+listing pages, /api/info lookups, refreshes, edits, deletes, OAuth token
+fetches — plus rate-limit sleeps, circuit-breaker pauses and per-item
+edit-and-delete spans, each as a timed span with the item ids involved.
+Open the file in https://ui.perfetto.dev or chrome://tracing to see serial
+gaps, sleep storms and slow endpoints on a timeline; each thread (or, in the
+async web app, each request task) gets its own track.
+
+Events are streamed to the file as they finish, in the JSON array format,
+so memory stays flat and a run killed part-way still leaves a loadable
+trace (the closing bracket is optional). With tracing off, every hook is a
+single attribute check.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Request/param keys whose values identify items; bodies and text are never recorded
+_ID_KEYS = ("id", "thing_id", "after", "before")
+
+
+def classify_request(method, path):
+    """Return the span name for a Reddit API request: "listing page", "edit", …"""
+    path = path.rstrip("/")  # PRAW's API paths end in a slash
+    if path.endswith("/access_token"):
+        return "auth"
+    if path == "/api/editusertext":
+        return "edit"
+    if path == "/api/del":
+        return "delete"
+    if path == "/api/info":
+        return "lookup"
+    if method == "GET" and "/comments/" in path:
+        return "refresh"
+    if method == "GET" and path.startswith(("/user/", "/u/")):
+        return "listing page"
+    return "request"
+
+
+def _ids(values):
+    if not values:
+        return {}
+    pairs = values.items() if isinstance(values, dict) else values
+    return {key: value for key, value in pairs if key in _ID_KEYS}
+
+
+class Tracer:
+    """Writes trace events for one process; ``TRACER`` is the shared instance.
+
+    Args:
+        clock: Monotonic clock in seconds (injectable for tests).
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.path = None
+        self._file = None
+        self._first = True
+        self._clock = clock
+        self._origin = clock()
+        self._lock = threading.Lock()
+        self._tracks = weakref.WeakKeyDictionary()
+        self._track_ids = itertools.count(1)
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    def start(self, path):
+        """Start writing events to *path*; the file is closed at interpreter exit."""
+        if self._file is not None:
+            return
+        self.path = path
+        # Line-buffered, so every event is on disk as soon as it is written
+        self._file = open(path, "w", encoding="utf-8", buffering=1)
+        self._file.write("[")
+        self._first = True
+        self._origin = self._clock()
+        self._emit({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "redditcleaner"}})
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Close the array and the file (idempotent)."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write("\n]\n")
+            self._file.close()
+            self._file = None
+
+    @contextmanager
+    def span(self, name, cat, **args):
+        """Record the enclosed block as one span; yields *args* so results can be added."""
+        if self._file is None:
+            yield args
+            return
+        start = self._clock()
+        try:
+            yield args
+        finally:
+            self.complete(name, cat, start, self._clock() - start, **args)
+
+    def complete(self, name, cat, start, duration, **args):
+        """Record a span from *start* (this tracer's clock) lasting *duration* seconds."""
+        if self._file is None:
+            return
+        self._emit({
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": self._track(),
+            "args": args,
+        })
+
+    def sleep(self, seconds, source):
+        """Record a rate-limit sleep of *seconds* that is about to start."""
+        self.complete("rate-limit sleep", "sleep", self._clock(), seconds, source=source)
+
+    @contextmanager
+    def request(self, method, url, params=None, data=None):
+        """Span for one HTTP request; yields its args so status and size can be added."""
+        method, path = method.upper(), urlsplit(url).path
+        args = {"method": method, "path": path, **_ids(params), **_ids(data)}
+        with self.span(classify_request(method, path), "request", **args) as span_args:
+            yield span_args
+
+    def _track(self):
+        """Small integer id of the current asyncio task, or else the current thread."""
+        owner = None
+        asyncio = sys.modules.get("asyncio")  # never imported just for this
+        if asyncio is not None:
+            try:
+                owner = asyncio.current_task()
+            except RuntimeError:
+                owner = None
+        if owner is not None:
+            name = owner.get_name()
+        else:
+            owner = threading.current_thread()
+            name = owner.name
+        with self._lock:
+            tid = self._tracks.get(owner)
+            if tid is not None:
+                return tid
+            tid = self._tracks[owner] = next(self._track_ids)
+        self._emit({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}})
+        return tid
+
+    def _emit(self, event):
+        line = json.dumps(event, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(("\n" if self._first else ",\n") + line)
+            self._first = False
+
+
+TRACER = Tracer()
@@ -6,21 +6,49 @@ from datetime import datetime, timezone
 import praw
 import prawcore
 
+from redditcleaner.circuit import TRANSIENT_ERRORS, CircuitBreaker, CircuitOpenError
+from redditcleaner.ledger import SCRUBBED, DeletionLedger, default_path
+from redditcleaner.progress import METER, CountingRequestor
+from redditcleaner.tracing import TRACER
+
 _RETRY_WAIT = (5, 15, 45)
 
+# Per-item failures that the cleanup loops report and skip past
+DELETE_ERRORS = (
+    praw.exceptions.APIException,
+    prawcore.exceptions.TooManyRequests,
+    prawcore.exceptions.Forbidden,
+    *TRANSIENT_ERRORS,
+)
+
+# Shared by every API call in the process; see redditcleaner.circuit
+REDDIT_BREAKER = CircuitBreaker()
+
+# Consulted by every deletion in the process; see redditcleaner.ledger
+DELETION_LEDGER = DeletionLedger(default_path())
+# Progress note for items delete_once() skipped
+SKIPPED_NOTE = "already deleted, or being deleted by another run"
+# Progress note for listed items of another account, which are left alone
+FOREIGN_NOTE = "posted by another account, left alone"
+
+# /api/info accepts at most 100 fullnames per request
+INFO_BATCH_SIZE = 100
+
 
 def _with_retry(fn, label="operation"):
-    """Call fn(), retrying up to 3 times on rate-limit errors."""
+    """Call fn() through the circuit breaker, retrying up to 3 times on rate-limit errors."""
     for attempt, wait in enumerate(_RETRY_WAIT, start=1):
         try:
-            return fn()
+            return REDDIT_BREAKER.call(fn)
         except prawcore.exceptions.TooManyRequests as exc:
             retry_after = getattr(exc, "retry_after", None) or wait
             print(f"  Rate limited on {label}. Waiting {retry_after}s (attempt {attempt}/3)…")
+            METER.add_sleep(retry_after)
+            TRACER.sleep(retry_after, "429")
             time.sleep(retry_after)
         except praw.exceptions.APIException:
             raise
-    return fn()
+    return REDDIT_BREAKER.call(fn)
 
 
 def get_reddit_credentials(credentials_file="Credentials.txt"):
@@ -49,6 +77,32 @@ def get_reddit_credentials(credentials_file="Credentials.txt"):
     return client_id, client_secret, username, password
 
 
+def get_extra_clients(credentials_file="Credentials.txt"):
+    """Load extra OAuth clients for the same account from the credentials file.
+
+    Lines after the first four are read as client_id / client_secret pairs
+    (blank lines are ignored); each pair is another app registered to the
+    account, used to spread large deletion runs (see redditcleaner.shards).
+
+    Args:
+        credentials_file (str): Path to the file containing Reddit credentials.
+
+    Returns:
+        list: (client_id, client_secret) tuples; empty if there are none.
+
+    Raises:
+        ValueError: If the last client id has no secret.
+    """
+    try:
+        with open(credentials_file, encoding="utf-8") as f:
+            values = [line.strip() for line in f.readlines()[4:] if line.strip()]
+    except FileNotFoundError:
+        return []
+    if len(values) % 2:
+        raise ValueError(f"extra client {values[-1]!r} has no client secret")
+    return list(zip(values[::2], values[1::2]))
+
+
 def confirm_and_run():
     """Ask the user for confirmation to run the script.
 
@@ -79,6 +133,7 @@ def initialize_reddit(client_id, client_secret, username, password):
             password=password,
             user_agent="commentCleaner",
             validate_on_submit=True,
+            requestor_class=CountingRequestor,
         )
         reddit.user.me()
         print("Authenticated successfully.")
@@ -92,13 +147,14 @@ def initialize_reddit(client_id, client_secret, username, password):
         exit()
 
 
-def build_deletion_record(item, item_type, source):
+def build_deletion_record(item, item_type, source, matched=None):
     """Serialize a deleted comment or submission into a JSON-loggable dict.
 
     Args:
         item: A PRAW Comment (item_type="comment") or Submission (item_type="post").
         item_type (str): "comment" or "post".
         source (str): Tag identifying which script/mode performed the deletion.
+        matched (str): Text-pattern rule that selected the item, if any.
 
     Returns:
         dict: Ready to be passed to json.dumps().
@@ -118,6 +174,8 @@ def build_deletion_record(item, item_type, source):
         record["permalink"] = f"https://reddit.com{item.permalink}"
         record["body"] = item.body
     record["source"] = source
+    if matched is not None:
+        record["matched"] = matched
     return record
 
 
@@ -128,8 +186,259 @@ def edit_and_delete(item, label):
         item: A PRAW Comment or Submission.
         label (str): "comment" or "post" — used in retry log messages.
     """
-    _with_retry(lambda: item.edit("."), f"{label} edit")
-    _with_retry(item.delete, f"{label} delete")
+    with TRACER.span("edit_and_delete", "item", id=item.fullname):
+        _with_retry(lambda: item.edit("."), f"{label} edit")
+        _with_retry(item.delete, f"{label} delete")
+
+
+class DeletionClaim:
+    """One item's pass through DELETION_LEDGER on its way to being deleted.
+
+    Holds the ordering every delete path shares: the item is claimed, its
+    record is logged before Reddit is asked to change it, the ledger records
+    the outcome, and the deletion is counted in the stats only once it
+    succeeded. Each step is a plain blocking call, so the async dashboard
+    runs them in worker threads around its awaited requests.
+
+    Args:
+        fullname (str): The item's fullname, e.g. "t1_abc123".
+        log (DeletionLog): Log the record goes to, or None to skip logging.
+        scrubbed (bool): The item was overwritten by a scrub-first run, which
+            already logged its record; it is only deleted, and stays
+            scrubbed if that fails.
+    """
+
+    def __init__(self, fullname, log, *, scrubbed=False):
+        self.fullname = fullname
+        self.log = log
+        self.scrubbed = scrubbed
+        self._record = None
+
+    def claim(self):
+        """Claim the item in the ledger; False if it is already handled, or not scrubbed."""
+        ledger = DELETION_LEDGER
+        if self.scrubbed and ledger.state(self.fullname) != SCRUBBED:
+            return False
+        return ledger.claim(self.fullname)
+
+    def record(self, record):
+        """Keep the item's deletion record, logging it unless a scrub already did."""
+        self._record = record
+        if not self.scrubbed and self.log is not None:
+            self.log.append(record)
+
+    def finish(self, error=None):
+        """Record the outcome: done and counted, or *error* for a later run to retry."""
+        ledger = DELETION_LEDGER
+        if error is not None:
+            (ledger.scrub if self.scrubbed else ledger.fail)(self.fullname, error)
+            return
+        ledger.complete(self.fullname)
+        if self._record is not None and self.log is not None:
+            self.log.count(self._record)
+
+
+def delete_once(item, label, log, source, matched=None, *, lazy=False):
+    """Log and delete *item* unless the deletion ledger says it is already handled.
+
+    The item is claimed in DELETION_LEDGER first; if it was already deleted,
+    or another run is deleting it right now, nothing is logged and no request
+    is made. Otherwise the outcome is recorded in the ledger, and any error
+    is re-raised after marking the item failed (so a later run retries it).
+    The record is logged before the edit and counted in the stats once the
+    deletion succeeded. An item left scrubbed by an interrupted scrub-first
+    run is only deleted; its record was logged before it was overwritten.
+
+    Args:
+        item: A PRAW Comment or Submission.
+        label (str): "comment" or "post".
+        log (DeletionLog): Log the deletion record is appended to.
+        source (str): Tag identifying which script/mode performed the deletion.
+        matched (str): Text-pattern rule that selected the item, if any.
+        lazy (bool): *item* has not been fetched yet, so building its record
+            makes a request; route that through the circuit breaker too.
+
+    Returns:
+        bool: True if the item was deleted, False if it was skipped.
+    """
+    if DELETION_LEDGER.state(item.fullname) == SCRUBBED:
+        return delete_scrubbed(item, label, log, source, matched, lazy=lazy)
+    claim = DeletionClaim(item.fullname, log)
+    if not claim.claim():
+        return False
+    try:
+        claim.record(_build_record(item, label, source, matched, lazy))
+        edit_and_delete(item, label)
+    except BaseException as e:
+        claim.finish(e)
+        raise
+    claim.finish()
+    return True
+
+
+def scrub_once(item, label, log, source, matched=None, *, lazy=False):
+    """First phase of a scrub-first run: log *item* and overwrite it, but don't delete it yet.
+
+    Claims the item like delete_once(); once the edit succeeds the ledger
+    records it as scrubbed, which is the checkpoint delete_scrubbed() and
+    a resumed run start from. An item already scrubbed by an earlier run is
+    accepted again without any request.
+
+    Args:
+        Same as delete_once().
+
+    Returns:
+        bool: True if the item is scrubbed and awaits deletion, False if it was skipped.
+    """
+    ledger = DELETION_LEDGER
+    if ledger.state(item.fullname) == SCRUBBED:
+        return True
+    if not ledger.claim(item.fullname):
+        return False
+    try:
+        log.append(_build_record(item, label, source, matched, lazy))
+        with TRACER.span("scrub", "item", id=item.fullname):
+            _with_retry(lambda: item.edit("."), f"{label} edit")
+    except BaseException as e:
+        ledger.fail(item.fullname, e)
+        raise
+    ledger.scrub(item.fullname)
+    return True
+
+
+def delete_scrubbed(item, label, log=None, source=None, matched=None, *, lazy=False):
+    """Second phase of a scrub-first run: delete an item scrub_once() overwrote.
+
+    Items the ledger does not list as scrubbed are skipped, so nothing is
+    deleted without its record having been logged. On failure the item
+    stays scrubbed, and the next run retries only the delete. The record
+    was logged when the item was scrubbed; with a *log*, the deletion is
+    counted in its stats once it succeeds.
+
+    Args:
+        Same as delete_once().
+
+    Returns:
+        bool: True if the item was deleted, False if it was skipped.
+    """
+    claim = DeletionClaim(item.fullname, log, scrubbed=True)
+    if not claim.claim():
+        return False
+    try:
+        # Built before the delete, while the item can still be fetched
+        if log is not None:
+            claim.record(_build_record(item, label, source, matched, lazy))
+        with TRACER.span("delete scrubbed", "item", id=item.fullname):
+            _with_retry(item.delete, f"{label} delete")
+    except BaseException as e:
+        claim.finish(e)
+        raise
+    claim.finish()
+    return True
+
+
+def _build_record(item, label, source, matched, lazy):
+    if lazy:
+        return REDDIT_BREAKER.call(lambda: build_deletion_record(item, label, source, matched))
+    return build_deletion_record(item, label, source, matched)
+
+
+def is_gone(item):
+    """Return True if *item* has already been deleted or removed."""
+    if getattr(item, "author", None) is None:
+        return True
+    if item.fullname.startswith("t1_"):
+        return item.body in ("[deleted]", "[removed]")
+    return getattr(item, "removed_by_category", None) is not None
+
+
+def iter_info(reddit, fullnames, batch_size=INFO_BATCH_SIZE):
+    """Hydrate *fullnames* via /api/info, one request per *batch_size* ids.
+
+    *fullnames* may be any iterable (including a lazily-read file), so the
+    ids are never held in memory more than one batch at a time. Items that
+    Reddit no longer returns, or that are already deleted, are skipped.
+
+    Args:
+        reddit (praw.Reddit): Authenticated Reddit instance.
+        fullnames: Iterable of fullnames such as "t1_abc123" / "t3_xyz789".
+        batch_size (int): Ids per request (Reddit's maximum is 100).
+
+    Yields:
+        Live PRAW Comment / Submission objects.
+    """
+    batch = []
+    for fullname in fullnames:
+        batch.append(fullname)
+        if len(batch) == batch_size:
+            yield from _info_batch(reddit, batch)
+            batch = []
+    if batch:
+        yield from _info_batch(reddit, batch)
+
+
+def _info_batch(reddit, batch):
+    items = _with_retry(lambda: list(reddit.info(fullnames=batch)), "info lookup")
+    for item in items:
+        if not is_gone(item):
+            yield item
+
+
+def fetch(fn, label="fetch"):
+    """Call fn() for a read-only request, retrying rate limits and transient errors.
+
+    Reads (listing pages, refreshes) are safe to repeat, so unlike
+    _with_retry() a 5xx or network error is retried too, after the same
+    waits. Every attempt goes through the circuit breaker in
+    CountingRequestor. If the last retry fails, CircuitOpenError is raised
+    so the caller stops with its outage summary instead of an unhandled
+    ServerError.
+
+    Raises:
+        CircuitOpenError: If the request kept failing, or the breaker gave up.
+    """
+    for attempt, wait in enumerate(_RETRY_WAIT, start=1):
+        try:
+            return fn()
+        except prawcore.exceptions.TooManyRequests as exc:
+            retry_after = getattr(exc, "retry_after", None) or wait
+            print(f"  Rate limited on {label}. Waiting {retry_after}s (attempt {attempt}/3)…")
+            METER.add_sleep(retry_after)
+            TRACER.sleep(retry_after, "429")
+            time.sleep(retry_after)
+        except TRANSIENT_ERRORS as exc:
+            print(f"  {label} failed ({exc}). Retrying in {wait}s (attempt {attempt}/3)…")
+            with TRACER.span("retry wait", "sleep", seconds=wait):
+                time.sleep(wait)
+    try:
+        return fn()
+    except (prawcore.exceptions.TooManyRequests, *TRANSIENT_ERRORS) as exc:
+        raise CircuitOpenError(f"{label} still failing after {len(_RETRY_WAIT)} retries ({exc})") from exc
+
+
+def iter_listing(listing, label="listing page"):
+    """Iterate a lazily-fetched PRAW *listing*, fetching a failed page again.
+
+    Each page is requested through fetch(); PRAW resumes from the page that
+    failed.
+
+    Args:
+        listing: Iterable such as ``redditor.comments.new(limit=None)``.
+        label (str): What is being fetched, for the retry messages.
+
+    Yields:
+        The listing's items.
+
+    Raises:
+        CircuitOpenError: If a page kept failing, or the breaker gave up.
+    """
+    items = iter(listing)
+    while True:
+        try:
+            item = fetch(lambda: next(items), label)
+        except StopIteration:
+            return
+        yield item
 
 
 def get_days_old(prompt="Enter how old (in days) the items should be: "):
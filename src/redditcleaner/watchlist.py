@@ -0,0 +1,89 @@
+"""Persistent state for incremental weekly cleanups.
+
+A full walk of the account history is only needed once. Afterwards each run
+walks the listings only back to the newest item the previous run saw (the
+per-type *cursor*) and re-checks the *watched* items — those whose fate
+was still undecided last time — with batched /api/info lookups. The state
+lives in ``weekly_watchlist.json``::
+
+    {"v": 1,
+     "cursors": {"comment": {"name": "t1_abc", "created_utc": 1700000000.0}, ...},
+     "items": {"t1_def": 1700000000.0, ...}}
+"""
+
+import json
+import os
+
+WATCHLIST_FILE = "weekly_watchlist.json"
+FORMAT_VERSION = 1
+
+
+class Watchlist:
+    """Listing cursors plus the fullnames (and creation times) of watched items."""
+
+    def __init__(self, cursors=None, items=None):
+        self.cursors = cursors or {}
+        self.items = items or {}
+
+    def __len__(self):
+        return len(self.items)
+
+    @classmethod
+    def load(cls, path=WATCHLIST_FILE):
+        """Load saved state, or return an empty watchlist if there is none usable."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls()
+        if data.get("v") != FORMAT_VERSION:
+            return cls()
+        return cls(data["cursors"], data["items"])
+
+    def save(self, path=WATCHLIST_FILE):
+        """Atomically replace the state file at *path*."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"v": FORMAT_VERSION, "cursors": self.cursors, "items": self.items}, f)
+        os.replace(tmp_path, path)
+
+    def watch(self, item):
+        """Re-check *item* on the next run."""
+        self.items[item.fullname] = item.created_utc
+
+    def forget(self, fullname):
+        """Stop watching *fullname* (no error if it isn't watched)."""
+        self.items.pop(fullname, None)
+
+    def take(self):
+        """Remove and return the watched fullnames, oldest first."""
+        fullnames = sorted(self.items, key=self.items.get)
+        self.items = {}
+        return fullnames
+
+    def new_items(self, listing, kind, *, stop_at_cursor=True):
+        """Yield items from a newest-first *listing* until the saved cursor.
+
+        The first item yielded becomes the new cursor for *kind*, but only
+        once the walk is finished: the generator is resumed after the caller
+        has handled the last item. If the listing or the caller raises half
+        way, the old cursor stays, so the next run walks those items again
+        instead of skipping them. The walk stops at the cursor item itself
+        or, if that item has since been deleted, at the first item older
+        than it.
+
+        Args:
+            listing: Iterable of PRAW items, newest first.
+            kind (str): "comment" or "post".
+            stop_at_cursor (bool): False walks the whole listing (a full run).
+        """
+        cursor = self.cursors.get(kind) if stop_at_cursor else None
+        newest = None
+        for item in listing:
+            if cursor and (item.fullname == cursor["name"] or item.created_utc < cursor["created_utc"]):
+                break
+            if newest is None:
+                newest = {"name": item.fullname, "created_utc": item.created_utc}
+            yield item
+        if newest is not None:
+            self.cursors[kind] = newest
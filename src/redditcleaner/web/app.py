@@ -1,13 +1,37 @@
-import json
 import os
-from datetime import datetime, timezone
+import tempfile
+import time
 
 import praw
 import prawcore
-from flask import Flask, jsonify, redirect, render_template, request, session, url_for
+from flask import (
+    Flask,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    session,
+    url_for,
+)
 from flask_wtf.csrf import CSRFProtect
 
-from redditcleaner.utils import build_deletion_record, edit_and_delete
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.estimate import estimate_cost
+from redditcleaner.progress import CountingRequestor
+from redditcleaner.replay import start_session
+from redditcleaner.stats import DeletionLog
+from redditcleaner.tracing import TRACER
+from redditcleaner.utils import delete_once, iter_listing
+from redditcleaner.web.common import (
+    ItemsPayload,
+    compact_json,
+    compress,
+    query_page,
+    rule_from_args,
+)
+from redditcleaner.web.item_cache import ExpiringDict, SingleFlightCache
+from redditcleaner.web.item_store import ItemStore
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY") or os.urandom(24)
@@ -18,6 +42,19 @@ LOG_DIR = os.environ.get("LOG_DIR", os.getcwd())
 DELETED_COMMENTS_FILE = os.path.join(LOG_DIR, "deleted_comments.txt")
 DELETED_POSTS_FILE = os.path.join(LOG_DIR, "deleted_posts.txt")
 
+# Concurrent item loads for the same user share one history walk, and the
+# result is reused for ITEMS_CACHE_TTL seconds (dropped by that user's deletes)
+ITEMS_CACHE_TTL = int(os.environ.get("ITEMS_CACHE_TTL", "60"))
+ITEMS_CACHE = SingleFlightCache(ttl=ITEMS_CACHE_TTL)
+
+# Latest history snapshot per username, built by api_items for /api/simulate
+_SNAPSHOTS = ExpiringDict(ttl=ITEMS_CACHE_TTL)
+# Latest queryable items per username, built alongside the snapshot for
+# /api/query and /api/select; deletions are dropped from it in place. Both
+# are per process and dropped after ITEMS_CACHE_TTL seconds unused or on
+# logout; a worker without them loads the history again.
+_STORES = ExpiringDict(ttl=ITEMS_CACHE_TTL)
+
 
 def make_reddit():
     return praw.Reddit(
@@ -27,6 +64,7 @@ def make_reddit():
         password=session["password"],
         user_agent="commentCleaner",
         validate_on_submit=True,
+        requestor_class=CountingRequestor,
     )
 
 
@@ -50,6 +88,7 @@ def login():
             **creds,
             user_agent="commentCleaner",
             validate_on_submit=True,
+            requestor_class=CountingRequestor,
         )
         reddit.user.me()
         session.update(creds)
@@ -64,6 +103,11 @@ def login():
 
 @app.route("/logout")
 def logout():
+    username = session.get("username")
+    if username is not None:
+        ITEMS_CACHE.invalidate(username)
+        _STORES.pop(username)
+        _SNAPSHOTS.pop(username)
     session.clear()
     return redirect(url_for("index"))
 
@@ -75,47 +119,212 @@ def dashboard():
     return render_template("dashboard.html", username=session["username"])
 
 
+@app.errorhandler(CircuitOpenError)
+def reddit_unavailable(e):
+    """A history load that Reddit kept failing; the dashboard shows the error and can retry."""
+    return jsonify(error=str(e)), 503
+
+
 @app.route("/api/items")
 @csrf.exempt
 def api_items():
     if "username" not in session:
         return jsonify(error="Not authenticated"), 401
 
-    reddit = make_reddit()
     username = session["username"]
+    payload = ITEMS_CACHE.get_or_load(username, lambda: load_items(make_reddit(), username))
+    return compact_json_response(payload)
+
+
+def load_items(reddit, username):
+    """Walk *username*'s full history and build the /api/items payload.
+
+    See ItemsPayload for the format. The matching simulator snapshot and
+    item store are kept in _SNAPSHOTS and _STORES as a side effect, unless
+    a deletion invalidated the user's items while the walk ran.
+    """
+    generation = ITEMS_CACHE.generation(username)
+    items = ItemsPayload()
+    for c in iter_listing(reddit.redditor(username).comments.new(limit=None), "comment page"):
+        items.add_comment(c)
+    for s in iter_listing(reddit.redditor(username).submissions.new(limit=None), "post page"):
+        items.add_post(s)
+
+    payload = items.payload()
+
+    def publish():
+        _SNAPSHOTS[username] = items.snapshot
+        _STORES[username] = ItemStore(payload)
+
+    ITEMS_CACHE.publish(username, generation, publish)
+    return payload
+
+
+def _loaded(table, username):
+    """*username*'s entry in _STORES or _SNAPSHOTS, loading the history if this process has none."""
+    value = table.get(username)
+    if value is None:
+        ITEMS_CACHE.get_or_load(username, lambda: load_items(make_reddit(), username))
+        value = table.get(username)
+    return value
+
+
+@app.route("/api/load")
+@csrf.exempt
+def api_load():
+    """Load the history server-side (sharing /api/items' cache) and return only the counts.
+
+    The dashboard then pages through the items with /api/query instead of
+    downloading all of them.
+    """
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    username = session["username"]
+    payload = ITEMS_CACHE.get_or_load(username, lambda: load_items(make_reddit(), username))
+    store = _STORES.get(username)
+    if store is None:  # the load was invalidated by a deletion while it ran
+        store = ItemStore(payload)
+    return jsonify(comments=store.count("comment"), posts=store.count("post"), subreddits=store.subreddits)
+
+
+@app.route("/api/query")
+@csrf.exempt
+def api_query():
+    """One sorted page of the loaded items of ?kind=comment|post.
+
+    Filters are the simulator rule keys (max_score, min_age_days, max_replies,
+    subreddits as "a+b"); paging and order come from sort, order (asc/desc),
+    offset and limit (limit=0 returns just the total).
+    """
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    store = _loaded(_STORES, session["username"])
+    if store is None:
+        return jsonify(error="Load items first"), 409
+
+    try:
+        result = query_page(store, request.args)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return compact_json_response(result)
+
+
+@app.route("/api/select")
+@csrf.exempt
+def api_select():
+    """The ids of every loaded item matching the simulator rule in the query string."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    store = _loaded(_STORES, session["username"])
+    if store is None:
+        return jsonify(error="Load items first"), 409
+
+    try:
+        selected = store.select(rule_from_args(request.args))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return compact_json_response(selected)
 
-    comments = []
-    for c in reddit.redditor(username).comments.new(limit=None):
-        comments.append({
-            "id": c.id,
-            "type": "comment",
-            "body": c.body[:300],
-            "score": c.score,
-            "subreddit": str(c.subreddit),
-            "created_utc": int(c.created_utc),
-            "created_date": datetime.fromtimestamp(
-                c.created_utc, tz=timezone.utc
-            ).strftime("%Y-%m-%d"),
-            "permalink": "https://reddit.com" + c.permalink,
-        })
-
-    posts = []
-    for s in reddit.redditor(username).submissions.new(limit=None):
-        posts.append({
-            "id": s.id,
-            "type": "post",
-            "title": s.title,
-            "score": s.score,
-            "subreddit": str(s.subreddit),
-            "created_utc": int(s.created_utc),
-            "created_date": datetime.fromtimestamp(
-                s.created_utc, tz=timezone.utc
-            ).strftime("%Y-%m-%d"),
-            "num_comments": s.num_comments,
-            "permalink": "https://reddit.com" + s.permalink,
-        })
-
-    return jsonify(comments=comments, posts=posts)
+
+@app.route("/api/simulate")
+@csrf.exempt
+def api_simulate():
+    """Count the items a rule would match in the last loaded history.
+
+    Query parameters are the simulator rule keys (max_score, min_age_days,
+    max_replies, kind, subreddits as "a+b").
+    """
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    snapshot = _loaded(_SNAPSHOTS, session["username"])
+    if snapshot is None:
+        return jsonify(error="Load items first"), 409
+
+    try:
+        rule = rule_from_args(request.args)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(**snapshot.count([rule]), total=len(snapshot))
+
+
+@app.route("/api/estimate")
+@csrf.exempt
+def api_estimate():
+    """Predict requests and wall time for deleting ?comments=N&posts=M items.
+
+    Each web deletion fetches, edits and deletes the item, so it costs three
+    requests; one cheap call is made first so the rate-limit headers are known.
+    """
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    try:
+        matches = int(request.args.get("comments", 0)) + int(request.args.get("posts", 0))
+    except ValueError:
+        return jsonify(error="comments and posts must be integers"), 400
+
+    reddit = make_reddit()
+    reddit.user.me()
+    return jsonify(estimate_cost(0, matches, fetch_each=True, limits=reddit.auth.limits, now=time.time()))
+
+
+def compact_json_response(payload):
+    """Serialize *payload* as minified JSON with an ETag and content encoding.
+
+    Answers 304 when the client's If-None-Match still matches, and compresses
+    the body with brotli (if installed) or gzip when the client accepts it.
+    """
+    body, etag = compact_json(payload)
+    resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.vary.add("Accept-Encoding")
+    resp.make_conditional(request)
+
+    if resp.status_code != 200:
+        return resp
+    data, encoding = compress(body, request.accept_encodings)
+    if encoding is not None:
+        resp.set_data(data)
+        resp.headers["Content-Encoding"] = encoding
+    return resp
+
+
+@app.route("/api/export")
+@csrf.exempt
+def api_export():
+    """Download the full history as ?format=parquet (default) or arrow.
+
+    The history is walked again (full bodies, unlike /api/items) and spooled
+    to a temporary file in bounded-memory row groups; see redditcleaner.archive.
+    """
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+    try:
+        from redditcleaner import archive
+    except ModuleNotFoundError as e:
+        if e.name not in ("pyarrow", "pyarrow.parquet"):
+            raise
+        return jsonify(error="Export needs pyarrow: pip install 'redditcleaner[export]'"), 501
+
+    fmt = request.args.get("format", "parquet")
+    if fmt not in archive.FORMATS:
+        return jsonify(error=f"format must be one of: {', '.join(archive.FORMATS)}"), 400
+
+    username = session["username"]
+    spool = tempfile.TemporaryFile()
+    archive.export_history(make_reddit(), username, spool, fmt=fmt)
+    spool.seek(0)
+    return send_file(
+        spool,
+        mimetype=archive.FORMATS[fmt][1],
+        as_attachment=True,
+        download_name=archive.default_filename(username, fmt),
+    )
 
 
 @app.route("/api/delete", methods=["POST"])
@@ -131,39 +340,96 @@ def api_delete():
     deleted_comments = 0
     deleted_posts = 0
     errors = []
+    deleted_ids = {"comment": [], "post": []}
+    # Already deleted, or being deleted by another request (see redditcleaner.ledger)
+    skipped_ids = {"comment": [], "post": []}
+    pending_comment_ids, pending_post_ids = comment_ids, post_ids
 
-    with open(DELETED_COMMENTS_FILE, "a", encoding="utf-8") as cf:
-        for cid in comment_ids:
-            try:
-                comment = reddit.comment(cid)
-                cf.write(json.dumps(build_deletion_record(comment, "comment", "web")) + "\n")
-                edit_and_delete(comment, "comment")
-                deleted_comments += 1
-            except (
-                praw.exceptions.APIException,
-                prawcore.exceptions.PrawcoreException,
-            ) as e:
-                errors.append(f"Comment {cid}: {e}")
-
-    with open(DELETED_POSTS_FILE, "a", encoding="utf-8") as pf:
-        for pid in post_ids:
-            try:
-                submission = reddit.submission(pid)
-                pf.write(json.dumps(build_deletion_record(submission, "post", "web")) + "\n")
-                edit_and_delete(submission, "post")
-                deleted_posts += 1
-            except (
-                praw.exceptions.APIException,
-                prawcore.exceptions.PrawcoreException,
-            ) as e:
-                errors.append(f"Post {pid}: {e}")
+    try:
+        with DeletionLog(DELETED_COMMENTS_FILE, "comment") as log:
+            for n, cid in enumerate(comment_ids):
+                pending_comment_ids = comment_ids[n:]
+                try:
+                    # Building the record fetches the comment, so it goes through the breaker too
+                    if not delete_once(reddit.comment(cid), "comment", log, "web", lazy=True):
+                        skipped_ids["comment"].append(cid)
+                        continue
+                    deleted_ids["comment"].append(cid)
+                    deleted_comments += 1
+                except (
+                    praw.exceptions.APIException,
+                    prawcore.exceptions.PrawcoreException,
+                ) as e:
+                    errors.append(f"Comment {cid}: {e}")
+            pending_comment_ids = []
+
+        with DeletionLog(DELETED_POSTS_FILE, "post") as log:
+            for n, pid in enumerate(post_ids):
+                pending_post_ids = post_ids[n:]
+                try:
+                    if not delete_once(reddit.submission(pid), "post", log, "web", lazy=True):
+                        skipped_ids["post"].append(pid)
+                        continue
+                    deleted_ids["post"].append(pid)
+                    deleted_posts += 1
+                except (
+                    praw.exceptions.APIException,
+                    prawcore.exceptions.PrawcoreException,
+                ) as e:
+                    errors.append(f"Post {pid}: {e}")
+            pending_post_ids = []
+    except CircuitOpenError as e:
+        # Stop early; the dashboard keeps the pending ids selected for a retry
+        return jsonify(
+            error=str(e),
+            deleted_comments=deleted_comments,
+            deleted_posts=deleted_posts,
+            errors=errors,
+            skipped_comment_ids=skipped_ids["comment"],
+            skipped_post_ids=skipped_ids["post"],
+            pending_comment_ids=pending_comment_ids,
+            pending_post_ids=pending_post_ids,
+        ), 503
+    finally:
+        # Cached item lists (and loads still in flight) may contain deleted items
+        ITEMS_CACHE.invalidate(session["username"])
+        store = _STORES.get(session["username"])
+        if store is not None:
+            for kind, ids in deleted_ids.items():
+                store.discard(kind, ids)
 
     return jsonify(
         deleted_comments=deleted_comments,
         deleted_posts=deleted_posts,
         errors=errors,
+        skipped_comment_ids=skipped_ids["comment"],
+        skipped_post_ids=skipped_ids["post"],
+        pending_comment_ids=[],
+        pending_post_ids=[],
     )
 
 
+def serve(parser, args):
+    """Run the development server with parsed *args* (used by ``reddit-clean web``).
+
+    With ``--async`` the ASGI app in ``web.asgi`` is served instead.
+    """
+    if args.use_async and (args.record or args.replay):
+        parser.error("--record and --replay work with the Flask app only, not with --async")
+    if args.trace:
+        TRACER.start(args.trace)
+    start_session(parser, args)
+    if args.use_async:
+        try:
+            from redditcleaner.web import asgi
+        except ModuleNotFoundError as e:
+            if e.name not in ("quart", "asyncpraw", "asyncprawcore"):
+                raise
+            parser.error("--async needs the async extra: pip install 'redditcleaner[async]'")
+        asgi.serve(parser, args)
+        return
+    app.run(host=args.host, port=args.port, debug=args.debug)
+
+
 if __name__ == "__main__":
     app.run(debug=os.environ.get("FLASK_DEBUG") == "1", port=5000)
@@ -0,0 +1,541 @@
+"""ASGI version of the web dashboard, for serving many sessions from one process.
+
+The Flask app (``web.app``) holds a worker thread for the whole of every
+``/api/items`` walk and ``/api/delete`` run, so a few users with long
+histories use up the worker pool. This app serves the same routes,
+templates and JSON with Quart and Async PRAW: every Reddit request is
+awaited, so a single process multiplexes hundreds of sessions while their
+listings and deletions wait on the network.
+
+It shares the payload format, item store, single-flight cache, deletion
+ledger and circuit breaker with the Flask app. CSRF protection is a
+session-bound token, checked on every POST from the ``X-CSRFToken`` header
+or the ``csrf_token`` form field, exactly where Flask-WTF checks it.
+
+Run it with ``reddit-clean web --async``, or under any ASGI server::
+
+    hypercorn redditcleaner.web.asgi:app
+    uvicorn redditcleaner.web.asgi:app
+"""
+
+import asyncio
+import hmac
+import os
+import secrets
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+import asyncpraw
+import asyncprawcore
+from quart import (
+    Quart,
+    Response,
+    abort,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
+
+from redditcleaner import utils
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.estimate import estimate_cost
+from redditcleaner.ledger import SCRUBBED
+from redditcleaner.progress import METER, watch_rate_limit_sleeps
+from redditcleaner.stats import DeletionLog
+from redditcleaner.tracing import TRACER
+from redditcleaner.utils import build_deletion_record
+from redditcleaner.web.common import (
+    ItemsPayload,
+    compact_json,
+    compress,
+    query_page,
+    rule_from_args,
+)
+from redditcleaner.web.item_cache import AsyncSingleFlightCache, ExpiringDict
+from redditcleaner.web.item_store import ItemStore
+
+app = Quart(__name__)
+app.secret_key = os.environ.get("FLASK_SECRET_KEY") or os.urandom(24)
+
+# Log files are written to LOG_DIR (defaults to current working directory)
+LOG_DIR = os.environ.get("LOG_DIR", os.getcwd())
+DELETED_COMMENTS_FILE = os.path.join(LOG_DIR, "deleted_comments.txt")
+DELETED_POSTS_FILE = os.path.join(LOG_DIR, "deleted_posts.txt")
+
+ITEMS_CACHE_TTL = int(os.environ.get("ITEMS_CACHE_TTL", "60"))
+ITEMS_CACHE = AsyncSingleFlightCache(ttl=ITEMS_CACHE_TTL)
+
+# Latest history snapshot and queryable items per username (see web.app)
+_SNAPSHOTS = ExpiringDict(ttl=ITEMS_CACHE_TTL)
+_STORES = ExpiringDict(ttl=ITEMS_CACHE_TTL)
+
+# asyncprawcore's counterparts of circuit.TRANSIENT_ERRORS
+TRANSIENT_ERRORS = (asyncprawcore.exceptions.ServerError, asyncprawcore.exceptions.RequestException)
+# Per-item failures that /api/delete reports and skips past
+DELETE_ERRORS = (asyncpraw.exceptions.RedditAPIException, asyncprawcore.exceptions.AsyncPrawcoreException)
+AUTH_ERRORS = (
+    asyncpraw.exceptions.RedditAPIException,
+    asyncprawcore.exceptions.OAuthException,
+    asyncprawcore.exceptions.ResponseException,
+)
+
+_RETRY_WAIT = (5, 15, 45)
+# Read size when streaming a spooled export to the client
+EXPORT_CHUNK_BYTES = 256 * 1024
+
+CSRF_SESSION_KEY = "csrf_token"
+CSRF_HEADER = "X-CSRFToken"
+_CREDENTIAL_KEYS = ("client_id", "client_secret", "username", "password")
+
+
+class TracingRequestor(asyncprawcore.Requestor):
+    """asyncprawcore Requestor that records each request on the ``--trace`` timeline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        watch_rate_limit_sleeps("asyncprawcore")
+
+    @asynccontextmanager
+    async def request(self, *args, **kwargs):
+        METER.add_request()
+        method, url = args[:2]
+        with TRACER.request(method, url, kwargs.get("params"), kwargs.get("data")) as span:
+            async with super().request(*args, **kwargs) as response:
+                span["status"] = response.status
+                span["bytes"] = response.content_length
+                yield response
+
+
+def make_reddit(creds):
+    """An Async PRAW client for *creds*; use it as ``async with`` so its HTTP session is closed."""
+    requestor_class = TracingRequestor if TRACER.enabled else None
+    return asyncpraw.Reddit(
+        **creds, user_agent="commentCleaner", validate_on_submit=True, requestor_class=requestor_class,
+    )
+
+
+def _credentials():
+    return {key: session[key] for key in _CREDENTIAL_KEYS}
+
+
+# ── CSRF ──────────────────────────────────────────────────────────────────────
+
+@app.template_global()
+def csrf_token():
+    """The session's CSRF token, created on first use."""
+    if CSRF_SESSION_KEY not in session:
+        session[CSRF_SESSION_KEY] = secrets.token_urlsafe(32)
+    return session[CSRF_SESSION_KEY]
+
+
+@app.before_request
+async def csrf_protect():
+    if request.method != "POST" or app.config.get("WTF_CSRF_ENABLED") is False:
+        return
+    token = request.headers.get(CSRF_HEADER) or (await request.form).get("csrf_token", "")
+    expected = session.get(CSRF_SESSION_KEY, "")
+    if not (token and expected and hmac.compare_digest(token, expected)):
+        abort(400, "The CSRF token is missing or invalid.")
+
+
+# ── Pages ─────────────────────────────────────────────────────────────────────
+
+@app.route("/")
+async def index():
+    if "username" in session:
+        return redirect(url_for("dashboard"))
+    return await render_template("index.html")
+
+
+@app.route("/login", methods=["POST"])
+async def login():
+    form = await request.form
+    creds = {key: form.get(key, "").strip() for key in _CREDENTIAL_KEYS}
+    try:
+        async with make_reddit(creds) as reddit:
+            await reddit.user.me()
+    except AUTH_ERRORS as e:
+        return await render_template("index.html", error=f"Authentication failed: {e}")
+    session.update(creds)
+    return redirect(url_for("dashboard"))
+
+
+@app.route("/logout")
+async def logout():
+    username = session.get("username")
+    if username is not None:
+        ITEMS_CACHE.invalidate(username)
+        _STORES.pop(username)
+        _SNAPSHOTS.pop(username)
+    session.clear()
+    return redirect(url_for("index"))
+
+
+@app.route("/dashboard")
+async def dashboard():
+    if "username" not in session:
+        return redirect(url_for("index"))
+    return await render_template("dashboard.html", username=session["username"])
+
+
+# ── Loading and querying items ────────────────────────────────────────────────
+
+async def fetch(fn, label="fetch"):
+    """``utils.fetch`` for Async PRAW: await fn() for a read-only request, retrying failures.
+
+    Rate limits, 5xx and network errors are retried after the same waits,
+    every attempt going through the circuit breaker. If the last retry
+    fails, CircuitOpenError is raised, which the app answers with a 503.
+
+    Raises:
+        CircuitOpenError: If the request kept failing, or the breaker gave up.
+    """
+    for attempt, wait in enumerate(_RETRY_WAIT, start=1):
+        try:
+            return await utils.REDDIT_BREAKER.acall(fn, TRANSIENT_ERRORS)
+        except asyncprawcore.exceptions.TooManyRequests as exc:
+            retry_after = getattr(exc, "retry_after", None) or wait
+            print(f"  Rate limited on {label}. Waiting {retry_after}s (attempt {attempt}/3)…")
+            TRACER.sleep(retry_after, "429")
+            await asyncio.sleep(retry_after)
+        except TRANSIENT_ERRORS as exc:
+            print(f"  {label} failed ({exc}). Retrying in {wait}s (attempt {attempt}/3)…")
+            with TRACER.span("retry wait", "sleep", seconds=wait):
+                await asyncio.sleep(wait)
+    try:
+        return await utils.REDDIT_BREAKER.acall(fn, TRANSIENT_ERRORS)
+    except (asyncprawcore.exceptions.TooManyRequests, *TRANSIENT_ERRORS) as exc:
+        raise CircuitOpenError(f"{label} still failing after {len(_RETRY_WAIT)} retries ({exc})") from exc
+
+
+async def iter_listing(listing, label="listing page"):
+    """``utils.iter_listing`` for Async PRAW: each page is awaited through fetch().
+
+    Async PRAW resumes from the page that failed.
+
+    Yields:
+        The listing's items.
+    """
+    items = listing.__aiter__()
+    while True:
+        try:
+            item = await fetch(items.__anext__, label)
+        except StopAsyncIteration:
+            return
+        yield item
+
+
+async def load_items(reddit, username):
+    """Walk *username*'s full history and build the /api/items payload.
+
+    Same payload as ``web.app.load_items``; the listing pages are awaited.
+    The snapshot and item store are kept in _SNAPSHOTS and _STORES unless a
+    deletion invalidated the user's items while the walk ran.
+    """
+    generation = ITEMS_CACHE.generation(username)
+    items = ItemsPayload()
+    redditor = await reddit.redditor(username)
+    async for c in iter_listing(redditor.comments.new(limit=None), "comment page"):
+        items.add_comment(c)
+    async for s in iter_listing(redditor.submissions.new(limit=None), "post page"):
+        items.add_post(s)
+
+    payload = items.payload()
+
+    def publish():
+        _SNAPSHOTS[username] = items.snapshot
+        _STORES[username] = ItemStore(payload)
+
+    ITEMS_CACHE.publish(username, generation, publish)
+    return payload
+
+
+async def _cached_items():
+    creds = _credentials()
+
+    async def load():
+        async with make_reddit(creds) as reddit:
+            return await load_items(reddit, creds["username"])
+
+    return await ITEMS_CACHE.get_or_load(creds["username"], load)
+
+
+@app.errorhandler(CircuitOpenError)
+async def reddit_unavailable(e):
+    """A history load that Reddit kept failing; the dashboard shows the error and can retry."""
+    return jsonify(error=str(e)), 503
+
+
+async def _loaded(table):
+    """The session user's entry in _STORES or _SNAPSHOTS, loading the history if this process has none."""
+    value = table.get(session["username"])
+    if value is None:
+        await _cached_items()
+        value = table.get(session["username"])
+    return value
+
+
+@app.route("/api/items")
+async def api_items():
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+    return compact_json_response(await _cached_items())
+
+
+@app.route("/api/load")
+async def api_load():
+    """Load the history server-side and return only the counts (see web.app.api_load)."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    payload = await _cached_items()
+    username = session["username"]
+    store = _STORES.get(username)
+    if store is None:  # the load was invalidated by a deletion while it ran
+        store = ItemStore(payload)
+    return jsonify(comments=store.count("comment"), posts=store.count("post"), subreddits=store.subreddits)
+
+
+@app.route("/api/query")
+async def api_query():
+    """One sorted page of the loaded items (see web.app.api_query)."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    store = await _loaded(_STORES)
+    if store is None:
+        return jsonify(error="Load items first"), 409
+    try:
+        result = query_page(store, request.args)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return compact_json_response(result)
+
+
+@app.route("/api/select")
+async def api_select():
+    """The ids of every loaded item matching the simulator rule in the query string."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    store = await _loaded(_STORES)
+    if store is None:
+        return jsonify(error="Load items first"), 409
+    try:
+        selected = store.select(rule_from_args(request.args))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return compact_json_response(selected)
+
+
+@app.route("/api/simulate")
+async def api_simulate():
+    """Count the items a rule would match in the last loaded history."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    snapshot = await _loaded(_SNAPSHOTS)
+    if snapshot is None:
+        return jsonify(error="Load items first"), 409
+    try:
+        rule = rule_from_args(request.args)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(**snapshot.count([rule]), total=len(snapshot))
+
+
+@app.route("/api/estimate")
+async def api_estimate():
+    """Predict requests and wall time for deleting ?comments=N&posts=M items."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    try:
+        matches = int(request.args.get("comments", 0)) + int(request.args.get("posts", 0))
+    except ValueError:
+        return jsonify(error="comments and posts must be integers"), 400
+
+    async with make_reddit(_credentials()) as reddit:
+        await reddit.user.me()
+        limits = reddit.auth.limits
+    return jsonify(estimate_cost(0, matches, fetch_each=True, limits=limits, now=time.time()))
+
+
+@app.route("/api/export")
+async def api_export():
+    """Download the full history as ?format=parquet (default) or arrow (see web.app.api_export)."""
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+    try:
+        from redditcleaner import archive
+    except ModuleNotFoundError as e:
+        if e.name not in ("pyarrow", "pyarrow.parquet"):
+            raise
+        return jsonify(error="Export needs pyarrow: pip install 'redditcleaner[export]'"), 501
+
+    fmt = request.args.get("format", "parquet")
+    if fmt not in archive.FORMATS:
+        return jsonify(error=f"format must be one of: {', '.join(archive.FORMATS)}"), 400
+
+    username = session["username"]
+    spool = tempfile.TemporaryFile()
+    # Row groups are encoded and written in a worker thread, off the event loop
+    writer = await asyncio.to_thread(archive.HistoryWriter, spool, fmt)
+    try:
+        async with make_reddit(_credentials()) as reddit:
+            redditor = await reddit.redditor(username)
+            for listing in (redditor.comments.new, redditor.submissions.new):
+                async for item in iter_listing(listing(limit=None)):
+                    if writer.buffer(item):
+                        await asyncio.to_thread(writer.flush)
+    finally:
+        await asyncio.to_thread(writer.close)
+    spool.seek(0)
+
+    async def chunks():
+        with spool:
+            while chunk := await asyncio.to_thread(spool.read, EXPORT_CHUNK_BYTES):
+                yield chunk
+
+    filename = archive.default_filename(username, fmt)
+    return Response(
+        chunks(),
+        mimetype=archive.FORMATS[fmt][1],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+
+
+def compact_json_response(payload):
+    """Minified JSON with a weak ETag, 304 handling and content encoding (see web.app)."""
+    body, etag = compact_json(payload)
+    resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.vary.add("Accept-Encoding")
+    if request.if_none_match.contains_weak(etag):
+        resp.status_code = 304
+        resp.set_data(b"")
+        return resp
+
+    data, encoding = compress(body, request.accept_encodings)
+    if encoding is not None:
+        resp.set_data(data)
+        resp.headers["Content-Encoding"] = encoding
+    return resp
+
+
+# ── Deleting ──────────────────────────────────────────────────────────────────
+
+async def _with_retry(fn, label):
+    """Await fn() through the circuit breaker, retrying up to 3 times on rate-limit errors."""
+    for attempt, wait in enumerate(_RETRY_WAIT, start=1):
+        try:
+            return await utils.REDDIT_BREAKER.acall(fn, TRANSIENT_ERRORS)
+        except asyncprawcore.exceptions.TooManyRequests as exc:
+            retry_after = getattr(exc, "retry_after", None) or wait
+            print(f"  Rate limited on {label}. Waiting {retry_after}s (attempt {attempt}/3)…")
+            TRACER.sleep(retry_after, "429")
+            await asyncio.sleep(retry_after)
+    return await utils.REDDIT_BREAKER.acall(fn, TRANSIENT_ERRORS)
+
+
+async def delete_once(item, label, log, source):
+    """``utils.delete_once`` for a lazy Async PRAW item.
+
+    The ledger and log steps are ``utils.DeletionClaim``'s, the same as the
+    sync paths; they are blocking file I/O, so they run in worker threads
+    around the awaited fetch, edit and delete. An item left scrubbed by a
+    scrub-first run is only deleted; its record was logged before it was
+    overwritten.
+
+    Returns:
+        bool: True if the item was deleted, False if the ledger skipped it.
+    """
+    scrubbed = await asyncio.to_thread(utils.DELETION_LEDGER.state, item.fullname) == SCRUBBED
+    claim = utils.DeletionClaim(item.fullname, log, scrubbed=scrubbed)
+    if not await asyncio.to_thread(claim.claim):
+        return False
+    try:
+        await utils.REDDIT_BREAKER.acall(item.load, TRANSIENT_ERRORS)
+        await asyncio.to_thread(claim.record, build_deletion_record(item, label, source))
+        if not scrubbed:
+            await _with_retry(lambda: item.edit("."), f"{label} edit")
+        await _with_retry(item.delete, f"{label} delete")
+    except BaseException as e:  # includes cancellation when the client goes away
+        await asyncio.to_thread(claim.finish, e)
+        raise
+    await asyncio.to_thread(claim.finish)
+    return True
+
+
+@app.route("/api/delete", methods=["POST"])
+async def api_delete():
+    if "username" not in session:
+        return jsonify(error="Not authenticated"), 401
+
+    data = await request.get_json()
+    requested = {"comment": data.get("comment_ids", []), "post": data.get("post_ids", [])}
+    deleted_ids = {"comment": [], "post": []}
+    # Already deleted, or being deleted by another request (see redditcleaner.ledger)
+    skipped_ids = {"comment": [], "post": []}
+    pending = dict(requested)
+    errors = []
+
+    def result(**extra):
+        return jsonify(
+            deleted_comments=len(deleted_ids["comment"]),
+            deleted_posts=len(deleted_ids["post"]),
+            errors=errors,
+            skipped_comment_ids=skipped_ids["comment"],
+            skipped_post_ids=skipped_ids["post"],
+            pending_comment_ids=pending["comment"],
+            pending_post_ids=pending["post"],
+            **extra,
+        )
+
+    try:
+        async with make_reddit(_credentials()) as reddit:
+            targets = (
+                ("comment", "Comment", reddit.comment, DELETED_COMMENTS_FILE),
+                ("post", "Post", reddit.submission, DELETED_POSTS_FILE),
+            )
+            for kind, noun, lazy_item, path in targets:
+                ids = requested[kind]
+                log = DeletionLog(path, kind)
+                try:
+                    for n, item_id in enumerate(ids):
+                        pending[kind] = ids[n:]
+                        try:
+                            item = await lazy_item(item_id, fetch=False)
+                            if await delete_once(item, kind, log, "web"):
+                                deleted_ids[kind].append(item_id)
+                            else:
+                                skipped_ids[kind].append(item_id)
+                        except DELETE_ERRORS as e:
+                            errors.append(f"{noun} {item_id}: {e}")
+                    pending[kind] = []
+                finally:
+                    await asyncio.to_thread(log.close)
+    except CircuitOpenError as e:
+        # Stop early; the dashboard keeps the pending ids selected for a retry
+        return result(error=str(e)), 503
+    finally:
+        # Cached item lists (and loads still in flight) may contain deleted items
+        ITEMS_CACHE.invalidate(session["username"])
+        store = _STORES.get(session["username"])
+        if store is not None:
+            for kind, ids in deleted_ids.items():
+                store.discard(kind, ids)
+
+    return result()
+
+
+def serve(parser, args):
+    """Run the ASGI app (``reddit-clean web --async``) on Quart's bundled Hypercorn server."""
+    app.run(host=args.host, port=args.port, debug=args.debug)
@@ -0,0 +1,133 @@
+"""Framework-neutral pieces of the web app.
+
+Shared by the Flask app (``web.app``) and the ASGI app (``web.asgi``): how
+the items payload is built, how query strings become rules and pages, and
+how JSON responses are encoded. Nothing here touches a request object.
+"""
+
+import gzip
+import hashlib
+import json
+
+from redditcleaner.simulator import HistorySnapshot, parse_rule
+
+try:
+    import brotli
+except ImportError:  # in the web extra; without it, gzip is used
+    brotli = None
+
+# Stripped from every permalink on the wire; the dashboard adds it back
+PERMALINK_PREFIX = "https://reddit.com"
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+# Largest page /api/query returns
+QUERY_MAX_LIMIT = 500
+
+# Query-string keys of /api/query that are not rule keys
+_QUERY_PARAMS = ("kind", "sort", "order", "offset", "limit")
+
+
+class ItemsPayload:
+    """The /api/items payload, built one comment or post at a time.
+
+    The payload is columnar and dictionary-encoded: one array per field,
+    subreddit names stored once in a shared table and referenced by index.
+    created_date and the permalink prefix are derived client-side. The
+    matching simulator snapshot is built alongside it.
+    """
+
+    def __init__(self):
+        self.subreddits = []
+        self._subreddit_index = {}
+        self.snapshot = HistorySnapshot()
+        self.comments = {"id": [], "body": [], "score": [], "sr": [], "created_utc": [], "permalink": []}
+        self.posts = {
+            "id": [], "title": [], "score": [], "sr": [], "created_utc": [], "num_comments": [], "permalink": [],
+        }
+
+    def add_comment(self, c):
+        self.snapshot.add_comment(c)
+        self.comments["id"].append(c.id)
+        self.comments["body"].append(c.body[:300])
+        self.comments["score"].append(c.score)
+        self.comments["sr"].append(self._subreddit_ref(c))
+        self.comments["created_utc"].append(int(c.created_utc))
+        self.comments["permalink"].append(c.permalink)
+
+    def add_post(self, s):
+        self.snapshot.add_post(s)
+        self.posts["id"].append(s.id)
+        self.posts["title"].append(s.title)
+        self.posts["score"].append(s.score)
+        self.posts["sr"].append(self._subreddit_ref(s))
+        self.posts["created_utc"].append(int(s.created_utc))
+        self.posts["num_comments"].append(s.num_comments)
+        self.posts["permalink"].append(s.permalink)
+
+    def payload(self):
+        return {
+            "v": 1,
+            "permalink_prefix": PERMALINK_PREFIX,
+            "subreddits": self.subreddits,
+            "comments": self.comments,
+            "posts": self.posts,
+        }
+
+    def _subreddit_ref(self, item):
+        name = str(item.subreddit)
+        if name not in self._subreddit_index:
+            self._subreddit_index[name] = len(self.subreddits)
+            self.subreddits.append(name)
+        return self._subreddit_index[name]
+
+
+def rule_from_args(args, *skip):
+    """Parse the simulator rule keys in query-string *args*, ignoring *skip* and blank values.
+
+    Raises:
+        ValueError: On an unknown key or a malformed value.
+    """
+    terms = ",".join(f"{key}={value}" for key, value in args.items() if value != "" and key not in skip)
+    return parse_rule(terms)
+
+
+def query_page(store, args):
+    """Run the /api/query described by query-string *args* against *store*.
+
+    Raises:
+        ValueError: On a bad offset, limit, order, sort, kind or rule.
+    """
+    offset = int(args.get("offset", 0))
+    limit = int(args.get("limit", 100))
+    if offset < 0 or not 0 <= limit <= QUERY_MAX_LIMIT:
+        raise ValueError(f"offset must be >= 0 and limit between 0 and {QUERY_MAX_LIMIT}")
+    if args.get("order", "desc") not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+    return store.query(
+        args.get("kind", "comment"),
+        rule_from_args(args, *_QUERY_PARAMS),
+        sort=args.get("sort", "created_utc"),
+        descending=args.get("order", "desc") == "desc",
+        offset=offset,
+        limit=limit,
+    )
+
+
+def compact_json(payload):
+    """Return ``(body, etag)``: *payload* as minified UTF-8 JSON and a hash of it."""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+
+def compress(body, accept_encodings):
+    """Return ``(data, content encoding or None)`` for a client's Accept-Encoding.
+
+    Uses brotli (if installed) or gzip; small bodies are left alone.
+    """
+    if len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if brotli is not None and accept_encodings["br"]:
+        return brotli.compress(body, quality=5), "br"
+    if accept_encodings["gzip"]:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
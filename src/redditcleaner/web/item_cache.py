@@ -0,0 +1,205 @@
+"""Per-user single-flight loading with a short-lived result cache.
+
+Concurrent ``api_items`` requests for the same user (two tabs, a double
+click, a refresh mid-load) share one walk of the user's history instead of
+each starting their own, and a finished result is reused for ``ttl``
+seconds. ``invalidate()`` drops the cached result and makes any load that is
+still in flight skip caching, so a deletion is never hidden by stale data.
+``publish()`` gives the state a load derives alongside its result (the item
+store and simulator snapshot) the same guarantee, and ``ExpiringDict`` holds
+that state until it has gone unused for ``ttl`` seconds.
+
+``AsyncSingleFlightCache`` is the same cache for the ASGI app, where loads
+are coroutines and joiners await the leader instead of blocking a thread.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error", "generation")
+
+    def __init__(self, generation, event=threading.Event):
+        self.done = event()
+        self.value = None
+        self.error = None
+        self.generation = generation
+
+
+class SingleFlightCache:
+    """Coalesce concurrent loads per key and cache results for *ttl* seconds."""
+
+    def __init__(self, ttl=60, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._results = {}      # key -> (expires_at, value)
+        self._inflight = {}     # key -> _Flight
+        self._generation = {}   # key -> int, bumped by invalidate()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for *key*, joining or starting a load if needed.
+
+        Args:
+            key: Cache key (the username).
+            loader: Zero-argument callable producing the value.
+        """
+        cached, flight, leader = self._join(key, threading.Event)
+        if cached is not None:
+            return cached[1]
+
+        if not leader:
+            flight.done.wait()
+            return self._result(flight)
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+        return flight.value
+
+    def get(self, key):
+        """Return the cached value for *key* without loading, or None."""
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is None or cached[0] <= self._clock():
+                return None
+            return cached[1]
+
+    def invalidate(self, key):
+        """Forget *key*'s cached value and don't cache any load already in flight."""
+        with self._lock:
+            self._results.pop(key, None)
+            self._generation[key] = self._generation.get(key, 0) + 1
+
+    def generation(self, key):
+        """The invalidation count of *key*; pass it to ``publish()`` after a load."""
+        with self._lock:
+            return self._generation.get(key, 0)
+
+    def publish(self, key, generation, publish):
+        """Call *publish()* unless *key* was invalidated after *generation* was read.
+
+        Returns:
+            bool: Whether *publish* was called.
+        """
+        with self._lock:
+            if generation != self._generation.get(key, 0):
+                return False
+            publish()
+            return True
+
+    def _join(self, key, event):
+        """Return ``(cached, flight, leader)``: a cached entry, or the load to join or lead."""
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+            cached = self._results.get(key)
+            if cached is not None:
+                return cached, None, False
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight(self._generation.get(key, 0), event)
+        return None, flight, leader
+
+    def _land(self, key, flight):
+        """Finish the leader's *flight*: cache its value unless invalidated, wake joiners."""
+        with self._lock:
+            del self._inflight[key]
+            if flight.error is None and flight.generation == self._generation.get(key, 0):
+                self._results[key] = (self._clock() + self.ttl, flight.value)
+        flight.done.set()
+
+    @staticmethod
+    def _result(flight):
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _purge_expired(self, now):
+        expired = [key for key, (expires_at, _) in self._results.items() if expires_at <= now]
+        for key in expired:
+            del self._results[key]
+
+
+class ExpiringDict:
+    """Per-user values dropped once they have gone unused for *ttl* seconds.
+
+    ``get``, item assignment and ``pop`` behave like a dict's; reading a
+    value keeps it for another *ttl* seconds.
+    """
+
+    def __init__(self, ttl=60, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values = {}       # key -> [expires_at, value]
+
+    def get(self, key, default=None):
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+            entry = self._values.get(key)
+            if entry is None:
+                return default
+            entry[0] = now + self.ttl
+            return entry[1]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+            self._values[key] = [now + self.ttl, value]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._values.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def __len__(self):
+        with self._lock:
+            self._purge_expired(self._clock())
+            return len(self._values)
+
+    def _purge_expired(self, now):
+        expired = [key for key, (expires_at, _) in self._values.items() if expires_at <= now]
+        for key in expired:
+            del self._values[key]
+
+
+class AsyncSingleFlightCache(SingleFlightCache):
+    """SingleFlightCache whose loader is a coroutine function.
+
+    Meant for a single event loop: the lock is only held between awaits, and
+    requests joining a load await an ``asyncio.Event``.
+    """
+
+    async def get_or_load(self, key, loader):
+        """Return the cached value for *key*, joining or starting a load if needed.
+
+        Args:
+            key: Cache key (the username).
+            loader: Zero-argument coroutine function producing the value.
+        """
+        cached, flight, leader = self._join(key, asyncio.Event)
+        if cached is not None:
+            return cached[1]
+
+        if not leader:
+            await flight.done.wait()
+            return self._result(flight)
+
+        try:
+            flight.value = await loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+        return flight.value
@@ -0,0 +1,200 @@
+"""Server-side filtering, sorting and selection over a user's loaded items.
+
+The dashboard used to receive every item and sort, filter and render them all
+in the browser, which freezes with tens of thousands of rows. An ItemStore
+wraps the columnar ``/api/items`` payload instead and answers page-sized
+queries: filter with the simulator's rule keys (see ``simulator``), sort by a
+column, return one window of rows plus the match count, or the ids of every
+match for bulk selection.
+
+Sort orders are computed once per column and reused, and the matches of the
+last query per kind are kept, so scrolling through one result set costs a
+slice per page. Matches of an age rule are kept for as long as no item has
+crossed its cutoff since. Deleted items are dropped with ``discard()`` without
+reloading the history.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+
+from redditcleaner.simulator import RULE_KEYS, UNKNOWN_REPLIES
+
+# Kind -> key of its columns in the /api/items payload
+TABLES = {"comment": "comments", "post": "posts"}
+SORT_KEYS = {
+    "comment": ("created_utc", "score", "subreddit"),
+    "post": ("created_utc", "score", "subreddit", "num_comments"),
+}
+
+
+class ItemStore:
+    """Queryable view of one user's comments and posts.
+
+    Args:
+        payload (dict): The columnar payload built by ``app.load_items``.
+    """
+
+    def __init__(self, payload):
+        self.subreddits = payload["subreddits"]
+        self.permalink_prefix = payload["permalink_prefix"]
+        self._columns = {kind: payload[key] for kind, key in TABLES.items()}
+        self._index = {kind: {item_id: i for i, item_id in enumerate(cols["id"])} for kind, cols in self._columns.items()}
+        self._alive = {kind: bytearray(b"\x01") * len(cols["id"]) for kind, cols in self._columns.items()}
+        self._orders = {}       # (kind, sort) -> row indexes in ascending order
+        self._last_query = {}   # kind -> (key, age cutoff, matching row indexes)
+        self._created = {}      # kind -> sorted creation times
+        self._lock = threading.Lock()
+
+    def count(self, kind):
+        """Number of *kind* items not discarded."""
+        return sum(self._alive[kind])
+
+    def query(self, kind, rule=None, *, sort="created_utc", descending=True, offset=0, limit=100, now=None):
+        """Return one page of *kind* items matching *rule*.
+
+        Args:
+            kind (str): "comment" or "post".
+            rule (dict): Simulator rule (max_score, min_age_days, max_replies,
+                subreddits); None or {} matches everything.
+            sort (str): Column to sort by, one of SORT_KEYS[kind].
+            descending (bool): Largest (or newest, or z) first.
+            offset (int): Index of the first matching row to return.
+            limit (int): Maximum rows to return; 0 returns only the total.
+            now (float): Reference time for ages (default: current time).
+
+        Returns:
+            dict: {"total": number of matches, "offset": int, "rows": [row dicts]}
+
+        Raises:
+            ValueError: On an unknown kind, sort column or rule key.
+        """
+        self._check_kind(kind)
+        if sort not in SORT_KEYS[kind]:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS[kind])}")
+        rule = rule or {}
+        now = time.time() if now is None else now
+        cutoff = None if rule.get("min_age_days") is None else now - rule["min_age_days"] * 86400
+        key = (_rule_key(rule), sort, descending)
+        with self._lock:
+            cached = self._last_query.get(kind)
+            if cached is not None and cached[0] == key and not self._aged_past(kind, cached[1], cutoff):
+                matches = cached[2]
+            else:
+                order = self._order(kind, sort)
+                if descending:
+                    order = reversed(order)
+                alive = self._alive[kind]
+                matches_row = self._compile(kind, rule, now)
+                matches = [i for i in order if alive[i] and matches_row(i)]
+            self._last_query[kind] = (key, cutoff, matches)
+        page = matches[offset:offset + limit] if limit > 0 else []
+        return {"total": len(matches), "offset": offset, "rows": [self.row(kind, i) for i in page]}
+
+    def select(self, rule=None, now=None):
+        """Return the ids of every item matching *rule*.
+
+        Returns:
+            dict: {"comments": [ids], "posts": [ids]}; a rule with a kind
+            leaves the other list empty.
+        """
+        rule = rule or {}
+        selected = {}
+        with self._lock:
+            for kind, key in TABLES.items():
+                ids = self._columns[kind]["id"]
+                alive = self._alive[kind]
+                if rule.get("kind", kind) != kind:
+                    selected[key] = []
+                    continue
+                matches_row = self._compile(kind, rule, now)
+                selected[key] = [ids[i] for i in range(len(ids)) if alive[i] and matches_row(i)]
+        return selected
+
+    def discard(self, kind, ids):
+        """Drop deleted *ids* of *kind* from all further results."""
+        self._check_kind(kind)
+        index = self._index[kind]
+        with self._lock:
+            for item_id in ids:
+                i = index.get(item_id)
+                if i is not None:
+                    self._alive[kind][i] = 0
+            self._last_query.pop(kind, None)
+
+    def row(self, kind, i):
+        """Decode row *i* of *kind* into the dict the dashboard renders."""
+        cols = self._columns[kind]
+        row = {
+            "id": cols["id"][i],
+            "score": cols["score"][i],
+            "subreddit": self.subreddits[cols["sr"][i]],
+            "created_utc": cols["created_utc"][i],
+            "permalink": self.permalink_prefix + cols["permalink"][i],
+        }
+        if kind == "comment":
+            row["body"] = cols["body"][i]
+        else:
+            row["title"] = cols["title"][i]
+            row["num_comments"] = cols["num_comments"][i]
+        return row
+
+    # ── Internals ─────────────────────────────────────────────────────────
+
+    def _check_kind(self, kind):
+        if kind not in TABLES:
+            raise ValueError("kind must be 'comment' or 'post'")
+
+    def _order(self, kind, sort):
+        order = self._orders.get((kind, sort))
+        if order is None:
+            cols = self._columns[kind]
+            if sort == "subreddit":
+                names = [name.lower() for name in self.subreddits]
+                sr = cols["sr"]
+                sort_key = lambda i: names[sr[i]]  # noqa: E731
+            else:
+                sort_key = cols[sort].__getitem__
+            order = self._orders[(kind, sort)] = sorted(range(len(cols["id"])), key=sort_key)
+        return order
+
+    def _aged_past(self, kind, previous, cutoff):
+        """True if an item of *kind* crossed the age cutoff since *previous*, changing the matches."""
+        if cutoff is None:
+            return False
+        created = self._created.get(kind)
+        if created is None:
+            created = self._created[kind] = sorted(self._columns[kind]["created_utc"])
+        return bisect_right(created, previous) != bisect_right(created, cutoff)
+
+    def _compile(self, kind, rule, now):
+        """Build a row-index predicate for *rule*, with the simulator's semantics."""
+        unknown = set(rule) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown rule key(s): {', '.join(sorted(unknown))}")
+        cols = self._columns[kind]
+        now = time.time() if now is None else now
+        checks = []
+        if rule.get("kind") not in (None, kind):
+            return lambda i: False
+        if rule.get("max_score") is not None:
+            score, max_score = cols["score"], rule["max_score"]
+            checks.append(lambda i: score[i] <= max_score)
+        if rule.get("min_age_days") is not None:
+            created, created_before = cols["created_utc"], now - rule["min_age_days"] * 86400
+            checks.append(lambda i: created[i] <= created_before)
+        if rule.get("max_replies") is not None:
+            # Comment reply counts are not loaded, so they never match (as in the simulator)
+            replies = cols.get("num_comments") or [UNKNOWN_REPLIES] * len(cols["id"])
+            max_replies = rule["max_replies"]
+            checks.append(lambda i: replies[i] != UNKNOWN_REPLIES and replies[i] <= max_replies)
+        if rule.get("subreddits"):
+            wanted = {name.lower() for name in rule["subreddits"]}
+            indexes = {i for i, name in enumerate(self.subreddits) if name.lower() in wanted}
+            sr = cols["sr"]
+            checks.append(lambda i: sr[i] in indexes)
+        return lambda i: all(check(i) for check in checks)
+
+
+def _rule_key(rule):
+    return tuple(sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in rule.items()))
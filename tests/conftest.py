@@ -1 +1,22 @@
 """Shared pytest fixtures and stubs."""
+
+import pytest
+
+from redditcleaner.circuit import CircuitBreaker
+from redditcleaner.ledger import DeletionLedger
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    """Give every test its own circuit breaker so failures don't leak between tests."""
+    breaker = CircuitBreaker()
+    monkeypatch.setattr("redditcleaner.utils.REDDIT_BREAKER", breaker)
+    return breaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_ledger(monkeypatch, tmp_path):
+    """Give every test its own deletion ledger instead of one in the working directory."""
+    ledger = DeletionLedger(str(tmp_path / "deletion_ledger.db"))
+    monkeypatch.setattr("redditcleaner.utils.DELETION_LEDGER", ledger)
+    return ledger
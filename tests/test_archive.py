@@ -0,0 +1,135 @@
+"""Tests for the columnar history export (archive.py)."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from redditcleaner.archive import (  # noqa: E402
+    SCHEMA,
+    HistoryWriter,
+    default_filename,
+    export_history,
+)
+from redditcleaner.items import ItemSnapshot  # noqa: E402
+
+
+def _comment(i):
+    return SimpleNamespace(
+        fullname=f"t1_c{i}", created_utc=1_700_000_000 + i, score=i - 2, subreddit=f"sub{i % 2}",
+        permalink=f"/r/sub/comments/x/_/c{i}/", body=f"body {i}", link_id="t3_x",
+    )
+
+
+def _post(i):
+    return SimpleNamespace(
+        fullname=f"t3_p{i}", created_utc=1_700_000_000, score=7, subreddit="rust",
+        permalink=f"/r/rust/comments/p{i}/", title=f"title {i}", num_comments=3,
+        selftext="", url=f"https://example.com/{i}",
+    )
+
+
+def _self_post(i):
+    return SimpleNamespace(
+        fullname=f"t3_s{i}", created_utc=1_700_000_000, score=2, subreddit="rust",
+        permalink=f"/r/rust/comments/s{i}/", title=f"question {i}", num_comments=0,
+        selftext=f"the long text of question {i}", url=f"https://www.reddit.com/r/rust/comments/s{i}/",
+    )
+
+
+def _read(path, fmt):
+    if fmt == "parquet":
+        return pq.read_table(path)
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+# ── HistoryWriter ─────────────────────────────────────────────────────────────
+
+class TestHistoryWriter:
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+    def test_round_trips_comments_and_posts(self, tmp_path, fmt):
+        path = tmp_path / f"out.{fmt}"
+        with HistoryWriter(str(path), fmt) as writer:
+            writer.add(_comment(1))
+            writer.add(_post(1))
+
+        table = _read(path, fmt)
+        assert table.schema.names == SCHEMA.names  # Parquet stores timestamp[s] as [ms]
+        first = table.to_pylist()[0]
+        assert (first["text"], first["created_utc"].timestamp()) == ("body 1", 1_700_000_001)
+        row = table.to_pylist()[1]
+        assert (row["kind"], row["id"], row["text"], row["num_comments"]) == ("post", "p1", "title 1", 3)
+        assert writer.counts == {"comment": 1, "post": 1}
+
+    def test_keeps_what_cleanup_overwrites_in_posts(self, tmp_path):
+        path = tmp_path / "out.parquet"
+        reddit = MagicMock()
+        with HistoryWriter(str(path)) as writer:
+            writer.add(ItemSnapshot.from_praw(_self_post(1), reddit))
+            writer.add(ItemSnapshot.from_praw(_post(2), reddit))
+            writer.add(ItemSnapshot.from_praw(_comment(3), reddit))
+
+        rows = [(row["text"], row["selftext"], row["url"]) for row in pq.read_table(path).to_pylist()]
+        assert rows == [
+            ("question 1", "the long text of question 1", "https://www.reddit.com/r/rust/comments/s1/"),
+            ("title 2", "", "https://example.com/2"),
+            ("body 3", None, None),
+        ]
+
+    def test_writes_one_row_group_per_batch(self, tmp_path):
+        path = tmp_path / "out.parquet"
+        with HistoryWriter(str(path), row_group_size=4) as writer:
+            for i in range(10):
+                writer.add(_comment(i))
+
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_rows == 10
+        assert [metadata.row_group(n).num_rows for n in range(metadata.num_row_groups)] == [4, 4, 2]
+
+    def test_buffer_leaves_the_write_to_the_caller(self, tmp_path):
+        path = tmp_path / "out.parquet"
+        with HistoryWriter(str(path), row_group_size=2) as writer:
+            assert [writer.buffer(_comment(i)) for i in range(3)] == [False, True, True]
+            writer.flush()
+
+        assert pq.ParquetFile(path).metadata.num_rows == 3
+
+    def test_arrow_file_has_varying_subreddits_across_batches(self, tmp_path):
+        path = tmp_path / "out.arrow"
+        with HistoryWriter(str(path), "arrow", row_group_size=1) as writer:
+            writer.add(_comment(0))
+            writer.add(_comment(1))
+        assert _read(path, "arrow").column("subreddit").to_pylist() == ["sub0", "sub1"]
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError, match="csv"):
+            HistoryWriter(str(tmp_path / "out.csv"), "csv")
+
+
+# ── export_history ────────────────────────────────────────────────────────────
+
+class TestExportHistory:
+    def test_walks_both_listings(self, tmp_path):
+        reddit = MagicMock()
+        reddit.redditor.return_value.comments.new.return_value = [_comment(i) for i in range(3)]
+        reddit.redditor.return_value.submissions.new.return_value = [_post(0)]
+        path = tmp_path / default_filename("me", "parquet")
+
+        counts = export_history(reddit, "me", str(path))
+
+        assert counts == {"comment": 3, "post": 1}
+        assert path.name == "me_history.parquet"
+        assert pq.read_table(path).column("kind").to_pylist() == ["comment"] * 3 + ["post"]
+
+    def test_kinds_limits_the_walk(self, tmp_path):
+        reddit = MagicMock()
+        reddit.redditor.return_value.submissions.new.return_value = [_post(0)]
+
+        counts = export_history(reddit, "me", str(tmp_path / "out.arrow"), fmt="arrow", kinds=("post",))
+
+        assert counts == {"comment": 0, "post": 1}
+        reddit.redditor.return_value.comments.new.assert_not_called()
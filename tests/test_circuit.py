@@ -0,0 +1,240 @@
+"""Tests for the Reddit outage circuit breaker (circuit.py)."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import prawcore
+import pytest
+
+from redditcleaner.circuit import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _server_error():
+    return prawcore.exceptions.ServerError(MagicMock(status_code=503, headers={}))
+
+
+def _failing():
+    raise _server_error()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(window=4, failure_ratio=0.5, min_calls=4, cooldown=10,
+                          max_cooldown=40, max_outage=100, clock=clock, sleep=clock.sleep)
+
+
+def _trip(breaker):
+    for _ in range(4):
+        with pytest.raises(prawcore.exceptions.ServerError):
+            breaker.call(_failing)
+
+
+class TestCircuitBreaker:
+    def test_stays_closed_below_failure_ratio(self, breaker):
+        for fn in (_failing, lambda: "ok", lambda: "ok", lambda: "ok"):
+            try:
+                breaker.call(fn)
+            except prawcore.exceptions.ServerError:
+                pass
+        assert breaker.state == CLOSED
+
+    def test_non_transient_errors_are_not_counted(self, breaker):
+        fn = MagicMock(side_effect=prawcore.exceptions.NotFound(MagicMock(headers={})))
+        for _ in range(5):
+            with pytest.raises(prawcore.exceptions.NotFound):
+                breaker.call(fn)
+        assert breaker.state == CLOSED
+
+    def test_opens_then_probes_after_cooldown(self, breaker, clock):
+        _trip(breaker)
+        assert breaker.state == OPEN
+
+        fn = MagicMock(return_value="ok")
+        assert breaker.call(fn) == "ok"
+        assert clock.slept == [10]
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens_with_longer_cooldown(self, breaker, clock):
+        _trip(breaker)
+        with pytest.raises(prawcore.exceptions.ServerError):
+            breaker.call(_failing)
+        assert breaker.state == OPEN
+        assert breaker.cooldown == 20
+
+        breaker.before_call()
+        assert clock.slept == [10, 20]
+        assert breaker.state == HALF_OPEN
+
+    def test_gives_up_when_outage_persists(self, breaker, clock):
+        _trip(breaker)
+        with pytest.raises(CircuitOpenError, match="failing for"):
+            for _ in range(10):
+                try:
+                    breaker.call(_failing)
+                except prawcore.exceptions.ServerError:
+                    pass
+        assert clock.now == pytest.approx(100)
+
+
+class TestSingleProbe:
+    @pytest.fixture
+    def breaker(self):
+        # Real clock: the waiting callers block on a condition, not on the fake sleep
+        return CircuitBreaker(window=4, failure_ratio=0.5, min_calls=4, cooldown=0.05, max_outage=30)
+
+    def _run_threads(self, breaker, fn, n=5):
+        threads = [threading.Thread(target=lambda: _swallow(breaker.call, fn)) for _ in range(n)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_other_callers_wait_for_the_probe(self, breaker):
+        _trip(breaker)
+        inside, release = [], threading.Event()
+
+        def fn():
+            inside.append(1)
+            if len(inside) == 1:
+                release.wait(5)
+            return "ok"
+
+        threads = self._run_threads(breaker, fn)
+        time.sleep(0.3)
+        assert len(inside) == 1 and breaker.state == HALF_OPEN
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert len(inside) == 5
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_hands_over_to_one_new_probe(self, breaker):
+        _trip(breaker)
+        inside, release = [], threading.Event()
+
+        def fn():
+            inside.append(1)
+            if len(inside) == 1:
+                raise _server_error()
+            release.wait(5)
+            return "ok"
+
+        threads = self._run_threads(breaker, fn)
+        time.sleep(0.4)  # first probe fails; the second waits out the doubled cooldown, then hangs
+        assert len(inside) == 2 and breaker.state == HALF_OPEN
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert len(inside) == 5 and breaker.state == CLOSED
+
+    def test_probe_without_an_answer_lets_the_next_caller_probe(self, clock):
+        breaker = CircuitBreaker(window=4, min_calls=4, cooldown=10, max_outage=100, clock=clock, sleep=clock.sleep)
+        _trip(breaker)
+        with pytest.raises(KeyboardInterrupt):
+            breaker.call(MagicMock(side_effect=KeyboardInterrupt))
+        assert breaker.state == OPEN
+
+        assert breaker.call(lambda: "ok") == "ok"
+        assert clock.slept == [10]  # the next probe goes at once
+
+
+def _swallow(call, fn):
+    try:
+        call(fn)
+    except prawcore.exceptions.ServerError:
+        pass
+
+
+class TestAsyncCall:
+    def test_counts_the_given_transient_errors(self, breaker):
+        class AsyncServerError(Exception):
+            pass
+
+        async def failing():
+            raise AsyncServerError
+
+        async def main():
+            for _ in range(4):
+                with pytest.raises(AsyncServerError):
+                    await breaker.acall(failing, (AsyncServerError,))
+
+        asyncio.run(main())
+        assert breaker.state == OPEN
+
+    def test_open_breaker_pauses_without_blocking_sleep(self, breaker, clock, monkeypatch):
+        _trip(breaker)
+        waits = []
+
+        async def fake_sleep(seconds):
+            waits.append(seconds)
+
+        async def ok():
+            return "ok"
+
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        assert asyncio.run(breaker.acall(ok)) == "ok"
+        assert waits == [10] and clock.slept == []
+        assert breaker.state == CLOSED
+
+
+class TestWithRetryUsesBreaker:
+    def test_transient_failures_trip_the_shared_breaker(self, fresh_breaker):
+        from redditcleaner.utils import _with_retry
+
+        for _ in range(fresh_breaker.min_calls):
+            with pytest.raises(prawcore.exceptions.ServerError):
+                _with_retry(_failing, "op")
+        assert fresh_breaker.state == OPEN
+
+    def test_nested_calls_are_recorded_once(self, breaker):
+        breaker.call(lambda: breaker.call(lambda: "ok"))
+        assert list(breaker._results) == [True]
+
+    def test_every_request_goes_through_the_shared_breaker(self, fresh_breaker, monkeypatch):
+        from redditcleaner.progress import CountingRequestor
+
+        monkeypatch.setattr("redditcleaner.progress.watch_rate_limit_sleeps", lambda: None)
+        http = MagicMock(headers={})
+        http.request.return_value = MagicMock(status_code=503)
+        requestor = CountingRequestor("test agent", session=http)
+
+        for _ in range(fresh_breaker.min_calls):
+            assert requestor.request("GET", "https://oauth.reddit.com/user/me/comments").status_code == 503
+        assert fresh_breaker.state == OPEN
+
+    def test_reset_recovers_after_giving_up(self, breaker, clock):
+        _trip(breaker)
+        clock.now += 200
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+
+        breaker.reset()
+        assert breaker.state == CLOSED
+        assert breaker.call(lambda: "ok") == "ok"
@@ -0,0 +1,69 @@
+"""Tests for cli/main.py — the unified reddit-clean dispatcher and its lazy imports."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from redditcleaner.cli import main as cli_main
+
+HEAVY_MODULES = ("praw", "prawcore", "requests", "flask")
+
+
+def _modules_after(argv):
+    """Run the dispatcher with *argv* in a fresh interpreter and list heavy modules it imported."""
+    code = (
+        "import sys\n"
+        "from redditcleaner.cli.main import main\n"
+        "try:\n"
+        f"    main({argv!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('HEAVY:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules), file=sys.stderr)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stderr.splitlines()[-1].removeprefix("HEAVY:")
+
+
+# ── lazy imports ──────────────────────────────────────────────────────────────
+
+class TestLazyImports:
+    @pytest.mark.parametrize("command", list(cli_main.COMMANDS))
+    def test_help_does_not_import_network_stack(self, command):
+        assert _modules_after([command, "--help"]) == ""
+
+    def test_bad_arguments_fail_before_heavy_imports(self):
+        assert _modules_after(["weekly", "--no-such-flag"]) == ""
+
+
+# ── dispatch ──────────────────────────────────────────────────────────────────
+
+class TestDispatch:
+    def test_requires_a_command(self, capsys):
+        with pytest.raises(SystemExit) as exc:
+            cli_main.main([])
+        assert exc.value.code == 2
+
+    def test_log_runs_offline(self, tmp_path, capsys):
+        cli_main.main(["log", "--log-dir", str(tmp_path), "--json"])
+        assert json.loads(capsys.readouterr().out)["total"] == 0
+
+    def test_weekly_passes_flags_through(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "redditcleaner.ci.weekly_cleanup.main",
+            lambda **kwargs: calls.append(kwargs),
+        )
+        cli_main.main(["weekly", "--dry-run", "--full", "--scrub-first"])
+        assert calls == [{"dry_run": True, "estimate_only": False, "full": True, "scrub_first": True}]
+
+    def test_missing_extra_is_reported(self, monkeypatch, capsys):
+        def missing(name):
+            raise ModuleNotFoundError("No module named 'flask'", name="flask")
+
+        monkeypatch.setattr(cli_main.importlib, "import_module", missing)
+        with pytest.raises(SystemExit) as exc:
+            cli_main.main(["web"])
+        assert exc.value.code == 2
+        assert "redditcleaner[web]" in capsys.readouterr().err
@@ -0,0 +1,117 @@
+"""Tests for ci/daemon.py — rate-budget pacing and the poll/re-check/delete schedule."""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from redditcleaner.ci.daemon import CleanupDaemon, deletion_spacing
+from redditcleaner.estimate import DEFAULT_QUOTA, RATE_WINDOW
+from redditcleaner.watchlist import Watchlist
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _item(fullname, score, age_days):
+    item = MagicMock()
+    item.fullname = item.name = fullname
+    item.id = fullname[3:]
+    item.score = score
+    item.created_utc = datetime.now(timezone.utc).timestamp() - age_days * 86400
+    item.subreddit = "test"
+    item.permalink = f"/r/test/{item.id}/"
+    item.body = "text"
+    item.author = "me"
+    return item
+
+
+# ── deletion_spacing ──────────────────────────────────────────────────────────
+
+class TestDeletionSpacing:
+    def test_spreads_remaining_budget_until_reset(self):
+        limits = {"remaining": 300.0, "used": 300, "reset_timestamp": 1300.0}
+        # 300 requests over 300 s = 1 req/s; half of that for 2-request deletions → every 4 s
+        assert deletion_spacing(limits, 1000.0, share=0.5) == pytest.approx(4.0)
+
+    def test_waits_for_reset_when_budget_is_spent(self):
+        limits = {"remaining": 1.0, "used": 999, "reset_timestamp": 1120.0}
+        assert deletion_spacing(limits, 1000.0) == pytest.approx(120.0)
+
+    def test_assumes_default_quota_without_headers(self):
+        expected = 2 / (DEFAULT_QUOTA / RATE_WINDOW * 0.5)
+        assert deletion_spacing({}, 0.0, share=0.5) == pytest.approx(expected)
+
+    def test_never_below_min_spacing(self):
+        limits = {"remaining": 1000.0, "used": 0, "reset_timestamp": 1001.0}
+        assert deletion_spacing(limits, 1000.0, min_spacing=1.0) == 1.0
+
+
+# ── CleanupDaemon ─────────────────────────────────────────────────────────────
+
+class TestCleanupDaemon:
+    @pytest.fixture
+    def reddit(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        mock_reddit = MagicMock()
+        mock_reddit.auth.limits = {}
+        mock_reddit.redditor.return_value.submissions.new.return_value = []
+        return mock_reddit
+
+    def _daemon(self, reddit, tmp_path, watchlist=None, clock=None):
+        return CleanupDaemon(
+            reddit, "me", watchlist or Watchlist(),
+            state_path=str(tmp_path / "state.json"),
+            poll_interval=60, recheck_interval=3600, clock=clock or FakeClock(),
+        )
+
+    def test_poll_queues_matches_and_watches_undecided(self, reddit, tmp_path):
+        negative, young = _item("t1_neg", -2, 1), _item("t1_young", 1, 1)
+        reddit.redditor.return_value.comments.new.return_value = [young, negative]
+        daemon = self._daemon(reddit, tmp_path)
+
+        daemon.poll()
+
+        assert [i.fullname for i in daemon.queue] == ["t1_neg"]
+        assert set(daemon.watchlist.items) == {"t1_neg", "t1_young"}
+
+    def test_deletes_one_item_per_spacing(self, reddit, tmp_path):
+        reddit.redditor.return_value.comments.new.return_value = [_item("t1_a", 0, 1), _item("t1_b", 0, 2)]
+        clock = FakeClock()
+        daemon = self._daemon(reddit, tmp_path, clock=clock)
+
+        delay = daemon.step()
+        assert daemon.deleted == 1 and len(daemon.queue) == 1
+        assert delay == pytest.approx(deletion_spacing({}, 0.0))
+
+        clock.now += delay
+        assert daemon.step() == pytest.approx(60 - delay)  # next poll is the next thing due
+        assert daemon.deleted == 2
+        assert not daemon.watchlist.items
+        assert Watchlist.load(str(tmp_path / "state.json")).cursors["comment"]["name"] == "t1_a"
+
+    def test_recheck_forgets_gone_and_decided_items(self, reddit, tmp_path):
+        watchlist = Watchlist(items={"t1_gone": 0.0, "t1_safe": 0.0, "t1_bad": 0.0})
+        reddit.info.return_value = [_item("t1_safe", 5, 1), _item("t1_bad", 0, 3)]
+        daemon = self._daemon(reddit, tmp_path, watchlist)
+
+        daemon.recheck()
+
+        assert set(watchlist.items) == {"t1_bad"}
+        assert [i.fullname for i in daemon.queue] == ["t1_bad"]
+
+    def test_dry_run_deletes_nothing_and_saves_nothing(self, reddit, tmp_path):
+        item = _item("t1_a", 0, 1)
+        reddit.redditor.return_value.comments.new.return_value = [item]
+        daemon = self._daemon(reddit, tmp_path)
+        daemon.dry_run = True
+
+        daemon.step()
+
+        item.delete.assert_not_called()
+        assert not (tmp_path / "state.json").exists()
@@ -0,0 +1,113 @@
+"""Tests for estimate.py — sampling, extrapolation and request/time estimates."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from redditcleaner.estimate import (
+    DEFAULT_QUOTA,
+    LISTING_CAP,
+    RATE_WINDOW,
+    combine_estimates,
+    estimate_cost,
+    extrapolate,
+    format_duration,
+    format_estimate,
+    sample_listing,
+    wall_time,
+)
+
+# ── sample_listing / extrapolate ──────────────────────────────────────────────
+
+NOW = 1700000000.0
+DAY = 86400
+
+
+def _page(n, score=lambda i: i % 4, days=1.0):
+    """*n* items posted evenly over the last *days* days, newest first."""
+    return [SimpleNamespace(score=score(i), created_utc=NOW - days * DAY * (i + 1) / n) for i in range(n)]
+
+
+def _older_than(days):
+    return lambda item: NOW - item.created_utc > days * DAY
+
+
+class TestSampling:
+    def test_sample_is_the_first_page(self):
+        items = _page(150)
+        assert sample_listing(lambda limit: iter(items[:limit])) == items[:100]
+
+    def test_short_page_is_the_whole_history(self):
+        assert extrapolate(_page(40), lambda item: item.score == 0, now=NOW) == (40, 10)
+
+    def test_full_page_scales_to_listing_cap(self):
+        assert extrapolate(_page(100), lambda item: item.score == 0, now=NOW) == (LISTING_CAP, 250)
+
+    def test_full_page_scales_to_known_total(self):
+        assert extrapolate(_page(100), lambda item: item.score == 0, known_total=450, now=NOW) == (450, 113)
+
+    def test_age_rules_count_the_older_history(self):
+        # The newest page spans one day; the other 900 items go back nine more
+        # at the same rate, and the ones past day 7 are about three tenths of them
+        assert extrapolate(_page(100), _older_than(7), now=NOW) == (LISTING_CAP, 270)
+
+    def test_age_rules_combine_with_other_conditions(self):
+        def rule(item):
+            return item.score == 0 and _older_than(7)(item)
+
+        assert extrapolate(_page(100), rule, now=NOW) == (LISTING_CAP, 68)
+
+
+# ── estimate_cost ─────────────────────────────────────────────────────────────
+
+class TestEstimateCost:
+    def test_counts_listing_edit_and_delete(self):
+        est = estimate_cost(250, 20)
+        assert est["requests"] == {"listing": 3, "refresh": 0, "fetch": 0, "edit": 20, "delete": 20}
+        assert est["total_requests"] == 43
+
+    def test_refresh_each_adds_one_request_per_scanned_item(self):
+        assert estimate_cost(250, 20, refresh_each=True)["requests"]["refresh"] == 250
+
+    def test_refresh_matched_counts_matches_even_in_dry_run(self):
+        assert estimate_cost(250, 20, refresh_matched=True, dry_run=True)["requests"]["refresh"] == 20
+
+    def test_dry_run_only_scans(self):
+        est = estimate_cost(250, 20, fetch_each=True, dry_run=True)
+        assert est["total_requests"] == 3
+        assert est["matches"] == 20
+
+    def test_combine_sums_requests_under_one_budget(self):
+        combined = combine_estimates([estimate_cost(100, 10), estimate_cost(50, 5)])
+        assert combined["items"] == 150
+        assert combined["requests"]["delete"] == 15
+        assert combined["total_requests"] == 32
+
+
+# ── wall_time ─────────────────────────────────────────────────────────────────
+
+class TestWallTime:
+    def test_within_quota_is_latency_bound(self):
+        assert wall_time(10, {"remaining": 100.0, "used": 0}, latency=0.5) == pytest.approx(5.0)
+
+    def test_exhausted_quota_waits_for_reset(self):
+        limits = {"remaining": 0.0, "used": 600, "reset_timestamp": 1100.0}
+        seconds = wall_time(60, limits, now=1000.0, latency=0.1)
+        assert seconds == pytest.approx(100 + 60 * RATE_WINDOW / 600)
+
+    def test_defaults_without_headers(self):
+        n = DEFAULT_QUOTA + 100
+        assert wall_time(n, {}, latency=0.1) == pytest.approx(RATE_WINDOW + 100 * RATE_WINDOW / DEFAULT_QUOTA)
+
+
+# ── formatting ────────────────────────────────────────────────────────────────
+
+class TestFormatting:
+    @pytest.mark.parametrize(("seconds", "text"), [(30, "30 s"), (600, "10 min"), (7200, "2.0 h")])
+    def test_format_duration(self, seconds, text):
+        assert format_duration(seconds) == text
+
+    def test_format_estimate_mentions_requests_and_time(self):
+        text = format_estimate(estimate_cost(100, 10))
+        assert "21 request(s)" in text
+        assert "about 13 s" in text
@@ -0,0 +1,118 @@
+"""Tests for the --ids bulk deletion mode (cli/id_list.py)."""
+
+import io
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import prawcore
+
+from redditcleaner.cli.id_list import delete_by_ids, iter_fullnames
+
+
+def _item(fullname):
+    item = MagicMock()
+    item.fullname    = fullname
+    item.name        = fullname
+    item.author      = "me"
+    item.body        = "text"
+    item.title       = "title"
+    item.num_comments = 0
+    item.removed_by_category = None
+    item.score       = 1
+    item.created_utc = 1700000000.0
+    item.subreddit   = SimpleNamespace(__str__=lambda self: "python")
+    item.permalink   = "/r/python/comments/x/"
+    return item
+
+
+def _reddit():
+    reddit = MagicMock()
+    reddit.user.me.return_value = "me"
+    return reddit
+
+
+class TestIterFullnames:
+    def test_prefixes_bare_ids_and_skips_blank_and_comment_lines(self):
+        lines = io.StringIO("abc\n\n# note\nt3_xyz\n  t1_def  \n")
+        assert list(iter_fullnames(lines, "t1")) == ["t1_abc", "t3_xyz", "t1_def"]
+
+
+class TestDeleteByIds:
+    def test_deletes_listed_items_and_logs_each_type(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        comment, post = _item("t1_abc"), _item("t3_xyz")
+        reddit = _reddit()
+        # "t1_gone" is not returned by /api/info
+        reddit.info.return_value = [comment, post]
+
+        requested, deleted = delete_by_ids(reddit, io.StringIO("abc\nt3_xyz\ngone\n"), "t1")
+
+        assert (requested, deleted) == (3, 2)
+        reddit.info.assert_called_once_with(fullnames=["t1_abc", "t3_xyz", "t1_gone"])
+        comment.edit.assert_called_once_with(".")
+        post.delete.assert_called_once()
+        comment_log = (tmp_path / "deleted_comments.txt").read_text(encoding="utf-8")
+        post_log = (tmp_path / "deleted_posts.txt").read_text(encoding="utf-8")
+        assert json.loads(comment_log)["source"] == "cli-ids"
+        assert json.loads(post_log)["id"] == "t3_xyz"
+
+    def test_dry_run_does_not_delete(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        comment = _item("t1_abc")
+        reddit = _reddit()
+        reddit.info.return_value = [comment]
+
+        assert delete_by_ids(reddit, ["abc"], "t1", dry_run=True) == (1, 1)
+        comment.edit.assert_not_called()
+        comment.delete.assert_not_called()
+
+    def test_extra_clients_split_the_list(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        items = {f"t1_c{i}": _item(f"t1_c{i}") for i in range(150)}
+        clients = [_reddit(), _reddit()]
+        for client in clients:
+            client.info.side_effect = lambda fullnames: [items[name] for name in fullnames]
+
+        requested, deleted = delete_by_ids(clients[0], [f"c{i}" for i in range(150)], "t1", extra_clients=clients[1:])
+
+        assert (requested, deleted) == (150, 150)
+        assert sum(client.info.call_count for client in clients) == 2
+        assert all(item.delete.call_count == 1 for item in items.values())
+        assert len((tmp_path / "deleted_comments.txt").read_text(encoding="utf-8").splitlines()) == 150
+
+    def test_scrub_first_overwrites_everything_before_deleting(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        calls = MagicMock()
+        comment, post = _item("t1_abc"), _item("t3_xyz")
+        calls.attach_mock(comment.edit, "edit_comment")
+        calls.attach_mock(post.edit, "edit_post")
+        calls.attach_mock(comment.delete, "delete_comment")
+        calls.attach_mock(post.delete, "delete_post")
+        reddit = _reddit()
+        reddit.info.return_value = [comment, post]
+
+        assert delete_by_ids(reddit, ["abc", "t3_xyz"], "t1", scrub_first=True) == (2, 2)
+        assert [call[0] for call in calls.mock_calls] == ["edit_comment", "edit_post", "delete_comment", "delete_post"]
+
+    def test_items_of_another_account_are_left_alone(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        theirs, mine = _item("t1_theirs"), _item("t1_mine")
+        theirs.author = "someone_else"
+        reddit = _reddit()
+        reddit.info.return_value = [theirs, mine]
+
+        assert delete_by_ids(reddit, ["theirs", "mine"], "t1") == (2, 1)
+        theirs.edit.assert_not_called()
+        assert "t1_theirs" not in (tmp_path / "deleted_comments.txt").read_text(encoding="utf-8")
+        assert "Left 1 listed item(s) posted by another account alone." in capsys.readouterr().out
+
+    def test_forbidden_item_does_not_stop_the_run(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        locked, fine = _item("t1_locked"), _item("t1_fine")
+        locked.edit.side_effect = prawcore.exceptions.Forbidden(MagicMock(status_code=403))
+        reddit = _reddit()
+        reddit.info.return_value = [locked, fine]
+
+        assert delete_by_ids(reddit, ["locked", "fine"], "t1") == (2, 1)
+        fine.delete.assert_called_once()
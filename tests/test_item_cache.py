@@ -0,0 +1,158 @@
+"""Tests for single-flight item loading (web/item_cache.py)."""
+
+import asyncio
+import threading
+
+import pytest
+
+from redditcleaner.web.item_cache import (
+    AsyncSingleFlightCache,
+    ExpiringDict,
+    SingleFlightCache,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSingleFlightCache:
+    def test_concurrent_loads_share_one_call(self):
+        cache = SingleFlightCache(ttl=60)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "items"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_load("u", loader)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("u", loader)))
+            for _ in range(3)
+        ]
+        for t in followers:
+            t.start()
+        release.set()
+        for t in [leader, *followers]:
+            t.join(5)
+
+        assert calls == [1]
+        assert results == ["items"] * 4
+
+    def test_result_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=10, clock=clock)
+        values = iter(["first", "second"])
+        assert cache.get_or_load("u", lambda: next(values)) == "first"
+        clock.now = 9
+        assert cache.get_or_load("u", lambda: next(values)) == "first"
+        clock.now = 10
+        assert cache.get_or_load("u", lambda: next(values)) == "second"
+
+    def test_keys_are_independent(self):
+        cache = SingleFlightCache()
+        assert cache.get_or_load("a", lambda: 1) == 1
+        assert cache.get_or_load("b", lambda: 2) == 2
+
+    def test_invalidate_drops_cached_value(self):
+        cache = SingleFlightCache()
+        cache.get_or_load("u", lambda: "old")
+        cache.invalidate("u")
+        assert cache.get("u") is None
+        assert cache.get_or_load("u", lambda: "new") == "new"
+
+    def test_invalidate_during_load_skips_caching(self):
+        cache = SingleFlightCache()
+
+        def loader():
+            cache.invalidate("u")  # a delete lands while the walk is running
+            return "stale"
+
+        assert cache.get_or_load("u", loader) == "stale"
+        assert cache.get("u") is None
+
+    def test_errors_are_not_cached(self):
+        cache = SingleFlightCache()
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("u", failing)
+        assert cache.get_or_load("u", lambda: "ok") == "ok"
+
+    def test_publish_is_skipped_after_invalidate(self):
+        cache = SingleFlightCache()
+        published = []
+        generation = cache.generation("u")
+        assert cache.publish("u", generation, lambda: published.append(1)) is True
+
+        generation = cache.generation("u")
+        cache.invalidate("u")
+        assert cache.publish("u", generation, lambda: published.append(2)) is False
+        assert published == [1]
+
+
+class TestExpiringDict:
+    def test_values_expire_once_unused_for_ttl(self):
+        clock = FakeClock()
+        values = ExpiringDict(ttl=10, clock=clock)
+        values["u"] = "store"
+        clock.now = 9
+        assert values.get("u") == "store"
+        clock.now = 18
+        assert values.get("u") == "store"
+        clock.now = 28
+        assert values.get("u") is None
+        assert len(values) == 0
+
+    def test_pop_drops_the_value(self):
+        values = ExpiringDict()
+        values["u"] = "store"
+        assert values.pop("u") == "store"
+        assert values.get("u") is None
+
+
+class TestAsyncSingleFlightCache:
+    def test_concurrent_loads_share_one_call(self):
+        cache = AsyncSingleFlightCache(ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "items"
+
+        async def main():
+            return await asyncio.gather(*(cache.get_or_load("u", loader) for _ in range(4)))
+
+        assert asyncio.run(main()) == ["items"] * 4
+        assert calls == [1]
+
+    def test_errors_reach_every_joiner_and_are_not_cached(self):
+        cache = AsyncSingleFlightCache()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        async def ok():
+            return "ok"
+
+        async def main():
+            results = await asyncio.gather(*(cache.get_or_load("u", failing) for _ in range(2)), return_exceptions=True)
+            return results, await cache.get_or_load("u", ok)
+
+        results, after = asyncio.run(main())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert after == "ok"
@@ -0,0 +1,130 @@
+"""Tests for server-side item queries (web/item_store.py)."""
+
+import pytest
+
+from redditcleaner.web.item_store import ItemStore
+
+NOW = 1_700_000_000
+DAY = 86400
+
+
+def make_payload():
+    return {
+        "v": 1,
+        "permalink_prefix": "https://reddit.com",
+        "subreddits": ["python", "AskReddit", "rust"],
+        "comments": {
+            "id": ["c0", "c1", "c2", "c3"],
+            "body": ["zero", "one", "two", "three"],
+            "score": [5, -2, 1, 0],
+            "sr": [0, 1, 2, 1],
+            "created_utc": [NOW - 1 * DAY, NOW - 40 * DAY, NOW - 20 * DAY, NOW - 3 * DAY],
+            "permalink": ["/c0", "/c1", "/c2", "/c3"],
+        },
+        "posts": {
+            "id": ["p0", "p1"],
+            "title": ["first", "second"],
+            "score": [0, 10],
+            "sr": [0, 2],
+            "created_utc": [NOW - 30 * DAY, NOW - 2 * DAY],
+            "num_comments": [0, 7],
+            "permalink": ["/p0", "/p1"],
+        },
+    }
+
+
+@pytest.fixture
+def store():
+    return ItemStore(make_payload())
+
+
+def ids(result):
+    return [row["id"] for row in result["rows"]]
+
+
+# ── query ─────────────────────────────────────────────────────────────────────
+
+class TestQuery:
+    def test_defaults_to_newest_first(self, store):
+        result = store.query("comment", now=NOW)
+        assert ids(result) == ["c0", "c3", "c2", "c1"]
+        assert result["total"] == 4
+
+    def test_sorts_ascending_by_score(self, store):
+        assert ids(store.query("comment", sort="score", descending=False, now=NOW)) == ["c1", "c3", "c2", "c0"]
+
+    def test_sorts_subreddits_case_insensitively(self, store):
+        result = store.query("comment", sort="subreddit", descending=False, now=NOW)
+        assert [row["subreddit"] for row in result["rows"]] == ["AskReddit", "AskReddit", "python", "rust"]
+
+    def test_filters_with_simulator_rule_keys(self, store):
+        result = store.query("comment", {"max_score": 1, "min_age_days": 10}, now=NOW)
+        assert ids(result) == ["c2", "c1"]
+
+    def test_filters_by_subreddit(self, store):
+        assert ids(store.query("comment", {"subreddits": ["askreddit"]}, now=NOW)) == ["c3", "c1"]
+
+    def test_pages_with_offset_and_limit(self, store):
+        result = store.query("comment", offset=1, limit=2, now=NOW)
+        assert ids(result) == ["c3", "c2"]
+        assert result["total"] == 4
+        assert result["offset"] == 1
+
+    def test_limit_zero_only_counts(self, store):
+        result = store.query("comment", {"max_score": 0}, limit=0, now=NOW)
+        assert result == {"total": 2, "offset": 0, "rows": []}
+
+    def test_decodes_rows(self, store):
+        row = store.query("post", sort="score", limit=1, now=NOW)["rows"][0]
+        assert row == {
+            "id": "p1",
+            "score": 10,
+            "subreddit": "rust",
+            "created_utc": NOW - 2 * DAY,
+            "permalink": "https://reddit.com/p1",
+            "title": "second",
+            "num_comments": 7,
+        }
+
+    def test_comments_never_match_max_replies(self, store):
+        assert store.query("comment", {"max_replies": 100}, now=NOW)["total"] == 0
+        assert ids(store.query("post", {"max_replies": 0}, now=NOW)) == ["p0"]
+
+    def test_age_rule_follows_the_clock(self, store):
+        rule = {"min_age_days": 10}
+        assert ids(store.query("comment", rule, now=NOW)) == ["c2", "c1"]
+        assert ids(store.query("comment", rule, now=NOW + 8 * DAY)) == ["c3", "c2", "c1"]
+
+    def test_age_rule_matches_are_reused_until_an_item_ages_past_the_cutoff(self, store, monkeypatch):
+        rule = {"min_age_days": 10}
+        store.query("comment", rule, now=NOW)
+        monkeypatch.setattr(store, "_compile", None)  # any re-evaluation would fail
+        assert ids(store.query("comment", rule, now=NOW + DAY)) == ["c2", "c1"]
+
+    def test_rejects_unknown_sort_and_kind(self, store):
+        with pytest.raises(ValueError):
+            store.query("comment", sort="num_comments")
+        with pytest.raises(ValueError):
+            store.query("message")
+
+    def test_rejects_unknown_rule_key(self, store):
+        with pytest.raises(ValueError):
+            store.query("comment", {"min_score": 1})
+
+
+# ── select / discard ──────────────────────────────────────────────────────────
+
+class TestSelect:
+    def test_selects_ids_across_kinds(self, store):
+        assert store.select({"max_score": 0}, now=NOW) == {"comments": ["c1", "c3"], "posts": ["p0"]}
+
+    def test_kind_limits_selection(self, store):
+        assert store.select({"kind": "post"}, now=NOW) == {"comments": [], "posts": ["p0", "p1"]}
+
+    def test_discarded_items_drop_out_of_results(self, store):
+        store.query("comment", now=NOW)  # populate the cached result
+        store.discard("comment", ["c0", "missing"])
+
+        assert ids(store.query("comment", now=NOW)) == ["c3", "c2", "c1"]
+        assert store.count("comment") == 3
+        assert "c0" not in store.select(now=NOW)["comments"]
@@ -0,0 +1,139 @@
+"""Tests for item snapshots and the scan pipeline (items.py)."""
+
+from unittest.mock import MagicMock
+
+import praw
+import pytest
+
+from redditcleaner.items import ItemSnapshot, act, scan, select
+from redditcleaner.patterns import PatternMatcher
+from redditcleaner.utils import build_deletion_record
+
+
+def _comment(cid, score=1, body="hello"):
+    item = MagicMock()
+    item.fullname = f"t1_{cid}"
+    item.created_utc = 1_700_000_000
+    item.score = score
+    item.subreddit = "python"
+    item.permalink = f"/r/python/comments/x/_/{cid}/"
+    item.body = body
+    item.link_id = "t3_x"
+    return item
+
+
+def _post(pid, title="A title"):
+    item = MagicMock()
+    item.fullname = f"t3_{pid}"
+    item.created_utc = 1_700_000_000
+    item.score = 3
+    item.subreddit = "rust"
+    item.permalink = f"/r/rust/comments/{pid}/"
+    item.title = title
+    item.num_comments = 4
+    return item
+
+
+# ── ItemSnapshot ──────────────────────────────────────────────────────────────
+
+class TestItemSnapshot:
+    def test_comment_fields(self):
+        snapshot = ItemSnapshot.from_praw(_comment("c1", score=-2), MagicMock())
+        assert snapshot.is_comment
+        assert (snapshot.id, snapshot.name, snapshot.score, snapshot.body) == ("c1", "t1_c1", -2, "hello")
+        assert snapshot.subreddit == "python"
+        with pytest.raises(AttributeError):
+            snapshot.title  # noqa: B018
+
+    def test_post_fields(self):
+        snapshot = ItemSnapshot.from_praw(_post("p1"), MagicMock())
+        assert not snapshot.is_comment
+        assert (snapshot.title, snapshot.num_comments) == ("A title", 4)
+        with pytest.raises(AttributeError):
+            snapshot.body  # noqa: B018
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(ItemSnapshot.from_praw(_comment("c1"), MagicMock()), "__dict__")
+
+    @pytest.mark.parametrize("make, kind", [(_comment, "comment"), (_post, "post")])
+    def test_deletion_record_matches_praw_item(self, make, kind):
+        item = make("x1")
+        snapshot = ItemSnapshot.from_praw(item, MagicMock())
+        item.name = item.fullname
+        expected = build_deletion_record(item, kind, "cli")
+        actual = build_deletion_record(snapshot, kind, "cli")
+        expected.pop("deleted_at"), actual.pop("deleted_at")
+        assert actual == expected
+
+    def test_edit_and_delete_go_through_a_lazy_object(self):
+        reddit = MagicMock()
+        ItemSnapshot.from_praw(_comment("c1"), reddit).delete()
+        ItemSnapshot.from_praw(_post("p1"), reddit).edit(".")
+        reddit.comment.assert_called_once_with("c1")
+        reddit.comment.return_value.delete.assert_called_once_with()
+        reddit.submission.assert_called_once_with("p1")
+        reddit.submission.return_value.edit.assert_called_once_with(".")
+
+    def test_reply_count_refreshes_the_comment(self):
+        reddit = MagicMock()
+        reddit.comment.return_value.replies = [object(), object()]
+        assert ItemSnapshot.from_praw(_comment("c1"), reddit).reply_count() == 2
+        reddit.comment.return_value.refresh.assert_called_once_with()
+
+    def test_reply_count_costs_one_request(self):
+        reddit = praw.Reddit(client_id="id", client_secret="secret", user_agent="items tests")
+        thread = [
+            {"kind": "Listing", "data": {"children": [{"kind": "t3", "data": {"id": "x", "name": "t3_x"}}]}},
+            {"kind": "Listing", "data": {"children": [{"kind": "t1", "data": {
+                "id": "c1", "name": "t1_c1", "link_id": "t3_x", "body": "hello",
+                "replies": {"kind": "Listing", "data": {"children": [
+                    {"kind": "t1", "data": {"id": "r1", "name": "t1_r1", "link_id": "t3_x", "replies": ""}},
+                ]}},
+            }}]}},
+        ]
+        get = MagicMock(return_value=reddit._objector.objectify(thread))
+        reddit.get = get
+
+        assert ItemSnapshot.from_praw(_comment("c1"), reddit).reply_count() == 1
+        get.assert_called_once()
+        assert get.call_args.args[0] == "comments/x/_/c1"
+
+
+# ── scan / select / act ───────────────────────────────────────────────────────
+
+class TestPipeline:
+    def test_scan_is_lazy_and_advances_progress(self):
+        progress = MagicMock()
+        snapshots = scan(iter([_comment("c1"), _comment("c2")]), MagicMock(), progress)
+        progress.advance.assert_not_called()
+
+        assert next(snapshots).id == "c1"
+        assert progress.advance.call_count == 1
+
+    def test_select_applies_matcher_before_predicate(self):
+        predicate = MagicMock(return_value=True)
+        snapshots = scan([_comment("c1", body="buy now"), _comment("c2", body="fine")], MagicMock())
+        matcher = PatternMatcher(["buy"])
+
+        selected = list(select(snapshots, predicate, matcher, "comment"))
+
+        assert [(s.id, m) for s, m in selected] == [("c1", "buy")]
+        assert predicate.call_count == 1
+
+    def test_act_yields_only_deleted_items(self):
+        snapshots = scan([_comment("c1"), _comment("c2")], MagicMock())
+        delete = MagicMock(side_effect=[False, True])
+
+        done = list(act(select(snapshots, lambda s: True), delete, repr, MagicMock()))
+
+        assert [s.id for s in done] == ["c2"]
+
+    def test_dry_run_reports_without_deleting(self):
+        progress, delete = MagicMock(), MagicMock()
+        snapshots = scan([_comment("c1", score=-3)], MagicMock())
+
+        done = list(act(select(snapshots, lambda s: True), delete, lambda s: f"score={s.score}", progress, dry_run=True))
+
+        assert len(done) == 1
+        delete.assert_not_called()
+        progress.write.assert_called_once_with("  [DRY RUN] Would delete score=-3")
@@ -0,0 +1,85 @@
+"""Tests for the deletion ledger (ledger.py)."""
+
+import threading
+
+import pytest
+
+from redditcleaner.ledger import DONE, FAILED, IN_FLIGHT, SCRUBBED, DeletionLedger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "ledger.db")
+
+
+class TestDeletionLedger:
+    def test_constructing_does_not_create_the_file(self, tmp_path):
+        DeletionLedger(str(tmp_path / "ledger.db"))
+        assert not (tmp_path / "ledger.db").exists()
+
+    def test_claim_then_complete(self, path):
+        ledger = DeletionLedger(path)
+        assert ledger.state("t1_a") is None
+        assert ledger.claim("t1_a") is True
+        assert ledger.state("t1_a") == IN_FLIGHT
+        ledger.complete("t1_a")
+        assert ledger.state("t1_a") == DONE
+        assert ledger.claim("t1_a") is False
+
+    def test_live_claim_blocks_other_processes(self, path):
+        assert DeletionLedger(path).claim("t1_a") is True
+        assert DeletionLedger(path).claim("t1_a") is False
+
+    def test_failed_items_can_be_claimed_again(self, path):
+        ledger = DeletionLedger(path)
+        ledger.claim("t1_a")
+        ledger.fail("t1_a", RuntimeError("500"))
+        assert ledger.state("t1_a") == FAILED
+        assert ledger.claim("t1_a") is True
+
+    def test_scrubbed_items_are_listed_until_done(self, path):
+        ledger = DeletionLedger(path)
+        for fullname in ("t1_a", "t1_b"):
+            ledger.claim(fullname)
+            ledger.scrub(fullname)
+        assert ledger.state("t1_a") == SCRUBBED
+        assert ledger.scrubbed() == ["t1_a", "t1_b"]
+
+        assert ledger.claim("t1_a") is True
+        ledger.complete("t1_a")
+        assert ledger.scrubbed() == ["t1_b"]
+
+    def test_abandoned_claim_expires_after_lease(self, path):
+        clock = FakeClock()
+        DeletionLedger(path, lease=60, clock=clock).claim("t1_a")
+        other = DeletionLedger(path, lease=60, clock=clock)
+
+        clock.now += 59
+        assert other.claim("t1_a") is False
+        clock.now += 2
+        assert other.claim("t1_a") is True
+
+    def test_concurrent_claims_have_one_winner(self, path):
+        ledger = DeletionLedger(path)
+        ledger.state("t1_a")  # create the schema before the race
+        barrier = threading.Barrier(8)
+        wins = []
+
+        def claim():
+            barrier.wait(5)
+            wins.append(DeletionLedger(path).claim("t1_a"))
+
+        threads = [threading.Thread(target=claim) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert wins.count(True) == 1
@@ -0,0 +1,86 @@
+"""Tests for patterns.py — rule parsing and the keyword/regex matcher."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from redditcleaner.patterns import (
+    PatternMatcher,
+    _trie_regex,
+    describe_match,
+    parse_patterns,
+)
+
+# ── parse_patterns ────────────────────────────────────────────────────────────
+
+class TestParsePatterns:
+    def test_skips_blanks_and_comments(self):
+        lines = ["# employer\n", "Acme Corp\n", "\n", "  re:falcon  \n"]
+        assert parse_patterns(lines) == ["Acme Corp", "re:falcon"]
+
+
+# ── PatternMatcher ────────────────────────────────────────────────────────────
+
+class TestPatternMatcher:
+    @pytest.fixture
+    def matcher(self):
+        return PatternMatcher(["Acme Corp", "acme", "acme.example", r"re:project[- ]?falcon"])
+
+    def test_keywords_are_case_insensitive_whole_words(self, matcher):
+        assert matcher.search("I used to work at ACME") == "acme"
+        assert matcher.search("acmes everywhere") is None
+        assert matcher.search("subacme") is None
+
+    def test_longest_phrase_wins_and_whitespace_is_flexible(self, matcher):
+        assert matcher.search("back at Acme\n  corp again") == "Acme Corp"
+        assert matcher.search("acme corporate") == "acme"
+
+    def test_punctuation_in_keywords_is_literal(self, matcher):
+        assert matcher.search("see acme.example") == "acme.example"
+        assert matcher.search("see acmexexample") is None
+
+    def test_regex_rules_report_the_rule(self, matcher):
+        assert matcher.search("Project-Falcon launch") == "re:project[- ]?falcon"
+
+    def test_no_match_or_no_text(self, matcher):
+        assert matcher.search("nothing here") is None
+        assert matcher.search("") is None
+        assert PatternMatcher([]).search("acme") is None
+
+    def test_invalid_regex_raises(self):
+        with pytest.raises(ValueError, match="Invalid pattern"):
+            PatternMatcher(["re:(unclosed"])
+
+    def test_regex_rules_are_compiled_on_their_own(self):
+        matcher = PatternMatcher(["x", r"re:(?i)foo", r"re:(?P<n>bar)", r"re:(?P<n>baz)", r"re:(a)\1"])
+        assert matcher.search("FOO") == "re:(?i)foo"
+        assert matcher.search("baz") == "re:(?P<n>baz)"
+        assert matcher.search("aa") == r"re:(a)\1"
+
+    def test_earliest_match_wins(self, matcher):
+        assert matcher.search("project falcon at acme") == "re:project[- ]?falcon"
+        assert matcher.search("acme's project falcon") == "acme"
+
+    def test_keywords_whose_lowercase_changes_length(self):
+        assert PatternMatcher(["istanbul"]).search("İstanbul") == "istanbul"
+        assert PatternMatcher(["İstanbul"]).search("İSTANBUL") == "İstanbul"
+
+    def test_match_item_uses_body_or_title(self, matcher):
+        assert matcher.match_item(SimpleNamespace(body="acme!"), "comment") == "acme"
+        assert matcher.match_item(SimpleNamespace(title="Acme Corp news"), "post") == "Acme Corp"
+
+    def test_from_file(self, tmp_path):
+        path = tmp_path / "patterns.txt"
+        path.write_text("# rules\nfalcon\n", encoding="utf-8")
+        assert PatternMatcher.from_file(path).search("Falcon") == "falcon"
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+class TestHelpers:
+    def test_trie_factors_shared_prefixes(self):
+        assert _trie_regex(["acme", "acne", "ac"]) == "ac(?:me(?P<k0>)|ne(?P<k1>)|(?P<k2>))"
+
+    def test_describe_match(self):
+        assert describe_match("acme") == " [matched 'acme']"
+        assert describe_match(None) == ""
@@ -0,0 +1,143 @@
+"""Tests for progress.py — throttled rendering, rates/ETA and the request meter."""
+
+import io
+import logging
+import threading
+
+import pytest
+
+from redditcleaner import progress as progress_module
+from redditcleaner.progress import Progress, RequestMeter, watch_rate_limit_sleeps
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TtyStream(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fresh_meter(monkeypatch):
+    meter = RequestMeter()
+    monkeypatch.setattr(progress_module, "METER", meter)
+    return meter
+
+
+# ── rendering ─────────────────────────────────────────────────────────────────
+
+class TestRendering:
+    def test_plain_output_is_periodic_lines(self):
+        clock, stream = FakeClock(), io.StringIO()
+        progress = Progress("comment", stream=stream, interval=30, clock=clock)
+        for _ in range(100):
+            clock.now += 1
+            progress.advance()
+        progress.close()
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 4  # at 30, 60 and 90 s, plus the final line
+        assert all(line.startswith("  [progress] ") for line in lines)
+        assert "\r" not in stream.getvalue()
+
+    def test_tty_redraws_in_place_at_bounded_rate(self):
+        clock, stream = FakeClock(), TtyStream()
+        with Progress("post", stream=stream, clock=clock) as progress:
+            for _ in range(1000):
+                clock.now += 0.01
+                progress.advance()
+
+        output = stream.getvalue()
+        assert output.count("\r") <= 10 / 0.2 + 1  # at most every 0.2 s, plus close()
+        assert output.endswith("\n")
+
+    def test_write_clears_the_status_line_first(self):
+        clock, stream = FakeClock(), TtyStream()
+        progress = Progress("comment", stream=stream, interval=0, clock=clock)
+        progress.advance()
+        progress.write("  Deleted something")
+        assert "\r" + " " * 10 in stream.getvalue()
+        assert stream.getvalue().endswith("\r  Deleted something\n")
+
+
+# ── status text ───────────────────────────────────────────────────────────────
+
+class TestStatus:
+    def test_reports_rates_sleep_and_eta(self, fresh_meter):
+        clock = FakeClock()
+        progress = Progress("comment", total=300, stream=io.StringIO(), clock=clock)
+        for _ in range(20):
+            fresh_meter.add_request()
+        fresh_meter.add_sleep(4)
+        progress.count = 100
+        clock.now = 10
+
+        text = progress.status()
+        assert "100 comment(s) scanned" in text
+        assert "10.0 items/s" in text
+        assert "2.0 req/s" in text
+        assert "4 s rate-limit sleep" in text
+        assert "ETA 20 s" in text
+
+    def test_no_eta_without_total(self):
+        clock = FakeClock()
+        progress = Progress("post", stream=io.StringIO(), clock=clock)
+        progress.count, clock.now = 5, 1
+        assert "ETA" not in progress.status()
+
+
+# ── rate-limit sleeps ─────────────────────────────────────────────────────────
+
+class TestSleepMeter:
+    @pytest.fixture
+    def prawcore_logger(self):
+        logger = logging.getLogger("prawcore")
+        saved_level, saved_filters = logger.level, list(logger.filters)
+        logger.setLevel(logging.NOTSET)
+        yield logger
+        logger.setLevel(saved_level)
+        logger.filters[:] = saved_filters
+
+    def test_collects_prawcore_sleep_messages_without_leaking_debug(self, prawcore_logger, fresh_meter, caplog):
+        with caplog.at_level(logging.WARNING):
+            watch_rate_limit_sleeps()
+            watch_rate_limit_sleeps()  # idempotent
+            prawcore_logger.debug("Sleeping: 1.50 seconds prior to call")
+            prawcore_logger.debug("Fetching: GET https://oauth.reddit.com/api/v1/me")
+        assert fresh_meter.sleep_seconds == pytest.approx(1.5)
+        assert caplog.records == []
+
+    def test_retry_back_off_is_not_a_rate_limit_sleep(self, prawcore_logger, fresh_meter, caplog):
+        with caplog.at_level(logging.WARNING):
+            watch_rate_limit_sleeps()
+            prawcore_logger.warning("Sleeping: 2.00 seconds prior to retry")
+        assert fresh_meter.sleep_seconds == 0
+        assert len(caplog.records) == 1
+
+    def test_follows_logging_configured_later(self, prawcore_logger, caplog):
+        with caplog.at_level(logging.WARNING):
+            watch_rate_limit_sleeps()
+        with caplog.at_level(logging.DEBUG):
+            prawcore_logger.debug("Fetching: GET https://oauth.reddit.com/api/v1/me")
+        assert [r.getMessage() for r in caplog.records] == ["Fetching: GET https://oauth.reddit.com/api/v1/me"]
+
+
+class TestRequestMeter:
+    def test_counts_from_many_threads(self, fresh_meter):
+        def work():
+            for _ in range(10_000):
+                fresh_meter.add_request()
+                fresh_meter.add_sleep(1)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert (fresh_meter.requests, fresh_meter.sleep_seconds) == (80_000, 80_000)
@@ -0,0 +1,284 @@
+"""Tests for --record / --replay sessions (replay.py)."""
+
+import argparse
+import json
+from unittest.mock import MagicMock
+
+import praw
+import prawcore
+import pytest
+import requests
+
+from redditcleaner.cli.parsers import add_weekly_arguments
+from redditcleaner.progress import CountingRequestor
+from redditcleaner.replay import (
+    FORMAT,
+    VERSION,
+    Recorder,
+    Replayer,
+    ReplayMiss,
+    anonymize,
+    key_params,
+    normalize_path,
+    start_session,
+)
+
+TOKEN = {"access_token": "secret-token", "expires_in": 3600, "scope": "*", "token_type": "bearer"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _comment(fullname, body="my secret text", author="alice", score=-2):
+    return {"kind": "t1", "data": {"name": fullname, "id": fullname[3:], "body": body, "author": author,
+                                   "score": score, "created_utc": 1700000000.0, "subreddit": "python",
+                                   "permalink": f"/r/python/comments/x/_/{fullname[3:]}/"}}
+
+
+def _listing(*children):
+    return {"kind": "Listing", "data": {"after": None, "before": None, "dist": len(children),
+                                        "children": list(children)}}
+
+
+def _http_response(body, status=200, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode("utf-8")
+    response.headers.update({"x-ratelimit-remaining": "99", "x-ratelimit-used": "1",
+                             "x-ratelimit-reset": "600", "set-cookie": "session=private", **(headers or {})})
+    return response
+
+
+class FakeReddit:
+    """requests.Session stand-in that answers token and /api/info requests and advances *clock*."""
+
+    def __init__(self, clock, things):
+        self.clock = clock
+        self.things = things
+        self.headers = {}
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        self.clock.now += 0.25
+        if url.endswith("/access_token"):
+            return _http_response(TOKEN)
+        if url.rstrip("/").endswith("/api/info"):
+            return _http_response(_listing(*(self.things[name] for name in params["id"].split(",")
+                                             if name in self.things)))
+        raise AssertionError(f"unexpected {method} {url}")
+
+    def close(self):
+        pass
+
+
+def _reddit(session=None):
+    return praw.Reddit(
+        client_id="id", client_secret="secret", username="alice", password="hunter2",
+        user_agent="replay tests", requestor_class=CountingRequestor,
+        requestor_kwargs={"session": session} if session else None,
+    )
+
+
+@pytest.fixture
+def recorder(tmp_path, monkeypatch):
+    recorder = Recorder(clock=FakeClock())
+    recorder.start(str(tmp_path / "session.jsonl"))
+    monkeypatch.setattr("redditcleaner.progress.RECORDER", recorder)
+    yield recorder
+    recorder.stop()
+
+
+@pytest.fixture
+def replayer(monkeypatch):
+    replayer = Replayer(sleep=MagicMock())
+    monkeypatch.setattr("redditcleaner.progress.REPLAYER", replayer)
+    monkeypatch.setattr("redditcleaner.replay.REPLAYER", replayer)
+    return replayer
+
+
+def _entries(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _write_session(path, *entries):
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in [{"format": FORMAT, "version": VERSION}, *entries]:
+            f.write(json.dumps(entry) + "\n")
+    return str(path)
+
+
+def _entry(method, path, params=None, body=None, latency=0.5, **extra):
+    return {"method": method, "path": path, "params": params or {}, "status": 200, "headers": {},
+            "bytes": 2, "body": body if body is not None else {}, "at": 0.0, "latency": latency, **extra}
+
+
+# ── Anonymizing ───────────────────────────────────────────────────────────────
+
+class TestAnonymize:
+    def test_keeps_structure_numbers_and_ids(self):
+        comment = _comment("t1_abc")
+        comment["data"]["parent_id"] = "t3_xyz"
+
+        data = anonymize(comment, lambda text: "x" * len(text))["data"]
+
+        assert (data["name"], data["id"], data["parent_id"]) == ("t1_abc", "abc", "t3_xyz")
+        assert (data["score"], data["created_utc"]) == (-2, 1700000000.0)
+        assert data["body"] == "x" * len("my secret text")
+        assert data["author"] == "xxxxx"
+
+    def test_pseudonymizes_account_and_subreddit_ids(self):
+        comment = _comment("t1_abc")
+        comment["data"].update(author_fullname="t2_me123", subreddit_id="t5_2qh0y", link_id="t3_xyz")
+        me = {"name": "alice", "id": "me123", "link_karma": 1}
+
+        data = anonymize(comment, lambda text: "x" * len(text))["data"]
+        account = anonymize(me, lambda text: "x" * len(text))
+
+        assert (data["author_fullname"], data["subreddit_id"]) == ("t2_xxxxx", "t5_xxxxx")
+        assert data["link_id"] == "t3_xyz"
+        assert account == {"name": "xxxxx", "id": "xxxxx", "link_karma": 1}
+
+    def test_keeps_deletion_markers(self):
+        data = anonymize(_comment("t1_abc", body="[deleted]", author=None), str.upper)["data"]
+        assert (data["body"], data["author"]) == ("[deleted]", None)
+
+    def test_selects_id_and_paging_parameters_only(self):
+        assert key_params({"raw_json": 1, "limit": 100, "after": "t1_a"},
+                          [("text", "my text"), ("thing_id", "t1_b"), ("password", "hunter2")]) == {
+            "after": "t1_a", "limit": "100", "thing_id": "t1_b",
+        }
+
+    def test_ignores_the_username_in_listing_paths(self):
+        assert normalize_path("https://oauth.reddit.com/user/alice/comments/") == "/user/*/comments"
+        assert normalize_path("https://oauth.reddit.com/api/info") == "/api/info"
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+class TestRecorder:
+    def test_records_timing_size_and_rate_limit_headers(self, recorder):
+        http = FakeReddit(recorder._clock, {"t1_abc": _comment("t1_abc")})
+        requestor = CountingRequestor("test agent", session=http)
+
+        requestor.request("GET", "https://oauth.reddit.com/api/info", params={"id": "t1_abc", "raw_json": 1})
+
+        header, entry = _entries(recorder.path)
+        assert (header["format"], header["version"]) == (FORMAT, VERSION)
+        assert (entry["method"], entry["path"], entry["params"]) == ("GET", "/api/info", {"id": "t1_abc"})
+        assert (entry["status"], entry["latency"]) == (200, 0.25)
+        assert entry["headers"] == {"x-ratelimit-remaining": "99", "x-ratelimit-used": "1", "x-ratelimit-reset": "600"}
+        assert entry["bytes"] > 0
+
+    def test_never_writes_text_passwords_or_tokens(self, recorder):
+        reddit = _reddit(FakeReddit(recorder._clock, {"t1_abc": _comment("t1_abc")}))
+        list(reddit.info(fullnames=["t1_abc"]))
+        recorder.stop()
+
+        with open(recorder.path, encoding="utf-8") as f:
+            text = f.read()
+        for secret in ("hunter2", "secret-token", "my secret text", "alice"):
+            assert secret not in text
+        assert "t1_abc" in text
+
+    def test_same_text_gets_the_same_pseudonym(self, recorder):
+        things = {"t1_a": _comment("t1_a"), "t1_b": _comment("t1_b")}
+        requestor = CountingRequestor("test agent", session=FakeReddit(recorder._clock, things))
+        requestor.request("GET", "https://oauth.reddit.com/api/info", params={"id": "t1_a,t1_b"})
+
+        children = _entries(recorder.path)[1]["body"]["data"]["children"]
+        assert children[0]["data"]["author"] == children[1]["data"]["author"] != "alice"
+
+    def test_failed_requests_are_recorded(self, recorder):
+        http = MagicMock(headers={})
+        http.request.side_effect = requests.exceptions.ConnectionError("reset")
+        requestor = CountingRequestor("test agent", session=http)
+
+        with pytest.raises(prawcore.exceptions.RequestException):
+            requestor.request("GET", "https://oauth.reddit.com/api/info", params={"id": "t1_a"})
+
+        assert _entries(recorder.path)[1]["error"] == "ConnectionError"
+
+
+# ── Replaying ─────────────────────────────────────────────────────────────────
+
+class TestReplayer:
+    def test_round_trip_through_praw_without_network(self, recorder, replayer):
+        things = {"t1_abc": _comment("t1_abc"), "t1_def": _comment("t1_def", score=5)}
+        live = _reddit(FakeReddit(recorder._clock, things))
+        recorded = [(c.fullname, c.score) for c in live.info(fullnames=["t1_abc", "t1_def"])]
+        recorder.stop()
+
+        replayer.load(recorder.path, speed=2)
+        offline = _reddit(MagicMock(headers={}, request=MagicMock(side_effect=AssertionError("network"))))
+        replayed = [(c.fullname, c.score) for c in offline.info(fullnames=["t1_abc", "t1_def"])]
+
+        assert replayed == recorded
+        assert [call.args[0] for call in replayer._sleep.call_args_list] == [0.125, 0.125]
+        assert replayer.summary() == "Replayed 2 of 2 recorded response(s)."
+
+    def test_repeated_requests_get_recorded_responses_in_order(self, replayer, tmp_path):
+        replayer.load(_write_session(
+            tmp_path / "s.jsonl",
+            _entry("GET", "/api/v1/me", body={"n": 1}),
+            _entry("GET", "/api/v1/me", body={"n": 2}),
+        ))
+
+        bodies = [replayer.serve("get", "https://oauth.reddit.com/api/v1/me").json()["n"] for _ in range(3)]
+
+        assert bodies == [1, 2, 2]
+
+    def test_unrecorded_requests_fail_loudly(self, replayer, tmp_path):
+        replayer.load(_write_session(tmp_path / "s.jsonl", _entry("POST", "/api/del", {"id": "t1_a"})))
+        with pytest.raises(ReplayMiss, match="POST /api/del"):
+            replayer.serve("POST", "https://oauth.reddit.com/api/del", data={"id": "t1_b"})
+
+    def test_rebatched_lookups_are_rebuilt_from_recorded_items(self, replayer, tmp_path):
+        replayer.load(_write_session(
+            tmp_path / "s.jsonl",
+            _entry("GET", "/api/info", {"id": "t1_a,t1_b"}, _listing(_comment("t1_a"), _comment("t1_b"))),
+        ))
+
+        response = replayer.serve("GET", "https://oauth.reddit.com/api/info", params={"id": "t1_b,t1_gone"})
+
+        assert [child["data"]["name"] for child in response.json()["data"]["children"]] == ["t1_b"]
+        assert "1 lookup(s) rebuilt" in replayer.summary()
+
+    def test_recorded_failures_are_raised_again(self, replayer, tmp_path):
+        failed = _entry("GET", "/api/info", {"id": "t1_a"}, error="ConnectTimeout")
+        replayer.load(_write_session(tmp_path / "s.jsonl", failed))
+
+        with pytest.raises(prawcore.exceptions.RequestException) as exc:
+            replayer.serve("GET", "https://oauth.reddit.com/api/info", params={"id": "t1_a"})
+        assert isinstance(exc.value.original_exception, requests.exceptions.ConnectTimeout)
+
+    def test_rejects_files_that_are_not_sessions(self, replayer, tmp_path):
+        path = tmp_path / "trace.json"
+        path.write_text("[\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="not a recorded session"):
+            replayer.load(str(path))
+
+
+# ── Command line ──────────────────────────────────────────────────────────────
+
+class TestStartSession:
+    @pytest.fixture
+    def parser(self):
+        parser = argparse.ArgumentParser()
+        add_weekly_arguments(parser)
+        return parser
+
+    def test_record_and_replay_exclude_each_other(self, parser):
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--record", "a.jsonl", "--replay", "b.jsonl"])
+
+    def test_unreadable_session_is_a_usage_error(self, parser, replayer, tmp_path, capsys):
+        args = parser.parse_args(["--replay", str(tmp_path / "missing.jsonl")])
+        with pytest.raises(SystemExit):
+            start_session(parser, args)
+        assert "--replay:" in capsys.readouterr().err
+        assert not replayer.enabled
@@ -0,0 +1,149 @@
+"""Tests for scrub-first, two-phase deletion (scrub.py)."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import praw
+
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.scrub import delete_phase, format_phases, scrub_then_delete
+from redditcleaner.stats import DeletionLog
+
+
+def _item(fullname, calls):
+    item = MagicMock()
+    item.fullname = item.name = fullname
+    item.author = "me"
+    item.body = item.title = "text"
+    item.num_comments = 0
+    item.removed_by_category = None
+    item.score = 1
+    item.created_utc = 1700000000.0
+    item.subreddit = SimpleNamespace(__str__=lambda self: "python")
+    item.permalink = "/r/python/comments/x/"
+    item.edit.side_effect = lambda text: calls.append(("edit", fullname))
+    item.delete.side_effect = lambda: calls.append(("delete", fullname))
+    return item
+
+
+def _client(items):
+    reddit = MagicMock()
+    reddit.info.side_effect = lambda fullnames: [items[name] for name in fullnames if name in items]
+    reddit.user.me.return_value = "me"
+    return reddit
+
+
+def _logs(tmp_path):
+    return (
+        DeletionLog(str(tmp_path / "deleted_comments.txt"), "comment"),
+        DeletionLog(str(tmp_path / "deleted_posts.txt"), "post"),
+    )
+
+
+def _run(tmp_path, clients, fullnames, run=scrub_then_delete):
+    comment_log, post_log = _logs(tmp_path)
+    with comment_log, post_log:
+        return run(clients, fullnames, {"comment": comment_log, "post": post_log}, "cli-ids")
+
+
+# ── scrub_then_delete ─────────────────────────────────────────────────────────
+
+class TestScrubThenDelete:
+    def test_every_item_is_overwritten_before_any_is_deleted(self, tmp_path):
+        calls = []
+        items = {name: _item(name, calls) for name in ("t1_a", "t1_b", "t3_c")}
+
+        scrubbed, deleted = _run(tmp_path, [_client(items)], list(items))
+
+        assert [kind for kind, _name in calls] == ["edit"] * 3 + ["delete"] * 3
+        assert scrubbed["deleted"] == {"comment": 2, "post": 1}
+        assert deleted["deleted"] == {"comment": 2, "post": 1}
+        assert len((tmp_path / "deleted_comments.txt").read_text(encoding="utf-8").splitlines()) == 2
+
+    def test_phases_are_spread_across_clients(self, tmp_path):
+        calls = []
+        items = {f"t1_c{i}": _item(f"t1_c{i}", calls) for i in range(4)}
+        clients = [_client(items), _client(items)]
+
+        scrubbed, deleted = _run(tmp_path, clients, list(items))
+
+        assert sum(scrubbed["per_client"]) == sum(deleted["per_client"]) == 4
+        assert calls.index(("delete", "t1_c0")) > max(calls.index(("edit", name)) for name in items)
+
+    def test_resumed_run_skips_the_edits_already_made(self, tmp_path):
+        calls = []
+        items = {name: _item(name, calls) for name in ("t1_a", "t1_b")}
+        items["t1_b"].delete.side_effect = praw.exceptions.RedditAPIException([["ERR", "nope", None]])
+
+        _scrubbed, deleted = _run(tmp_path, [_client(items)], list(items))
+        assert [item.fullname for item, _error in deleted["failed"]] == ["t1_b"]
+
+        calls.clear()
+        items["t1_b"].delete.side_effect = lambda: calls.append(("delete", "t1_b"))
+        _scrubbed, deleted = _run(tmp_path, [_client(items)], list(items))
+
+        assert calls == [("delete", "t1_b")]
+        assert deleted["deleted"] == {"comment": 1, "post": 0}
+
+    def test_outage_in_phase_one_skips_phase_two(self, tmp_path, fresh_breaker, monkeypatch):
+        monkeypatch.setattr(fresh_breaker, "before_call", MagicMock(side_effect=CircuitOpenError("Reddit down")))
+        items = {"t1_a": _item("t1_a", [])}
+
+        scrubbed, deleted = _run(tmp_path, [_client(items)], list(items))
+
+        assert str(scrubbed["outage"]) == "Reddit down"
+        assert deleted is None
+
+
+# ── delete_phase ──────────────────────────────────────────────────────────────
+
+class TestDeletePhase:
+    def test_picks_up_items_left_scrubbed_by_an_earlier_run(self, tmp_path, fresh_ledger):
+        calls = []
+        fresh_ledger.claim("t1_left")
+        fresh_ledger.scrub("t1_left")
+        items = {"t1_left": _item("t1_left", calls)}
+
+        report = _run(tmp_path, [_client(items)], [], run=delete_phase)
+
+        assert calls == [("delete", "t1_left")]
+        assert report["deleted"] == {"comment": 1, "post": 0}
+        assert fresh_ledger.scrubbed() == []
+
+    def test_leaves_other_accounts_and_kinds_alone(self, tmp_path, fresh_ledger):
+        calls = []
+        items = {name: _item(name, calls) for name in ("t1_theirs", "t3_post")}
+        items["t1_theirs"].author = "someone_else"
+        for name in items:
+            fresh_ledger.claim(name)
+            fresh_ledger.scrub(name)
+
+        comment_log, _post_log = _logs(tmp_path)
+        with comment_log:
+            report = delete_phase([_client(items)], [], {"comment": comment_log}, "cli")
+
+        assert calls == []
+        assert report["deleted"] == {"comment": 0, "post": 0}
+        assert sorted(fresh_ledger.scrubbed()) == ["t1_theirs", "t3_post"]
+
+    def test_leftovers_that_are_gone_are_settled(self, tmp_path, fresh_ledger):
+        fresh_ledger.claim("t1_gone")
+        fresh_ledger.scrub("t1_gone")
+
+        _run(tmp_path, [_client({})], [], run=delete_phase)
+
+        assert fresh_ledger.state("t1_gone") == "done"
+
+
+# ── format_phases ─────────────────────────────────────────────────────────────
+
+class TestFormatPhases:
+    def test_counts_both_phases_and_failures(self):
+        scrubbed = {"deleted": {"comment": 3, "post": 1}, "failed": [("x", "err")]}
+        deleted = {"deleted": {"comment": 2, "post": 1}, "failed": [("y", "err")]}
+        assert format_phases(scrubbed, deleted) == (
+            "Scrubbed 4 item(s), then deleted 3; 2 failed and will be retried by the next run."
+        )
+
+    def test_stopped_after_phase_one(self):
+        assert format_phases({"deleted": {"comment": 1, "post": 0}, "failed": []}, None) == "Scrubbed 1 item(s)."
@@ -0,0 +1,150 @@
+"""Tests for deletions spread across several OAuth clients (shards.py)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import praw
+import prawcore
+import pytest
+
+from redditcleaner import shards
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.shards import connect_clients, delete_sharded, format_shard_report
+from redditcleaner.stats import DeletionLog
+
+
+def _item(fullname):
+    item = MagicMock()
+    item.fullname = item.name = fullname
+    item.author = "me"
+    item.body = item.title = "text"
+    item.num_comments = 0
+    item.removed_by_category = None
+    item.score = 1
+    item.created_utc = 1700000000.0
+    item.subreddit = SimpleNamespace(__str__=lambda self: "python")
+    item.permalink = "/r/python/comments/x/"
+    return item
+
+
+def _client(items):
+    """A fake praw.Reddit whose /api/info returns the requested ones of *items*."""
+    reddit = MagicMock()
+    reddit.info.side_effect = lambda fullnames: [items[name] for name in fullnames if name in items]
+    return reddit
+
+
+def _run(tmp_path, clients, fullnames, **kwargs):
+    with DeletionLog(str(tmp_path / "deleted_comments.txt"), "comment") as comment_log, \
+         DeletionLog(str(tmp_path / "deleted_posts.txt"), "post") as post_log:
+        return delete_sharded(clients, fullnames, {"comment": comment_log, "post": post_log}, "cli-ids", **kwargs)
+
+
+# ── delete_sharded ────────────────────────────────────────────────────────────
+
+class TestDeleteSharded:
+    def test_every_item_is_deleted_once_by_some_client(self, tmp_path):
+        plan = [f"t1_c{i}" for i in range(40)] + [f"t3_p{i}" for i in range(10)]
+        items = {name: _item(name) for name in plan}
+        clients = [_client(items) for _ in range(3)]
+
+        report = _run(tmp_path, clients, iter(plan), batch_size=5)
+
+        assert report["requested"] == 50
+        assert report["deleted"] == {"comment": 40, "post": 10}
+        assert sum(report["per_client"]) == 50
+        for item in items.values():
+            item.delete.assert_called_once_with()
+        logged = (tmp_path / "deleted_comments.txt").read_text(encoding="utf-8").splitlines()
+        assert sorted(json.loads(line)["id"] for line in logged) == sorted(plan[:40])
+
+    def test_clients_look_up_disjoint_chunks(self, tmp_path):
+        plan = [f"t1_c{i}" for i in range(30)]
+        items = {name: _item(name) for name in plan}
+        clients = [_client(items), _client(items)]
+
+        _run(tmp_path, clients, plan, batch_size=10)
+
+        chunks = [call.kwargs["fullnames"] for client in clients for call in client.info.call_args_list]
+        assert sorted(name for chunk in chunks for name in chunk) == sorted(plan)
+        assert all(len(chunk) == 10 for chunk in chunks)
+
+    def test_reports_failures_and_ledger_skips(self, tmp_path, fresh_ledger):
+        broken, claimed, fine = _item("t1_broken"), _item("t1_claimed"), _item("t1_fine")
+        broken.delete.side_effect = praw.exceptions.RedditAPIException([["ERR", "nope", None]])
+        fresh_ledger.claim("t1_claimed")
+        items = {item.fullname: item for item in (broken, claimed, fine)}
+
+        report = _run(tmp_path, [_client(items), _client(items)], list(items))
+
+        assert report["deleted"] == {"comment": 1, "post": 0}
+        assert report["skipped"] == 1
+        assert [item for item, _error in report["failed"]] == [broken]
+        claimed.delete.assert_not_called()
+
+    def test_items_of_another_account_are_skipped_for_an_owner(self, tmp_path):
+        theirs, mine = _item("t1_theirs"), _item("t1_mine")
+        theirs.author = "someone_else"
+        items = {item.fullname: item for item in (theirs, mine)}
+
+        report = _run(tmp_path, [_client(items)], list(items), owner="me")
+
+        assert report["foreign"] == 1
+        assert report["deleted"] == {"comment": 1, "post": 0}
+        theirs.edit.assert_not_called()
+        assert "t1_theirs" not in (tmp_path / "deleted_comments.txt").read_text(encoding="utf-8")
+
+    def test_interrupt_stops_the_queued_chunks(self, tmp_path, monkeypatch):
+        runs = []
+
+        class RecordedRun(shards._ShardRun):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                runs.append(self)
+
+        monkeypatch.setattr("redditcleaner.shards._ShardRun", RecordedRun)
+        items = {f"t1_c{i}": _item(f"t1_c{i}") for i in range(6)}
+        acted = []
+
+        def action(item, label, log, source):
+            if not acted:
+                runs[0].stop.wait(5)  # still busy with the first item when Ctrl-C arrives
+            acted.append(item.fullname)
+            return True
+
+        def plan():
+            yield from items
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            _run(tmp_path, [_client(items)], plan(), batch_size=2, action=action)
+
+        assert acted == ["t1_c0"]
+
+    def test_outage_stops_every_worker(self, tmp_path, fresh_breaker, monkeypatch):
+        monkeypatch.setattr(fresh_breaker, "before_call", MagicMock(side_effect=CircuitOpenError("Reddit down")))
+        items = {f"t1_c{i}": _item(f"t1_c{i}") for i in range(20)}
+
+        report = _run(tmp_path, [_client(items), _client(items)], list(items), batch_size=2)
+
+        assert str(report["outage"]) == "Reddit down"
+        assert report["deleted"] == {"comment": 0, "post": 0}
+        assert not any(item.delete.called for item in items.values())
+
+    def test_summary_lists_each_client(self):
+        assert format_shard_report({"per_client": [3, 2]}) == "  client #1: 3 deletion(s)\n  client #2: 2 deletion(s)"
+
+
+# ── connect_clients ───────────────────────────────────────────────────────────
+
+class TestConnectClients:
+    def test_skips_clients_that_fail_to_authenticate(self, capsys):
+        good, bad = MagicMock(), MagicMock()
+        bad.user.me.side_effect = prawcore.exceptions.OAuthException(MagicMock(), "invalid_grant", None)
+        with patch("redditcleaner.shards.praw.Reddit", side_effect=[bad, good]) as reddit_class:
+            clients = connect_clients([("id2", "s2"), ("id3", "s3")], "me", "pw")
+
+        assert clients == [good]
+        assert reddit_class.call_args.kwargs["client_id"] == "id3"
+        assert "extra client #1 (id2)" in capsys.readouterr().out
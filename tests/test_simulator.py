@@ -0,0 +1,134 @@
+"""Tests for the what-if rule simulator (simulator.py)."""
+
+import random
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from redditcleaner.cli import simulate
+from redditcleaner.simulator import (
+    COMMENT,
+    POST,
+    UNKNOWN_REPLIES,
+    HistorySnapshot,
+    parse_rule,
+)
+
+NOW = 1_800_000_000
+DAY = 86400
+
+
+@pytest.fixture
+def snapshot():
+    snap = HistorySnapshot(taken_at=NOW)
+    snap.add(COMMENT, -3, NOW - 1 * DAY, 0, "python")
+    snap.add(COMMENT, 1, NOW - 20 * DAY, 0, "python")
+    snap.add(COMMENT, 1, NOW - 20 * DAY, UNKNOWN_REPLIES, "pics")
+    snap.add(COMMENT, 50, NOW - 400 * DAY, 4, "pics")
+    snap.add(POST, 0, NOW - 30 * DAY, 2, "Python")
+    return snap
+
+
+class TestCount:
+    def test_empty_rule_matches_everything(self, snapshot):
+        assert snapshot.count([{}], now=NOW) == {"comments": 4, "posts": 1}
+
+    def test_thresholds_are_and_ed(self, snapshot):
+        rule = {"max_score": 1, "min_age_days": 14}
+        assert snapshot.count([rule], now=NOW) == {"comments": 2, "posts": 1}
+
+    def test_rules_are_or_ed(self, snapshot):
+        rules = [{"max_score": 0}, {"max_score": 1, "min_age_days": 15}]
+        assert snapshot.count(rules, now=NOW) == {"comments": 3, "posts": 1}
+
+    def test_unknown_reply_count_never_matches_reply_rule(self, snapshot):
+        rule = {"kind": "comment", "max_score": 1, "max_replies": 0}
+        assert snapshot.count([rule], now=NOW) == {"comments": 2, "posts": 0}
+
+    def test_subreddits_are_case_insensitive(self, snapshot):
+        rule = {"subreddits": ["PYTHON"]}
+        assert snapshot.count([rule], now=NOW) == {"comments": 2, "posts": 1}
+
+    def test_no_rules_match_nothing(self, snapshot):
+        assert snapshot.count([], now=NOW) == {"comments": 0, "posts": 0}
+
+    def test_matches_item_by_item_evaluation(self):
+        rng = random.Random(7)
+        snap = HistorySnapshot(taken_at=NOW)
+        items = [
+            (rng.choice((COMMENT, POST)), rng.randint(-5, 5), NOW - rng.randint(0, 40) * DAY + rng.random(),
+             rng.randint(UNKNOWN_REPLIES, 3), rng.choice(("python", "pics", "news")))
+            for _ in range(2000)
+        ]
+        for item in items:
+            snap.add(*item)
+        rules = [{"max_score": 0, "subreddits": ["pics"]}, {"kind": "comment", "max_replies": 1, "min_age_days": 14}]
+
+        def matches(kind, score, created, replies, subreddit):
+            return (score <= 0 and subreddit == "pics") or (
+                kind == COMMENT and 0 <= replies <= 1 and int(created) <= NOW - 14 * DAY
+            )
+
+        expected = [kind for kind, *rest in items if matches(kind, *rest)]
+        assert snap.count(rules, now=NOW) == {"comments": expected.count(COMMENT), "posts": expected.count(POST)}
+
+    def test_rejects_unknown_keys(self, snapshot):
+        with pytest.raises(ValueError, match="Unknown rule key"):
+            snapshot.count([{"min_score": 3}], now=NOW)
+
+
+class TestCapture:
+    def test_reports_through_progress_not_per_item(self, capsys):
+        comments = [SimpleNamespace(score=i, created_utc=NOW, subreddit="python") for i in range(250)]
+        reddit = MagicMock()
+        reddit.redditor.return_value.comments.new.return_value = comments
+        reddit.redditor.return_value.submissions.new.return_value = []
+
+        snap = HistorySnapshot.capture(reddit, "me")
+
+        assert snap.kind.count(COMMENT) == 250
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        assert "250 comment" in lines[0]
+
+
+class TestPersistence:
+    def test_round_trips_through_file(self, snapshot, tmp_path):
+        path = tmp_path / "snap.json"
+        snapshot.save(path)
+        loaded = HistorySnapshot.load(path)
+        assert len(loaded) == len(snapshot)
+        assert loaded.taken_at == NOW
+        assert loaded.count([{"max_score": 1}], now=NOW) == snapshot.count([{"max_score": 1}], now=NOW)
+
+
+class TestReplyCounts:
+    def test_snapshot_without_comment_reply_counts(self, snapshot):
+        assert not snapshot.has_reply_counts
+
+    def test_reply_rule_on_comments_needs_reply_counts(self, snapshot):
+        with pytest.raises(ValueError, match="--with-replies"):
+            simulate.check_reply_rules(snapshot, simulate.PRESETS["cli-mode-3"])
+
+    def test_reply_rule_on_posts_alone_is_fine(self, snapshot):
+        simulate.check_reply_rules(snapshot, [{"kind": "post", "max_replies": 0}])
+
+    def test_preset_on_snapshot_without_reply_counts_is_an_error(self, snapshot, tmp_path, monkeypatch, capsys):
+        path = tmp_path / "snap.json"
+        snapshot.save(path)
+        monkeypatch.setattr("sys.argv", ["reddit-simulate", "--snapshot", str(path), "--preset", "cli-mode-3"])
+        with pytest.raises(SystemExit):
+            simulate.main()
+        assert "--with-replies" in capsys.readouterr().err
+
+
+class TestParseRule:
+    def test_parses_all_term_types(self):
+        rule = parse_rule("max_score=1, min_age_days=14,kind=post,subreddits=a+b")
+        assert rule == {"max_score": 1, "min_age_days": 14, "kind": "post", "subreddits": ["a", "b"]}
+
+    @pytest.mark.parametrize("text", ["bogus=1", "max_score", "kind=thread", "max_score=x"])
+    def test_rejects_invalid_terms(self, text):
+        with pytest.raises(ValueError):
+            parse_rule(text)
@@ -0,0 +1,129 @@
+"""Tests for the incrementally maintained deletion statistics (stats.py)."""
+
+import json
+import multiprocessing
+import os
+import threading
+
+from redditcleaner import stats as stats_module
+from redditcleaner.stats import (
+    STATS_FILE,
+    DeletionLog,
+    load_stats,
+    rebuild_stats,
+    rewrite_stats,
+    score_bucket,
+)
+
+
+def _record(score=1, subreddit="python", source="ci", deleted_at="2026-03-04T05:06:07Z"):
+    return {"deleted_at": deleted_at, "subreddit": subreddit, "score": score, "source": source}
+
+
+def _deleted(log, record):
+    log.append(record)
+    log.count(record)
+
+
+def _count_in_process(log_dir, n):
+    with DeletionLog(os.path.join(log_dir, "deleted_comments.txt"), "comment") as log:
+        for _ in range(n):
+            _deleted(log, _record())
+            log.flush_stats()
+
+
+class TestScoreBucket:
+    def test_buckets(self):
+        assert [score_bucket(s) for s in (-4, 0, 1, 5, 42, 1000)] == ["<0", "0", "1", "2-9", "10-99", "100+"]
+
+
+class TestDeletionLog:
+    def test_appends_json_lines_and_updates_stats(self, tmp_path):
+        log_path = tmp_path / "deleted_comments.txt"
+        with DeletionLog(str(log_path), "comment") as log:
+            _deleted(log, _record(score=-2, source="cli-mode-2"))
+            _deleted(log, _record(score=1, subreddit="pics", deleted_at="2026-04-01T00:00:00Z"))
+
+        lines = log_path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["score"] for line in lines] == [-2, 1]
+
+        stats = load_stats(str(tmp_path))
+        assert stats["total"] == 2
+        assert stats["by_type"] == {"comment": 2}
+        assert stats["by_source"] == {"cli-mode-2": 1, "ci": 1}
+        assert stats["by_subreddit"] == {"python": 1, "pics": 1}
+        assert stats["by_month"] == {"2026-03": 1, "2026-04": 1}
+        assert stats["score"]["histogram"]["<0"] == 1
+        assert (stats["score"]["min"], stats["score"]["max"], stats["score"]["sum"]) == (-2, 1, -1)
+
+    def test_accumulates_across_runs_and_types(self, tmp_path):
+        with DeletionLog(str(tmp_path / "deleted_comments.txt"), "comment") as log:
+            _deleted(log, _record())
+        with DeletionLog(str(tmp_path / "deleted_posts.txt"), "post") as log:
+            _deleted(log, _record(source="web"))
+            _deleted(log, _record(source="web"))
+
+        stats = load_stats(str(tmp_path))
+        assert stats["total"] == 3
+        assert stats["by_type"] == {"comment": 1, "post": 2}
+        assert stats["by_source"] == {"ci": 1, "web": 2}
+
+    def test_only_successful_deletions_are_counted(self, tmp_path):
+        with DeletionLog(str(tmp_path / "deleted_comments.txt"), "comment") as log:
+            log.append(_record())  # the edit or delete failed
+            _deleted(log, _record(source="web"))
+
+        assert load_stats(str(tmp_path))["by_source"] == {"web": 1}
+
+    def test_processes_sharing_a_directory_lose_no_counts(self, tmp_path):
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=_count_in_process, args=(str(tmp_path), 20)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert load_stats(str(tmp_path))["total"] == 80
+
+    def test_unused_log_creates_no_files(self, tmp_path):
+        with DeletionLog(str(tmp_path / "deleted_comments.txt"), "comment"):
+            pass
+        assert list(tmp_path.iterdir()) == []
+
+    def test_bootstraps_from_existing_logs(self, tmp_path):
+        existing = tmp_path / "deleted_posts.txt"
+        existing.write_text(json.dumps(_record(source="cli")) + "\nnot json\n", encoding="utf-8")
+
+        with DeletionLog(str(tmp_path / "deleted_comments.txt"), "comment") as log:
+            _deleted(log, _record())
+
+        stats = load_stats(str(tmp_path))
+        assert stats["total"] == 2
+        assert stats["by_type"] == {"post": 1, "comment": 1}
+        assert stats == rebuild_stats(str(tmp_path))
+
+
+class TestRebuildStats:
+    def test_retried_items_are_counted_once(self, tmp_path):
+        lines = [dict(_record(), id="t1_a"), dict(_record(), id="t1_a"), dict(_record(), id="t1_b")]
+        (tmp_path / "deleted_comments.txt").write_text("".join(json.dumps(r) + "\n" for r in lines), encoding="utf-8")
+        assert rebuild_stats(str(tmp_path))["total"] == 2
+
+    def test_rewrite_waits_for_a_running_flush(self, tmp_path):
+        (tmp_path / "deleted_comments.txt").write_text(json.dumps(_record()) + "\n", encoding="utf-8")
+        rewrite = threading.Thread(target=rewrite_stats, args=(str(tmp_path),))
+
+        with stats_module._stats_lock(str(tmp_path)):
+            rewrite.start()
+            rewrite.join(0.2)
+            assert rewrite.is_alive()
+            assert not (tmp_path / STATS_FILE).exists()
+        rewrite.join(5)
+
+        assert load_stats(str(tmp_path))["total"] == 1
+
+
+class TestLoadStats:
+    def test_empty_when_missing(self, tmp_path):
+        assert load_stats(str(tmp_path))["total"] == 0
+        assert not (tmp_path / STATS_FILE).exists()
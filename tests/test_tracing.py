@@ -0,0 +1,159 @@
+"""Tests for the --trace request timeline (tracing.py)."""
+
+import asyncio
+import json
+import logging
+import threading
+from unittest.mock import MagicMock
+
+import praw
+import pytest
+import requests
+
+from redditcleaner.progress import CountingRequestor, watch_rate_limit_sleeps
+from redditcleaner.tracing import Tracer, classify_request
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    tracer = Tracer(clock=FakeClock())
+    tracer.start(str(tmp_path / "trace.json"))
+    monkeypatch.setattr("redditcleaner.progress.TRACER", tracer)
+    yield tracer
+    tracer.stop()
+
+
+def _spans(tracer):
+    tracer.stop()
+    with open(tracer.path, encoding="utf-8") as f:
+        return [event for event in json.load(f) if event["ph"] == "X"]
+
+
+# ── Tracer ────────────────────────────────────────────────────────────────────
+
+class TestTracer:
+    def test_spans_are_timed_in_microseconds(self, tracer):
+        with tracer.span("edit_and_delete", "item", id="t1_a") as args:
+            tracer._clock.now += 0.25
+            args["note"] = "ok"
+
+        (span,) = _spans(tracer)
+        assert (span["name"], span["cat"], span["ts"], span["dur"]) == ("edit_and_delete", "item", 0.0, 250000.0)
+        assert span["args"] == {"id": "t1_a", "note": "ok"}
+
+    def test_unfinished_trace_is_still_loadable(self, tracer):
+        tracer.sleep(2.5, "prawcore")
+        with open(tracer.path, encoding="utf-8") as f:
+            events = json.loads(f.read() + "]")  # what a viewer does with a killed run's file
+        assert events[-1]["name"] == "rate-limit sleep"
+        assert events[-1]["dur"] == 2500000.0
+
+    def test_disabled_tracer_writes_nothing(self):
+        tracer = Tracer()
+        with tracer.span("edit_and_delete", "item") as args:
+            args["status"] = 200
+        tracer.sleep(1.0, "429")
+        assert not tracer.enabled
+
+    def test_each_thread_gets_its_own_track(self, tracer):
+        def work():
+            with tracer.span("delete", "request"):
+                pass
+
+        threads = [threading.Thread(target=work, name=f"shard-{i}") for i in range(2)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+
+        tracer.stop()
+        with open(tracer.path, encoding="utf-8") as f:
+            events = json.load(f)
+        names = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+        assert sorted(names.values()) == ["shard-0", "shard-1"]
+        assert len({e["tid"] for e in events if e["ph"] == "X"}) == 2
+
+    def test_each_asyncio_task_gets_its_own_track(self, tracer):
+        async def handler():
+            with tracer.span("lookup", "request"):
+                await asyncio.sleep(0)
+
+        async def main():
+            await asyncio.gather(handler(), handler())
+
+        asyncio.run(main())
+        assert len({span["tid"] for span in _spans(tracer)}) == 2
+
+
+# ── Requests and sleeps ───────────────────────────────────────────────────────
+
+class TestRequests:
+    @pytest.mark.parametrize(("method", "path", "name"), [
+        ("GET", "/user/me/comments", "listing page"),
+        ("GET", "/api/info/", "lookup"),
+        ("GET", "/comments/abc/_/def", "refresh"),
+        ("POST", "/api/editusertext", "edit"),
+        ("POST", "/api/del/", "delete"),
+        ("POST", "/api/v1/access_token", "auth"),
+        ("GET", "/api/v1/me", "request"),
+    ])
+    def test_classifies_endpoints(self, method, path, name):
+        assert classify_request(method, path) == name
+
+    def test_classifies_the_paths_praw_sends(self, tracer):
+        # PRAW's API paths end in a slash ("api/info/", "api/del/", "api/editusertext/")
+        comment = {"kind": "t1", "data": {"name": "t1_abc", "id": "abc", "body": "text", "author": "me"}}
+
+        def respond(method, url, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            if url.endswith("/access_token"):
+                body = {"access_token": "token", "expires_in": 3600, "scope": "*", "token_type": "bearer"}
+            elif "/api/info" in url:
+                body = {"kind": "Listing", "data": {"after": None, "before": None, "children": [comment]}}
+            elif "/api/editusertext" in url:
+                body = {"json": {"errors": [], "data": {"things": [comment]}}}
+            else:
+                body = {}
+            response._content = json.dumps(body).encode("utf-8")
+            return response
+
+        http = MagicMock(headers={}, request=MagicMock(side_effect=respond))
+        reddit = praw.Reddit(client_id="id", client_secret="secret", username="me", password="pw",
+                             user_agent="tracing tests", requestor_class=CountingRequestor,
+                             requestor_kwargs={"session": http})
+        reddit.validate_on_submit = True
+
+        (item,) = reddit.info(fullnames=["t1_abc"])
+        item.edit(".")
+        item.delete()
+
+        assert [span["name"] for span in _spans(tracer)] == ["auth", "lookup", "edit", "delete"]
+
+    def test_requestor_records_ids_status_and_size_but_not_text(self, tracer):
+        http = MagicMock()
+        http.request.return_value = MagicMock(status_code=200, content=b"{}")
+        requestor = CountingRequestor("test agent", session=http)
+
+        requestor.request("POST", "https://oauth.reddit.com/api/editusertext",
+                          data=[("text", "."), ("thing_id", "t1_abc")])
+
+        (span,) = _spans(tracer)
+        assert span["name"] == "edit"
+        assert span["args"] == {
+            "method": "POST", "path": "/api/editusertext", "thing_id": "t1_abc", "status": 200, "bytes": 2,
+        }
+
+    def test_prawcore_sleeps_become_spans(self, tracer):
+        watch_rate_limit_sleeps()
+        logging.getLogger("prawcore").debug("Sleeping: 1.50 seconds prior to call")
+
+        (span,) = _spans(tracer)
+        assert (span["name"], span["dur"], span["args"]) == ("rate-limit sleep", 1500000.0, {"source": "prawcore"})
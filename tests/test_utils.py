@@ -7,14 +7,23 @@ import praw
 import prawcore
 import pytest
 
+from redditcleaner.circuit import CircuitOpenError
 from redditcleaner.utils import (
     _with_retry,
     build_deletion_record,
     confirm_and_run,
+    delete_once,
+    delete_scrubbed,
     edit_and_delete,
+    fetch,
     get_days_old,
+    get_extra_clients,
     get_reddit_credentials,
     initialize_reddit,
+    is_gone,
+    iter_info,
+    iter_listing,
+    scrub_once,
 )
 
 # ── _with_retry ─────────────────────────────────────────────────────────────
@@ -53,6 +62,43 @@ class TestWithRetry:
         assert fn.call_count == 4
 
 
+# ── fetch / iter_listing ──────────────────────────────────────────────────────
+
+def _server_error():
+    return prawcore.exceptions.ServerError(MagicMock(status_code=503))
+
+
+class TestFetch:
+    def test_retries_transient_errors(self, monkeypatch):
+        monkeypatch.setattr("redditcleaner.utils.time.sleep", lambda _s: None)
+        fn = MagicMock(side_effect=[_server_error(), "ok"])
+        assert fetch(fn, "page") == "ok"
+        assert fn.call_count == 2
+
+    def test_gives_up_with_circuit_open_error(self, monkeypatch):
+        monkeypatch.setattr("redditcleaner.utils.time.sleep", lambda _s: None)
+        fn = MagicMock(side_effect=_server_error())
+        with pytest.raises(CircuitOpenError, match="page still failing"):
+            fetch(fn, "page")
+        assert fn.call_count == 4
+
+
+class TestIterListing:
+    def test_failed_page_is_fetched_again(self, monkeypatch):
+        monkeypatch.setattr("redditcleaner.utils.time.sleep", lambda _s: None)
+        pages = iter([1, 2, _server_error(), 3])
+
+        def next_item():
+            item = next(pages)
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+        listing = MagicMock(__iter__=lambda self: self, __next__=lambda self: next_item())
+
+        assert list(iter_listing(listing)) == [1, 2, 3]
+
+
 # ── get_reddit_credentials ───────────────────────────────────────────────────
 
 class TestGetRedditCredentials:
@@ -69,6 +115,27 @@ class TestGetRedditCredentials:
         assert result == ("id", "secret", "user", "pass")
 
 
+# ── get_extra_clients ─────────────────────────────────────────────────────────
+
+class TestGetExtraClients:
+    def test_reads_pairs_after_the_first_four_lines(self, tmp_path):
+        cred_file = tmp_path / "Credentials.txt"
+        cred_file.write_text("id\nsecret\nuser\npass\n\nid2\nsecret2\nid3\nsecret3\n", encoding="utf-8")
+        assert get_extra_clients(str(cred_file)) == [("id2", "secret2"), ("id3", "secret3")]
+
+    def test_none_for_a_plain_or_missing_file(self, tmp_path):
+        cred_file = tmp_path / "Credentials.txt"
+        cred_file.write_text("id\nsecret\nuser\npass\n", encoding="utf-8")
+        assert get_extra_clients(str(cred_file)) == []
+        assert get_extra_clients(str(tmp_path / "nope.txt")) == []
+
+    def test_rejects_an_id_without_a_secret(self, tmp_path):
+        cred_file = tmp_path / "Credentials.txt"
+        cred_file.write_text("id\nsecret\nuser\npass\nid2\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="id2"):
+            get_extra_clients(str(cred_file))
+
+
 # ── confirm_and_run ───────────────────────────────────────────────────────────
 
 class TestConfirmAndRun:
@@ -153,6 +220,10 @@ class TestBuildDeletionRecord:
         assert record["num_comments"] == 3
         assert record["source"] == "ci"
 
+    def test_records_matched_pattern(self):
+        record = build_deletion_record(_comment(), "comment", "cli-mode-1", matched="Acme Corp")
+        assert record["matched"] == "Acme Corp"
+
 
 # ── edit_and_delete ────────────────────────────────────────────────────────────
 
@@ -165,6 +236,154 @@ class TestEditAndDelete:
         item.delete.assert_called_once()
 
 
+# ── delete_once ───────────────────────────────────────────────────────────────
+
+def _deletable(fullname="t1_abc"):
+    item = MagicMock(fullname=fullname, created_utc=1700000000.0, score=0, permalink="/x/", body="hi")
+    item.name = fullname
+    item.subreddit = "python"
+    return item
+
+
+class TestDeleteOnce:
+    def test_logs_deletes_and_completes(self, fresh_ledger):
+        item, log = _deletable(), MagicMock()
+        assert delete_once(item, "comment", log, "cli-mode-1") is True
+        assert log.append.call_args.args[0]["source"] == "cli-mode-1"
+        item.delete.assert_called_once()
+        assert fresh_ledger.state("t1_abc") == "done"
+
+    def test_skips_items_already_deleted_without_requests(self):
+        delete_once(_deletable(), "comment", MagicMock(), "ci")
+        item, log = _deletable(), MagicMock()
+
+        assert delete_once(item, "comment", log, "web") is False
+        item.edit.assert_not_called()
+        log.append.assert_not_called()
+
+    def test_skips_items_in_flight_elsewhere(self, fresh_ledger):
+        fresh_ledger.claim("t1_abc")
+        item = _deletable()
+        assert delete_once(item, "comment", MagicMock(), "ci") is False
+        item.delete.assert_not_called()
+
+    def test_failure_is_recorded_and_retried_later(self, fresh_ledger):
+        item = _deletable()
+        item.delete.side_effect = praw.exceptions.APIException(["X", "boom", None])
+        with pytest.raises(praw.exceptions.APIException):
+            delete_once(item, "comment", MagicMock(), "ci")
+        assert fresh_ledger.state("t1_abc") == "failed"
+
+        assert delete_once(_deletable(), "comment", MagicMock(), "ci") is True
+
+    def test_only_finished_deletions_are_counted(self, fresh_ledger):
+        item, log = _deletable(), MagicMock()
+        item.delete.side_effect = praw.exceptions.APIException(["X", "boom", None])
+        with pytest.raises(praw.exceptions.APIException):
+            delete_once(item, "comment", log, "ci")
+        log.count.assert_not_called()
+
+        delete_once(_deletable(), "comment", log, "ci")
+        log.count.assert_called_once()
+
+    def test_scrubbed_item_is_only_deleted(self, fresh_ledger):
+        fresh_ledger.claim("t1_abc")
+        fresh_ledger.scrub("t1_abc")
+        item, log = _deletable(), MagicMock()
+
+        assert delete_once(item, "comment", log, "ci") is True
+        item.edit.assert_not_called()
+        log.append.assert_not_called()
+        assert fresh_ledger.state("t1_abc") == "done"
+
+
+# ── scrub_once / delete_scrubbed ──────────────────────────────────────────────
+
+class TestScrubOnce:
+    def test_logs_and_overwrites_without_deleting(self, fresh_ledger):
+        item, log = _deletable(), MagicMock()
+        assert scrub_once(item, "comment", log, "cli-mode-1") is True
+        item.edit.assert_called_once_with(".")
+        item.delete.assert_not_called()
+        assert log.append.call_args.args[0]["body"] == "hi"
+        assert fresh_ledger.state("t1_abc") == "scrubbed"
+
+    def test_already_scrubbed_item_makes_no_request(self, fresh_ledger):
+        scrub_once(_deletable(), "comment", MagicMock(), "ci")
+        item, log = _deletable(), MagicMock()
+        assert scrub_once(item, "comment", log, "ci") is True
+        item.edit.assert_not_called()
+        log.append.assert_not_called()
+
+    def test_failed_edit_is_retried_later(self, fresh_ledger):
+        item = _deletable()
+        item.edit.side_effect = praw.exceptions.APIException(["X", "boom", None])
+        with pytest.raises(praw.exceptions.APIException):
+            scrub_once(item, "comment", MagicMock(), "ci")
+        assert fresh_ledger.state("t1_abc") == "failed"
+
+
+class TestDeleteScrubbed:
+    def test_deletes_scrubbed_item(self, fresh_ledger):
+        scrub_once(_deletable(), "comment", MagicMock(), "ci")
+        item = _deletable()
+        assert delete_scrubbed(item, "comment") is True
+        item.delete.assert_called_once()
+        item.edit.assert_not_called()
+        assert fresh_ledger.state("t1_abc") == "done"
+
+    def test_skips_items_that_were_not_scrubbed(self, fresh_ledger):
+        item = _deletable()
+        assert delete_scrubbed(item, "comment") is False
+        item.delete.assert_not_called()
+
+    def test_failed_delete_stays_scrubbed(self, fresh_ledger):
+        scrub_once(_deletable(), "comment", MagicMock(), "ci")
+        item = _deletable()
+        item.delete.side_effect = praw.exceptions.APIException(["X", "boom", None])
+        with pytest.raises(praw.exceptions.APIException):
+            delete_scrubbed(item, "comment")
+        assert fresh_ledger.scrubbed() == ["t1_abc"]
+
+
+# ── iter_info ─────────────────────────────────────────────────────────────────
+
+def _live(fullname, **overrides):
+    defaults = dict(fullname=fullname, author="someone", body="text", removed_by_category=None)
+    defaults.update(overrides)
+    return SimpleNamespace(**defaults)
+
+
+class TestIsGone:
+    def test_live_comment(self):
+        assert is_gone(_live("t1_a")) is False
+
+    @pytest.mark.parametrize("body", ["[deleted]", "[removed]"])
+    def test_deleted_comment(self, body):
+        assert is_gone(_live("t1_a", body=body)) is True
+
+    def test_missing_author(self):
+        assert is_gone(_live("t3_a", author=None)) is True
+
+    def test_removed_post(self):
+        assert is_gone(_live("t3_a", removed_by_category="moderator")) is True
+
+
+class TestIterInfo:
+    def test_batches_lookups_and_skips_gone_items(self):
+        reddit = MagicMock()
+        reddit.info.side_effect = lambda fullnames: [
+            _live(fn, author=None if fn == "t1_3" else "me") for fn in fullnames
+        ]
+        fullnames = (f"t1_{i}" for i in range(5))
+
+        items = list(iter_info(reddit, fullnames, batch_size=2))
+
+        assert [i.fullname for i in items] == ["t1_0", "t1_1", "t1_2", "t1_4"]
+        batches = [c.kwargs["fullnames"] for c in reddit.info.call_args_list]
+        assert batches == [["t1_0", "t1_1"], ["t1_2", "t1_3"], ["t1_4"]]
+
+
 # ── get_days_old ──────────────────────────────────────────────────────────────
 
 class TestGetDaysOld:
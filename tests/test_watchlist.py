@@ -0,0 +1,85 @@
+"""Tests for watchlist.py — persistence, cursors and the watched-item set."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from redditcleaner.watchlist import Watchlist
+
+
+def _item(fullname, created_utc):
+    return SimpleNamespace(fullname=fullname, created_utc=created_utc)
+
+
+# ── persistence ───────────────────────────────────────────────────────────────
+
+class TestPersistence:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "weekly_watchlist.json"
+        watchlist = Watchlist()
+        watchlist.watch(_item("t1_a", 100.0))
+        list(watchlist.new_items([_item("t3_b", 200.0)], "post"))
+        watchlist.save(path)
+
+        loaded = Watchlist.load(path)
+        assert loaded.items == {"t1_a": 100.0}
+        assert loaded.cursors == {"post": {"name": "t3_b", "created_utc": 200.0}}
+
+    def test_missing_or_corrupt_file_is_empty(self, tmp_path):
+        assert not Watchlist.load(tmp_path / "missing.json").cursors
+        (tmp_path / "bad.json").write_text("{not json")
+        assert len(Watchlist.load(tmp_path / "bad.json")) == 0
+
+    def test_take_empties_oldest_first(self):
+        watchlist = Watchlist(items={"t1_new": 300.0, "t1_old": 100.0})
+        assert watchlist.take() == ["t1_old", "t1_new"]
+        assert len(watchlist) == 0
+
+
+# ── new_items ─────────────────────────────────────────────────────────────────
+
+class TestNewItems:
+    def test_stops_at_cursor_and_moves_it(self):
+        watchlist = Watchlist(cursors={"comment": {"name": "t1_b", "created_utc": 200.0}})
+        listing = [_item("t1_d", 400.0), _item("t1_c", 300.0), _item("t1_b", 200.0), _item("t1_a", 100.0)]
+
+        assert [i.fullname for i in watchlist.new_items(listing, "comment")] == ["t1_d", "t1_c"]
+        assert watchlist.cursors["comment"]["name"] == "t1_d"
+
+    def test_stops_before_older_items_when_cursor_was_deleted(self):
+        watchlist = Watchlist(cursors={"comment": {"name": "t1_gone", "created_utc": 250.0}})
+        listing = [_item("t1_c", 300.0), _item("t1_b", 200.0)]
+        assert [i.fullname for i in watchlist.new_items(listing, "comment")] == ["t1_c"]
+
+    def test_full_walk_ignores_cursor(self):
+        watchlist = Watchlist(cursors={"post": {"name": "t3_b", "created_utc": 200.0}})
+        listing = [_item("t3_c", 300.0), _item("t3_b", 200.0), _item("t3_a", 100.0)]
+        assert len(list(watchlist.new_items(listing, "post", stop_at_cursor=False))) == 3
+
+    def test_empty_listing_keeps_cursor(self):
+        cursor = {"name": "t1_b", "created_utc": 200.0}
+        watchlist = Watchlist(cursors={"comment": cursor})
+        assert list(watchlist.new_items([], "comment")) == []
+        assert watchlist.cursors["comment"] == cursor
+
+    def test_cursor_moves_only_after_the_walk_is_finished(self):
+        cursor = {"name": "t1_a", "created_utc": 100.0}
+        watchlist = Watchlist(cursors={"comment": cursor})
+        items = watchlist.new_items([_item("t1_c", 300.0), _item("t1_b", 200.0)], "comment")
+
+        next(items)
+        assert watchlist.cursors["comment"] == cursor  # t1_c not handled yet
+        assert [i.fullname for i in items] == ["t1_b"]
+        assert watchlist.cursors["comment"]["name"] == "t1_c"
+
+    def test_failed_walk_keeps_the_old_cursor(self):
+        cursor = {"name": "t1_a", "created_utc": 100.0}
+        watchlist = Watchlist(cursors={"comment": cursor})
+
+        def listing():
+            yield _item("t1_c", 300.0)
+            raise RuntimeError("page failed")
+
+        with pytest.raises(RuntimeError):
+            list(watchlist.new_items(listing(), "comment"))
+        assert watchlist.cursors["comment"] == cursor
@@ -1,10 +1,25 @@
 """Tests for the Flask web application (web/app.py)."""
 
+import gzip
+import io
+import json
 from unittest.mock import MagicMock, patch
 
+import prawcore
 import pytest
 
+from redditcleaner.circuit import CircuitOpenError
+from redditcleaner.stats import load_stats
+from redditcleaner.web import app as app_module
 from redditcleaner.web.app import app as flask_app
+from redditcleaner.web.item_cache import SingleFlightCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_items_cache(monkeypatch):
+    cache = SingleFlightCache(ttl=60)
+    monkeypatch.setattr("redditcleaner.web.app.ITEMS_CACHE", cache)
+    return cache
 
 
 @pytest.fixture
@@ -95,9 +110,202 @@ class TestApiItems:
 
         assert resp.status_code == 200
         data = resp.get_json()
-        assert len(data["comments"]) == 1
-        assert data["comments"][0]["id"] == "abc"
-        assert data["posts"] == []
+        assert data["comments"]["id"] == ["abc"]
+        assert data["comments"]["permalink"] == ["/r/python/comments/abc/hello"]
+        assert data["subreddits"][data["comments"]["sr"][0]] == "python"
+        assert data["posts"]["id"] == []
+
+    @staticmethod
+    def _many_comments(n):
+        comments = []
+        for i in range(n):
+            c = MagicMock()
+            c.id          = f"c{i}"
+            c.body        = "some comment text " * 5
+            c.score       = i % 3
+            c.subreddit   = MagicMock(__str__=lambda s: "python")
+            c.created_utc = 1700000000.0 + i
+            c.permalink   = f"/r/python/comments/x/y/c{i}/"
+            comments.append(c)
+        mock_reddit = MagicMock()
+        mock_reddit.redditor.return_value.comments.new.return_value  = comments
+        mock_reddit.redditor.return_value.submissions.new.return_value = []
+        return mock_reddit
+
+    def test_gzips_when_accepted(self, authed_client):
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=self._many_comments(50)):
+            resp = authed_client.get("/api/items", headers={"Accept-Encoding": "gzip"})
+
+        assert resp.headers["Content-Encoding"] == "gzip"
+        data = json.loads(gzip.decompress(resp.data))
+        assert len(data["comments"]["id"]) == 50
+        assert data["subreddits"] == ["python"]
+
+    def test_prefers_brotli_when_accepted(self, authed_client):
+        brotli = pytest.importorskip("brotli")
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=self._many_comments(50)):
+            resp = authed_client.get("/api/items", headers={"Accept-Encoding": "gzip, br"})
+
+        assert resp.headers["Content-Encoding"] == "br"
+        assert len(json.loads(brotli.decompress(resp.data))["comments"]["id"]) == 50
+
+    def test_returns_304_when_etag_matches(self, authed_client):
+        mock_reddit = self._many_comments(5)
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            first = authed_client.get("/api/items")
+            etag = first.headers["ETag"]
+            second = authed_client.get("/api/items", headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.data == b""
+
+
+    def test_reuses_cached_load_until_delete(self, authed_client, tmp_path, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_COMMENTS_FILE", str(tmp_path / "deleted_comments.txt"))
+        mock_reddit = self._many_comments(3)
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            authed_client.get("/api/items")
+            authed_client.get("/api/items")
+            assert mock_reddit.redditor.return_value.comments.new.call_count == 1
+
+            authed_client.post("/api/delete", json={"comment_ids": [], "post_ids": []})
+            authed_client.get("/api/items")
+            assert mock_reddit.redditor.return_value.comments.new.call_count == 2
+
+    def test_listing_that_keeps_failing_returns_503(self, authed_client, monkeypatch):
+        monkeypatch.setattr("redditcleaner.utils.time.sleep", lambda _s: None)
+        mock_reddit = MagicMock()
+        mock_reddit.redditor.return_value.comments.new.return_value = MagicMock(
+            __iter__=lambda self: self,
+            __next__=MagicMock(side_effect=prawcore.exceptions.ServerError(MagicMock(status_code=503))),
+        )
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            resp = authed_client.get("/api/items")
+
+        assert resp.status_code == 503
+        assert "comment page still failing" in resp.get_json()["error"]
+
+
+
+# ── /api/simulate ──────────────────────────────────────────────────────────────
+
+class TestApiSimulate:
+    def test_loads_items_this_process_has_not_seen(self, authed_client, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app._SNAPSHOTS", {})
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=TestApiItems._many_comments(9)):
+            resp = authed_client.get("/api/simulate?max_score=0&min_age_days=")
+        assert resp.get_json() == {"comments": 3, "posts": 0, "total": 9}
+
+    def test_counts_loaded_items(self, authed_client, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app._SNAPSHOTS", {})
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=TestApiItems._many_comments(9)):
+            authed_client.get("/api/items")
+
+        resp = authed_client.get("/api/simulate?max_score=0&min_age_days=")
+        assert resp.get_json() == {"comments": 3, "posts": 0, "total": 9}
+
+    def test_rejects_bad_parameters(self, authed_client, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app._SNAPSHOTS", {"testuser": object()})
+        resp = authed_client.get("/api/simulate?max_score=lots")
+        assert resp.status_code == 400
+
+
+# ── /api/load, /api/query, /api/select ───────────────────────────────────────
+
+class TestItemQueries:
+    @pytest.fixture(autouse=True)
+    def fresh_stores(self, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app._STORES", {})
+
+    def _load(self, client, n=9):
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=TestApiItems._many_comments(n)):
+            return client.get("/api/load")
+
+    def test_load_returns_counts_only(self, authed_client):
+        resp = self._load(authed_client)
+        assert resp.get_json() == {"comments": 9, "posts": 0, "subreddits": ["python"]}
+
+    def test_query_loads_items_this_process_has_not_seen(self, authed_client):
+        # Another worker served /api/load, or this one dropped the items after ITEMS_CACHE_TTL
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=TestApiItems._many_comments(9)):
+            assert authed_client.get("/api/query?kind=comment&limit=0").get_json()["total"] == 9
+        assert authed_client.get("/api/select?max_score=0").get_json()["comments"] == ["c0", "c3", "c6"]
+
+    def test_logout_drops_the_loaded_items(self, authed_client, fresh_items_cache):
+        self._load(authed_client)
+        authed_client.get("/logout")
+
+        assert fresh_items_cache.get("testuser") is None
+        assert app_module._STORES.get("testuser") is None
+        assert app_module._SNAPSHOTS.get("testuser") is None
+
+    def test_load_finishing_after_a_delete_does_not_replace_the_store(self, authed_client, fresh_items_cache):
+        self._load(authed_client, n=3)
+        store = app_module._STORES.get("testuser")
+        mock_reddit = TestApiItems._many_comments(3)
+        mock_reddit.redditor.side_effect = lambda name: (fresh_items_cache.invalidate(name),
+                                                         mock_reddit.redditor.return_value)[1]
+
+        app_module.load_items(mock_reddit, "testuser")  # a delete lands while the walk runs
+
+        assert app_module._STORES.get("testuser") is store
+
+    def test_query_returns_sorted_filtered_page(self, authed_client):
+        self._load(authed_client)
+        resp = authed_client.get("/api/query?kind=comment&max_score=0&sort=created_utc&order=asc&offset=1&limit=2")
+
+        data = resp.get_json()
+        assert data["total"] == 3
+        assert [row["id"] for row in data["rows"]] == ["c3", "c6"]
+        assert data["rows"][0]["permalink"] == "https://reddit.com/r/python/comments/x/y/c3/"
+
+    def test_query_rejects_bad_parameters(self, authed_client):
+        self._load(authed_client)
+        assert authed_client.get("/api/query?limit=100000").status_code == 400
+        assert authed_client.get("/api/query?sort=body").status_code == 400
+        assert authed_client.get("/api/query?order=sideways").status_code == 400
+
+    def test_select_returns_matching_ids(self, authed_client):
+        self._load(authed_client)
+        resp = authed_client.get("/api/select?max_score=0")
+        assert resp.get_json() == {"comments": ["c0", "c3", "c6"], "posts": []}
+
+    def test_deleted_items_leave_the_store(self, authed_client, tmp_path, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_COMMENTS_FILE", str(tmp_path / "deleted_comments.txt"))
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_POSTS_FILE",    str(tmp_path / "deleted_posts.txt"))
+        mock_reddit = TestApiItems._many_comments(3)
+        self._load(authed_client, n=3)
+        comment = mock_reddit.redditor.return_value.comments.new.return_value[1]
+        comment.fullname = comment.name = "t1_c1"
+        mock_reddit.comment.return_value = comment
+
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            authed_client.post("/api/delete", json={"comment_ids": ["c1"], "post_ids": []})
+
+        data = authed_client.get("/api/query?kind=comment").get_json()
+        assert data["total"] == 2
+        assert "c1" not in [row["id"] for row in data["rows"]]
+
+
+# ── /api/estimate ─────────────────────────────────────────────────────────────
+
+class TestApiEstimate:
+    def test_returns_401_without_session(self, client):
+        assert client.get("/api/estimate?comments=1").status_code == 401
+
+    def test_counts_three_requests_per_item(self, authed_client):
+        mock_reddit = MagicMock()
+        mock_reddit.auth.limits = {"remaining": 500.0, "used": 100, "reset_timestamp": None}
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            resp = authed_client.get("/api/estimate?comments=4&posts=1")
+
+        data = resp.get_json()
+        assert data["total_requests"] == 15
+        assert data["requests"]["fetch"] == 5
+        assert data["seconds"] > 0
+
+    def test_rejects_non_integer_counts(self, authed_client):
+        assert authed_client.get("/api/estimate?comments=many").status_code == 400
 
 
 # ── /api/delete ───────────────────────────────────────────────────────────────
@@ -115,6 +323,7 @@ class TestApiDelete:
         mock_comment.created_utc = 1700000000.0
         mock_comment.score       = -1
         mock_comment.name        = "t1_abc123"
+        mock_comment.fullname    = "t1_abc123"
         mock_comment.subreddit   = "testsubreddit"
         mock_comment.permalink   = "/r/testsubreddit/comments/abc/test/abc123/"
         mock_comment.body        = "bad comment"
@@ -131,3 +340,99 @@ class TestApiDelete:
         assert data["deleted_posts"]    == 0
         mock_comment.edit.assert_called_once_with(".")
         mock_comment.delete.assert_called_once()
+
+
+    def test_stops_early_with_pending_ids_during_outage(self, authed_client, tmp_path, monkeypatch, fresh_breaker):
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_COMMENTS_FILE", str(tmp_path / "deleted_comments.txt"))
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_POSTS_FILE",    str(tmp_path / "deleted_posts.txt"))
+        monkeypatch.setattr(fresh_breaker, "before_call", MagicMock(side_effect=CircuitOpenError("Reddit down")))
+
+        mock_reddit = MagicMock()
+        mock_reddit.comment.side_effect = lambda cid: MagicMock(fullname=f"t1_{cid}")
+        mock_reddit.submission.side_effect = lambda pid: MagicMock(fullname=f"t3_{pid}")
+
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            resp = authed_client.post("/api/delete", json={"comment_ids": ["a", "b"], "post_ids": ["c"]})
+
+        assert resp.status_code == 503
+        data = resp.get_json()
+        assert data["deleted_comments"] == 0
+        assert data["pending_comment_ids"] == ["a", "b"]
+        assert data["pending_post_ids"] == ["c"]
+
+
+    def test_second_submission_of_same_ids_is_skipped(self, authed_client, tmp_path, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_COMMENTS_FILE", str(tmp_path / "deleted_comments.txt"))
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_POSTS_FILE",    str(tmp_path / "deleted_posts.txt"))
+        mock_reddit = TestApiItems._many_comments(1)
+        comment = mock_reddit.redditor.return_value.comments.new.return_value[0]
+        comment.fullname = comment.name = "t1_c0"
+        mock_reddit.comment.return_value = comment
+
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            first = authed_client.post("/api/delete", json={"comment_ids": ["c0"], "post_ids": []})
+            second = authed_client.post("/api/delete", json={"comment_ids": ["c0"], "post_ids": []})
+
+        assert first.get_json()["deleted_comments"] == 1
+        assert second.get_json()["deleted_comments"] == 0
+        assert second.get_json()["skipped_comment_ids"] == ["c0"]
+        comment.delete.assert_called_once()
+
+
+# ── /api/export ───────────────────────────────────────────────────────────────
+
+class TestApiExport:
+    def test_returns_401_without_session(self, client):
+        assert client.get("/api/export").status_code == 401
+
+    def test_downloads_parquet_history(self, authed_client):
+        pq = pytest.importorskip("pyarrow.parquet")
+        comment = MagicMock(fullname="t1_abc", created_utc=1700000000.0, score=2, subreddit="python",
+                            permalink="/r/python/comments/x/_/abc/", body="full text " * 100)
+        mock_reddit = MagicMock()
+        mock_reddit.redditor.return_value.comments.new.return_value = [comment]
+        mock_reddit.redditor.return_value.submissions.new.return_value = []
+
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            resp = authed_client.get("/api/export")
+
+        assert resp.status_code == 200
+        assert "testuser_history.parquet" in resp.headers["Content-Disposition"]
+        table = pq.read_table(io.BytesIO(resp.data))
+        assert table.column("text").to_pylist() == ["full text " * 100]
+
+    def test_rejects_unknown_format(self, authed_client):
+        pytest.importorskip("pyarrow")
+        assert authed_client.get("/api/export?format=csv").status_code == 400
+
+
+# ── /api/stats ────────────────────────────────────────────────────────────────
+
+class TestApiStats:
+    def test_is_not_served(self, authed_client):
+        # The totals cover every user of LOG_DIR, so the multi-user app doesn't expose them
+        assert authed_client.get("/api/stats").status_code == 404
+
+    def test_deletions_are_counted(self, authed_client, tmp_path, monkeypatch):
+        monkeypatch.setattr("redditcleaner.web.app.LOG_DIR", str(tmp_path))
+        monkeypatch.setattr("redditcleaner.web.app.DELETED_POSTS_FILE", str(tmp_path / "deleted_posts.txt"))
+
+        mock_post = MagicMock()
+        mock_post.created_utc  = 1700000000.0
+        mock_post.score        = 0
+        mock_post.name         = "t3_xyz"
+        mock_post.fullname     = "t3_xyz"
+        mock_post.subreddit    = "testsubreddit"
+        mock_post.permalink    = "/r/testsubreddit/comments/xyz/"
+        mock_post.title        = "a post"
+        mock_post.num_comments = 0
+        mock_reddit = MagicMock()
+        mock_reddit.submission.return_value = mock_post
+
+        with patch("redditcleaner.web.app.praw.Reddit", return_value=mock_reddit):
+            authed_client.post("/api/delete", json={"comment_ids": [], "post_ids": ["xyz"]})
+
+        stats = load_stats(str(tmp_path))
+        assert stats["total"] == 1
+        assert stats["by_source"] == {"web": 1}
+        assert stats["by_subreddit"] == {"testsubreddit": 1}
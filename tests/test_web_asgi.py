@@ -0,0 +1,363 @@
+"""Tests for the ASGI web application (web/asgi.py)."""
+
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("quart")
+pytest.importorskip("asyncpraw")
+
+import asyncprawcore  # noqa: E402
+
+from redditcleaner.circuit import CircuitOpenError  # noqa: E402
+from redditcleaner.tracing import Tracer  # noqa: E402
+from redditcleaner.web import asgi  # noqa: E402
+from redditcleaner.web.item_cache import AsyncSingleFlightCache  # noqa: E402
+
+CREDS = {"username": "testuser", "client_id": "cid", "client_secret": "csecret", "password": "pw"}
+
+
+async def _aiter(items):
+    for item in items:
+        await asyncio.sleep(0)  # a listing page round trip
+        yield item
+
+
+class _FlakyListing:
+    """A listing whose next page fails with a 5xx *failures* times before *items* arrive."""
+
+    def __init__(self, items, failures):
+        self.items = iter(items)
+        self.failures = failures
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.failures:
+            self.failures -= 1
+            raise asyncprawcore.exceptions.ServerError(MagicMock(status=503))
+        try:
+            return next(self.items)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def _comment(cid, score=1):
+    return SimpleNamespace(
+        id=cid, fullname=f"t1_{cid}", name=f"t1_{cid}", body=f"comment {cid}", score=score,
+        subreddit="python", created_utc=1_700_000_000, permalink=f"/r/python/comments/x/_/{cid}/",
+    )
+
+
+def _lazy(fullname):
+    item = MagicMock(fullname=fullname, score=1, subreddit="python", created_utc=1_700_000_000,
+                     permalink="/r/python/x/", body="text", title="title", num_comments=0)
+    item.name = fullname  # MagicMock(name=...) names the mock instead
+    item.load, item.edit, item.delete = AsyncMock(), AsyncMock(), AsyncMock()
+    return item
+
+
+class FakeReddit:
+    """The parts of asyncpraw.Reddit the app awaits."""
+
+    def __init__(self, comments=(), failures=0):
+        self.comments = list(comments)
+        self.failures = failures
+        self.walks = 0
+        self.items = {}
+        self.user = SimpleNamespace(me=AsyncMock())
+        self.auth = SimpleNamespace(limits={})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def redditor(self, name):
+        self.walks += 1
+        return SimpleNamespace(
+            comments=SimpleNamespace(new=lambda limit=None: _FlakyListing(self.comments, self.failures)),
+            submissions=SimpleNamespace(new=lambda limit=None: _aiter([])),
+        )
+
+    async def comment(self, cid, fetch=True):
+        return self.items.setdefault(f"t1_{cid}", _lazy(f"t1_{cid}"))
+
+    async def submission(self, pid, fetch=True):
+        return self.items.setdefault(f"t3_{pid}", _lazy(f"t3_{pid}"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(asgi, "ITEMS_CACHE", AsyncSingleFlightCache(ttl=60))
+    monkeypatch.setattr(asgi, "_SNAPSHOTS", {})
+    monkeypatch.setattr(asgi, "_STORES", {})
+    monkeypatch.setattr(asgi, "DELETED_COMMENTS_FILE", str(tmp_path / "deleted_comments.txt"))
+    monkeypatch.setattr(asgi, "DELETED_POSTS_FILE", str(tmp_path / "deleted_posts.txt"))
+    asgi.app.config["TESTING"] = True
+    asgi.app.config["SECRET_KEY"] = "test-secret"
+
+
+@pytest.fixture
+def reddit(monkeypatch):
+    fake = FakeReddit([_comment("c1", -3), _comment("c2", 5)])
+    monkeypatch.setattr(asgi, "make_reddit", lambda creds: fake)
+    return fake
+
+
+def run(scenario, *, authed=True, csrf="token"):
+    """Run ``scenario(client)`` against a fresh test client and return its result."""
+
+    async def main():
+        client = asgi.app.test_client()
+        async with client.session_transaction() as sess:
+            if authed:
+                sess.update(CREDS)
+            if csrf:
+                sess[asgi.CSRF_SESSION_KEY] = csrf
+        return await scenario(client)
+
+    return asyncio.run(main())
+
+
+async def _json(resp):
+    return json.loads(await resp.get_data())
+
+
+def _delete(client, body, token="token"):
+    return client.post("/api/delete", json=body, headers={asgi.CSRF_HEADER: token})
+
+
+# ── Pages and CSRF ────────────────────────────────────────────────────────────
+
+class TestPages:
+    def test_login_page_carries_a_csrf_token(self):
+        async def scenario(client):
+            return await (await client.get("/")).get_data(as_text=True)
+
+        assert 'name="csrf_token" value="' in run(scenario, authed=False, csrf=None)
+
+    def test_login_stores_credentials(self, reddit):
+        async def scenario(client):
+            resp = await client.post("/login", form={**CREDS, "csrf_token": "token"})
+            async with client.session_transaction() as sess:
+                return resp, dict(sess)
+
+        resp, sess = run(scenario, authed=False)
+        assert resp.status_code == 302
+        assert sess["username"] == "testuser"
+        reddit.user.me.assert_awaited_once()
+
+    def test_post_without_csrf_token_is_rejected(self, reddit):
+        async def scenario(client):
+            return await _delete(client, {"comment_ids": ["c1"]}, token="wrong")
+
+        assert run(scenario).status_code == 400
+        assert not reddit.items
+
+
+# ── Items ─────────────────────────────────────────────────────────────────────
+
+class TestItems:
+    def test_returns_columnar_payload(self, reddit):
+        async def scenario(client):
+            return await _json(await client.get("/api/items"))
+
+        payload = run(scenario)
+        assert payload["comments"]["id"] == ["c1", "c2"]
+        assert payload["subreddits"] == ["python"]
+
+    def test_concurrent_loads_share_one_walk(self, reddit):
+        async def scenario(client):
+            return await asyncio.gather(*(client.get("/api/load") for _ in range(5)))
+
+        responses = run(scenario)
+        assert {r.status_code for r in responses} == {200}
+        assert reddit.walks == 1
+
+    def test_query_pages_loaded_items(self, reddit):
+        async def scenario(client):
+            await client.get("/api/load")
+            return await _json(await client.get("/api/query?kind=comment&max_score=0"))
+
+        result = run(scenario)
+        assert result["total"] == 1
+        assert result["rows"][0]["id"] == "c1"
+
+    def test_query_loads_items_this_process_has_not_seen(self, reddit):
+        async def scenario(client):
+            return await _json(await client.get("/api/query?kind=comment&max_score=0"))
+
+        assert run(scenario)["total"] == 1
+        assert reddit.walks == 1
+
+    def test_logout_drops_the_loaded_items(self, reddit):
+        async def scenario(client):
+            await client.get("/api/load")
+            await client.get("/logout")
+
+        run(scenario)
+        assert asgi._STORES.get("testuser") is None
+        assert asgi.ITEMS_CACHE.get("testuser") is None
+
+    def test_failed_listing_page_is_fetched_again(self, reddit, monkeypatch):
+        monkeypatch.setattr(asgi, "_RETRY_WAIT", (0, 0, 0))
+        reddit.failures = 2
+
+        async def scenario(client):
+            return await _json(await client.get("/api/items"))
+
+        assert run(scenario)["comments"]["id"] == ["c1", "c2"]
+
+    def test_listing_that_keeps_failing_returns_503(self, reddit, monkeypatch):
+        monkeypatch.setattr(asgi, "_RETRY_WAIT", (0, 0, 0))
+        reddit.failures = 4
+
+        async def scenario(client):
+            resp = await client.get("/api/items")
+            return resp.status_code, await _json(resp)
+
+        status, result = run(scenario)
+        assert status == 503
+        assert "comment page still failing" in result["error"]
+
+    def test_requires_login(self):
+        async def scenario(client):
+            return await client.get("/api/items")
+
+        assert run(scenario, authed=False).status_code == 401
+
+
+# ── /api/export ───────────────────────────────────────────────────────────────
+
+class TestExport:
+    def test_streams_arrow_history(self, reddit):
+        pa = pytest.importorskip("pyarrow")
+
+        async def scenario(client):
+            resp = await client.get("/api/export?format=arrow")
+            return resp, await resp.get_data()
+
+        resp, body = run(scenario)
+        assert resp.status_code == 200
+        assert "testuser_history.arrow" in resp.headers["Content-Disposition"]
+        table = pa.ipc.open_file(pa.py_buffer(body)).read_all()
+        assert table.column("id").to_pylist() == ["c1", "c2"]
+
+
+# ── /api/delete ───────────────────────────────────────────────────────────────
+
+class TestDelete:
+    def test_deletes_and_logs(self, reddit, tmp_path):
+        async def scenario(client):
+            await client.get("/api/load")
+            resp = await _delete(client, {"comment_ids": ["c1"], "post_ids": ["p1"]})
+            query = await _json(await client.get("/api/query?kind=comment"))
+            return await _json(resp), query
+
+        result, query = run(scenario)
+        assert (result["deleted_comments"], result["deleted_posts"], result["errors"]) == (1, 1, [])
+        item = reddit.items["t1_c1"]
+        item.edit.assert_awaited_once_with(".")
+        item.delete.assert_awaited_once_with()
+        assert "t1_c1" in (tmp_path / "deleted_comments.txt").read_text()
+        assert [row["id"] for row in query["rows"]] == ["c2"]
+
+    def test_second_submission_of_same_ids_is_skipped(self, reddit):
+        async def scenario(client):
+            await _delete(client, {"comment_ids": ["c1"]})
+            return await _json(await _delete(client, {"comment_ids": ["c1"]}))
+
+        result = run(scenario)
+        assert result["deleted_comments"] == 0
+        assert result["skipped_comment_ids"] == ["c1"]
+        reddit.items["t1_c1"].delete.assert_awaited_once()
+
+    def test_scrubbed_item_is_only_deleted(self, reddit, fresh_ledger, tmp_path):
+        fresh_ledger.claim("t1_c1")
+        fresh_ledger.scrub("t1_c1")
+
+        async def scenario(client):
+            return await _json(await _delete(client, {"comment_ids": ["c1"]}))
+
+        assert run(scenario)["deleted_comments"] == 1
+        item = reddit.items["t1_c1"]
+        item.delete.assert_awaited_once_with()
+        item.edit.assert_not_awaited()
+        assert not (tmp_path / "deleted_comments.txt").exists()
+        assert fresh_ledger.state("t1_c1") == "done"
+
+    def test_ledger_and_log_writes_stay_off_the_event_loop(self, reddit, fresh_ledger, monkeypatch):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def recording(method):
+            def wrapper(fullname):
+                threads.append(threading.get_ident())
+                return method(fullname)
+            return wrapper
+
+        for name in ("claim", "complete"):
+            monkeypatch.setattr(fresh_ledger, name, recording(getattr(fresh_ledger, name)))
+
+        async def scenario(client):
+            return await _json(await _delete(client, {"comment_ids": ["c1"]}))
+
+        assert run(scenario)["deleted_comments"] == 1
+        assert len(threads) == 2
+        assert loop_thread not in threads
+
+    def test_stops_early_with_pending_ids_during_outage(self, reddit, fresh_breaker, monkeypatch):
+        monkeypatch.setattr(fresh_breaker, "abefore_call", AsyncMock(side_effect=CircuitOpenError("Reddit down")))
+
+        async def scenario(client):
+            resp = await _delete(client, {"comment_ids": ["c1", "c2"], "post_ids": ["p1"]})
+            return resp.status_code, await _json(resp)
+
+        status, result = run(scenario)
+        assert status == 503
+        assert result["pending_comment_ids"] == ["c1", "c2"]
+        assert result["pending_post_ids"] == ["p1"]
+
+
+# ── --trace ───────────────────────────────────────────────────────────────────
+
+class _FakeHTTP:
+    """The slice of aiohttp.ClientSession that asyncprawcore's Requestor uses."""
+
+    closed = False
+    headers = {"User-Agent": "test"}
+
+    @asynccontextmanager
+    async def request(self, *args, **kwargs):
+        yield SimpleNamespace(status=200, content_length=42)
+
+
+class TestTracing:
+    def test_requestor_records_async_requests(self, tmp_path, monkeypatch):
+        tracer = Tracer()
+        tracer.start(str(tmp_path / "trace.json"))
+        monkeypatch.setattr(asgi, "TRACER", tracer)
+        requestor = asgi.TracingRequestor(user_agent="test agent", session=_FakeHTTP())
+
+        async def main():
+            async with requestor.request("post", "https://oauth.reddit.com/api/del", data={"id": "t1_c1"}):
+                pass
+
+        asyncio.run(main())
+        tracer.stop()
+        (span,) = [e for e in json.loads((tmp_path / "trace.json").read_text()) if e["ph"] == "X"]
+        assert span["name"] == "delete"
+        assert span["args"] == {"method": "POST", "path": "/api/del", "id": "t1_c1", "status": 200, "bytes": 42}
+
+    def test_plain_requestor_unless_tracing(self):
+        reddit = asgi.make_reddit(CREDS)
+        assert not isinstance(reddit._core.requestor, asgi.TracingRequestor)
+        asyncio.run(reddit.close())
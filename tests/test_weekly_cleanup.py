@@ -1,17 +1,21 @@
-"""Tests for weekly_cleanup.py — _should_delete and _load_credentials."""
+"""Tests for weekly_cleanup.py — deletion criteria, credentials and incremental runs."""
 
 import os
 from datetime import datetime, timezone
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from redditcleaner.ci.weekly_cleanup import (
     AGE_THRESHOLD_DAYS,
+    _is_undecided,
     _load_credentials,
+    _load_extra_clients,
     _should_delete,
+    main,
 )
+from redditcleaner.watchlist import WATCHLIST_FILE, Watchlist
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
@@ -104,3 +108,129 @@ class TestLoadCredentials:
             result = _load_credentials()
 
         assert result == ("a", "b", "c", "d")
+
+
+# ── _load_extra_clients ───────────────────────────────────────────────────────
+
+class TestLoadExtraClients:
+    def test_reads_pairs_from_env_var(self, monkeypatch):
+        monkeypatch.setenv("REDDIT_EXTRA_CLIENTS", "id2:secret2, id3:secret3")
+        assert _load_extra_clients() == [("id2", "secret2"), ("id3", "secret3")]
+
+    def test_rejects_malformed_env_var(self, monkeypatch):
+        monkeypatch.setenv("REDDIT_EXTRA_CLIENTS", "id2")
+        with pytest.raises(RuntimeError, match="client_id:client_secret"):
+            _load_extra_clients()
+
+    def test_falls_back_to_credentials_file(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("REDDIT_EXTRA_CLIENTS", raising=False)
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "Credentials.txt").write_text("a\nb\nc\nd\nid2\nsecret2\n", encoding="utf-8")
+        assert _load_extra_clients() == [("id2", "secret2")]
+
+
+# ── _is_undecided ─────────────────────────────────────────────────────────────
+
+class TestIsUndecided:
+    def test_young_score_one_is_undecided(self):
+        assert _is_undecided(_item(score=1, age_days=3)) is True
+
+    def test_old_score_one_is_decided(self):
+        assert _is_undecided(_item(score=1, age_days=AGE_THRESHOLD_DAYS + 1)) is False
+
+    def test_score_two_is_decided(self):
+        assert _is_undecided(_item(score=2, age_days=0)) is False
+
+
+# ── incremental runs ──────────────────────────────────────────────────────────
+
+def _reddit_item(fullname, score, age_days):
+    item = _item(score, age_days)
+    item.fullname = item.name = fullname
+    item.id = fullname[3:]
+    item.subreddit = "test"
+    item.permalink = f"/r/test/{item.id}/"
+    item.body = item.title = "text"
+    item.num_comments = 0
+    item.author = "me"
+    item.removed_by_category = None
+    item.edit = MagicMock()
+    item.delete = MagicMock()
+    return item
+
+
+class TestIncrementalRun:
+    @pytest.fixture
+    def reddit(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(
+            "redditcleaner.ci.weekly_cleanup._load_credentials", lambda: ("id", "secret", "me", "pw")
+        )
+        mock_reddit = MagicMock()
+        mock_reddit.auth.limits = {}
+        mock_reddit.redditor.return_value.submissions.new.return_value = []
+        with patch("redditcleaner.ci.weekly_cleanup.praw.Reddit", return_value=mock_reddit):
+            yield mock_reddit
+
+    def test_first_run_walks_everything_and_watches_young_score_one(self, reddit):
+        young = _reddit_item("t1_young", 1, 2)
+        negative = _reddit_item("t1_neg", -1, 30)
+        reddit.redditor.return_value.comments.new.side_effect = lambda limit: [young, negative]
+
+        main()
+
+        negative.delete.assert_called_once()
+        saved = Watchlist.load(WATCHLIST_FILE)
+        assert list(saved.items) == ["t1_young"]
+        assert saved.cursors["comment"]["name"] == "t1_young"
+
+    def test_next_run_rechecks_watched_items_in_batches(self, reddit):
+        cursor_item = _reddit_item("t1_cursor", 5, 20)
+        Watchlist(
+            cursors={"comment": {"name": "t1_cursor", "created_utc": cursor_item.created_utc}},
+            items={"t1_aged": 0.0},
+        ).save(WATCHLIST_FILE)
+        fresh = _reddit_item("t1_fresh", 0, 0)
+        aged = _reddit_item("t1_aged", 1, AGE_THRESHOLD_DAYS + 1)
+        reddit.redditor.return_value.comments.new.side_effect = lambda limit: [fresh, cursor_item]
+        reddit.info.return_value = [aged]
+
+        main()
+
+        fresh.delete.assert_called_once()
+        aged.delete.assert_called_once()
+        cursor_item.delete.assert_not_called()
+        reddit.info.assert_called_once_with(fullnames=["t1_aged"])
+        assert len(Watchlist.load(WATCHLIST_FILE)) == 0
+
+    def test_extra_clients_share_the_planned_deletions(self, reddit, monkeypatch):
+        monkeypatch.setenv("REDDIT_EXTRA_CLIENTS", "id2:secret2")
+        doomed = [_reddit_item(f"t1_neg{i}", -1, 30) for i in range(3)]
+        young = _reddit_item("t1_young", 1, 2)
+        reddit.redditor.return_value.comments.new.side_effect = lambda limit: [*doomed, young]
+        reddit.info.side_effect = lambda fullnames: [item for item in doomed if item.fullname in fullnames]
+
+        main()
+
+        for item in doomed:
+            item.delete.assert_called_once()
+        assert reddit.info.call_count == 1  # one 100-id chunk, hydrated by whichever client took it
+        assert list(Watchlist.load(WATCHLIST_FILE).items) == ["t1_young"]
+
+    def test_scrub_first_overwrites_every_match_before_deleting(self, reddit):
+        calls = MagicMock()
+        doomed = [_reddit_item(f"t1_neg{i}", -1, 30) for i in range(2)]
+        for item in doomed:
+            calls.attach_mock(item.edit, "edit")
+            calls.attach_mock(item.delete, "delete")
+        reddit.redditor.return_value.comments.new.side_effect = lambda limit: doomed
+        reddit.info.side_effect = lambda fullnames: [item for item in doomed if item.fullname in fullnames]
+
+        main(scrub_first=True)
+
+        assert [call[0] for call in calls.mock_calls] == ["edit", "edit", "delete", "delete"]
+
+    def test_dry_run_saves_no_state(self, reddit, tmp_path):
+        reddit.redditor.return_value.comments.new.side_effect = lambda limit: [_reddit_item("t1_a", 1, 1)]
+        main(dry_run=True)
+        assert not (tmp_path / WATCHLIST_FILE).exists()